@@ -5,8 +5,12 @@ from datetime import date, timedelta, datetime, timezone
 from pathlib import Path
 
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.append(str(Path(__file__).resolve().parent / "dags"))   # shared modules live next to the DAGs
+from github_client import GitHubClient
+
 load_dotenv(dotenv_path="./.env")
 
 API_KEY = os.getenv("API_KEY")
@@ -15,33 +19,13 @@ REPO = "great_expectations"
 REPO_FULL_NAME = f"{OWNER}/{REPO}"
 PER_PAGE = 100
 
-BASE_URL = "https://api.github.com"
-
-headers = {
-    "Accept": "application/vnd.github+json",
-    "Authorization": f"Bearer {API_KEY}",
-    "X-GitHub-Api-Version": "2022-11-28"
-}
-
-def get_next_link(link_header: str | None) -> str | None:
-
-    if not link_header:
-        return None
-
-    for part in link_header.split(','):
-        if 'rel="next"' in part:
-            url = part.split(';')[0].strip()
-            return url.strip("<>")
-        
-    return None     
-
+client = GitHubClient(API_KEY)
 
-# Link header example : <https://api.github.com/repositories/103071520/issues?per_page=50&after=Y3Vyc29yOnYyOpLPAAABlY-K-wjOrd6C4Q%3D%3D&page=2>; rel="next"
 
 def fetch_all_issues(repo, owner):
 
     try:
-        url = f"{BASE_URL}/repos/{owner}/{repo}/issues"
+        url = client.url(f"repos/{owner}/{repo}/issues")
         params = {
                    "per_page" : PER_PAGE,
                    "state" : "all",
@@ -50,28 +34,13 @@ def fetch_all_issues(repo, owner):
 
         all_issues = []
 
-        while url:
-            response = requests.get(
-                 url, 
-                 params=params, 
-                 headers=headers,
-                 timeout=30
-            )
-
-            response.raise_for_status()
-            # data = response.json()
-            data = [ x for x in response.json() if "pull_request" not in x]
+        for page in client.iter_pages(url, params):
+            # data = page
+            data = [ x for x in page if "pull_request" not in x]
             all_issues.extend(data)
 
             print(f"Fetched {len(data)} records. Total we have {len(all_issues)}")
 
-            url = get_next_link(response.headers.get("Link"))
-            # print(f"url link for the next page {url}")
-
-            # url = response.links.get("next", {}).get("url") -- built in link parsing in the request module
-
-            params = None
-
         return all_issues    
 
     except requests.exceptions.RequestException as e:
@@ -81,18 +50,10 @@ def fetch_all_issues(repo, owner):
 def fetch_repo_info(repo, owner):
 
     try:
-        url = f"{BASE_URL}/repos/{owner}/{repo}"
+        url = client.url(f"repos/{owner}/{repo}")
         repo_info = []
 
-
-        response = requests.get(
-                 url,
-                 headers=headers,
-                 timeout=30
-            )
-
-        response.raise_for_status()
-        data = response.json()
+        data = client.get_json(url)
 
         dim_repo = {
             "repo_id" : data["id"],
@@ -267,6 +228,8 @@ if __name__ == "__main__":
 
     fetch_repo_info(REPO, OWNER)
 
+    print(f"Client stats: {client.stats.as_dict()}")
+
 
 
     # print(issues_list[0]["labels"][0])
@@ -0,0 +1,80 @@
+"""
+decode_benchmark.py
+
+Decoding cost of a raw issue file: stdlib json.loads into full nested dicts (the old path)
+against github_records (orjson + projected, slotted IssueRecords). Reports the decode time
+and the memory still held per issue once the file is decoded (tracemalloc).
+
+Usage:
+    python benchmarks/decode_benchmark.py --raw landing-input/github_issues_raw_2026-02-22.json --issues 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent / "dags"))
+
+from github_landing import iter_raw_records, write_ndjson_pages
+from github_records import IssueRecord, loads
+from landing_format_benchmark import synthetic_issues
+
+
+def stdlib_dicts(path: Path) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def orjson_records(path: Path) -> list:
+    with open(path, "rb") as f:
+        return [IssueRecord.from_rest(loads(line)) for line in f]
+
+
+def measure(fn, path: Path, n: int) -> dict:
+    gc.collect()
+    start = time.perf_counter()
+    fn(path)
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    held = fn(path)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+
+    return {
+        "decoder": fn.__name__,
+        "issues": n,
+        "decode_s": round(seconds, 3),
+        "held_bytes_per_issue": current // n,
+        "peak_mb": round(peak / 1024 / 1024, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--raw", type=Path, required=True, help="raw issues file (NDJSON or JSON array)")
+    parser.add_argument("--issues", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    sample = list(iter_raw_records(args.raw))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "issues.ndjson"
+        write_ndjson_pages([list(synthetic_issues(sample, args.issues))], path)
+        results = [measure(fn, path, args.issues) for fn in (stdlib_dicts, orjson_records)]
+
+    print(pd.DataFrame(results).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+issue_generator.py
+
+Synthetic GitHub issues with the shape and the distributions of a real REST dump.
+
+synthetic_issues() in landing_format_benchmark only cycles through the sample, so at 1M
+issues every user and label row repeats a few hundred times and the dimension tables stay
+tiny. The generator here learns from the sample instead and scales it:
+
+- users: the issues-per-author distribution of the sample, a new author pool sized by
+  the sample's authors-per-issue ratio (so dim_user grows with the issue count)
+- labels: the sample's label set, picked by how often each label occurs, and the
+  number of labels per issue
+- state / state_reason, comments, assignees, locked and milestone frequencies
+- created_at spread over the sample's date range, updated_at / closed_at after it
+
+Payloads are full REST issues (body, reactions, urls ... copied from a sample issue), so
+decoding and parsing do the same work as on real API pages. Generation is seeded.
+
+Usage:
+    python benchmarks/issue_generator.py --sample landing-input/github_issues.json --issues 100000 --out issues.ndjson
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+from pathlib import Path
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent / "dags"))
+
+from github_landing import iter_raw_records, write_ndjson_pages
+
+FIRST_ISSUE_ID = 10_000_000_000
+FIRST_USER_ID = 900_000_000
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+PAGE_SIZE = 10_000
+
+
+def _parse_ts(value: str) -> datetime:
+    return datetime.strptime(value, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def _format_ts(value: datetime) -> str:
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
+def _weighted(counter: Counter) -> tuple[list, list]:
+    """(values, cumulative weights) for random.choices, computed once instead of per draw."""
+    values = list(counter)
+    return values, list(accumulate(counter[v] for v in values))
+
+
+@dataclass
+class IssueDistributions:
+    """Everything the generator takes from the sample."""
+
+    templates: list
+    users: list
+    issues_per_user: Counter
+    users_per_issue: float
+    labels: list
+    label_weights: list
+    labels_per_issue: Counter
+    states: Counter
+    comments: Counter
+    assignees: Counter
+    locked_share: float
+    milestone_share: float
+    milestones: list
+    first_created: datetime
+    last_created: datetime
+    update_lag_days: list
+
+    @classmethod
+    def from_sample(cls, sample: list) -> "IssueDistributions":
+        issues = [x for x in sample if "pull_request" not in x]
+        if not issues:
+            raise ValueError("The sample holds no issues (pull requests are ignored)")
+
+        per_user = Counter(x["user"]["id"] for x in issues)
+        users = {x["user"]["id"]: x["user"] for x in issues}
+        label_counts = Counter()
+        labels = {}
+        for issue in issues:
+            for label in issue["labels"]:
+                label_counts[label["id"]] += 1
+                labels[label["id"]] = label
+
+        created = [_parse_ts(x["created_at"]) for x in issues]
+        lags = [(_parse_ts(x["updated_at"]) - c).total_seconds() / 86400 for x, c in zip(issues, created)]
+
+        return cls(
+            templates=issues,
+            users=list(users.values()),
+            issues_per_user=Counter(per_user.values()),
+            users_per_issue=len(users) / len(issues),
+            labels=[labels[i] for i in label_counts],
+            label_weights=list(label_counts.values()),
+            labels_per_issue=Counter(len(x["labels"]) for x in issues),
+            states=Counter((x["state"], x["state_reason"]) for x in issues),
+            comments=Counter(x["comments"] for x in issues),
+            assignees=Counter(len(x["assignees"]) for x in issues),
+            locked_share=sum(bool(x["locked"]) for x in issues) / len(issues),
+            milestone_share=sum(x["milestone"] is not None for x in issues) / len(issues),
+            milestones=[x["milestone"] for x in issues if x["milestone"] is not None],
+            first_created=min(created),
+            last_created=max(created),
+            update_lag_days=sorted(max(lag, 0.0) for lag in lags),
+        )
+
+
+def _author_pool(dist: IssueDistributions, n: int, rng: random.Random) -> tuple[list, list]:
+    """(users, cumulative weights): about n * authors-per-issue authors, weighted like the sample's authors."""
+    size = max(1, round(n * dist.users_per_issue))
+    activity, activity_weights = _weighted(dist.issues_per_user)
+    users, weights = [], []
+
+    for i in range(size):
+        if i < len(dist.users):
+            user = dist.users[i]
+        else:
+            user = copy.copy(dist.users[i % len(dist.users)])
+            login = f"{user['login']}-{i}"
+            user["id"] = FIRST_USER_ID + i
+            user["login"] = login
+            user["node_id"] = f"U_synthetic{i}"
+            user["url"] = f"https://api.github.com/users/{login}"
+            user["html_url"] = f"https://github.com/{login}"
+        users.append(user)
+        weights.append(rng.choices(activity, cum_weights=activity_weights)[0])
+    return users, list(accumulate(weights))
+
+
+def generate_issues(sample: list, n: int, seed: int = 0, repo_full_name: str | None = None):
+    """Yield n REST issues drawn from the distributions of `sample` (ids and numbers are unique)."""
+    rng = random.Random(seed)
+    dist = IssueDistributions.from_sample(sample)
+    users, user_weights = _author_pool(dist, n, rng)
+
+    label_weights = list(accumulate(dist.label_weights))
+    label_counts, label_count_weights = _weighted(dist.labels_per_issue)
+    states, state_weights = _weighted(dist.states)
+    comments, comment_weights = _weighted(dist.comments)
+    assignees, assignee_weights = _weighted(dist.assignees)
+    span = (dist.last_created - dist.first_created).total_seconds()
+    repository_url = f"https://api.github.com/repos/{repo_full_name}" if repo_full_name else None
+
+    for i in range(n):
+        issue = copy.copy(rng.choice(dist.templates))
+        number = i + 1
+        base_url = repository_url or issue["repository_url"]
+
+        created = dist.first_created + timedelta(seconds=rng.uniform(0, span))
+        updated = created + timedelta(days=rng.choice(dist.update_lag_days))
+        state, state_reason = rng.choices(states, cum_weights=state_weights)[0]
+        closed = updated if state == "closed" else None
+
+        k = min(rng.choices(label_counts, cum_weights=label_count_weights)[0], len(dist.labels))
+        picked = {}
+        while len(picked) < k:
+            label = rng.choices(dist.labels, cum_weights=label_weights)[0]
+            picked[label["id"]] = label
+
+        user = rng.choices(users, cum_weights=user_weights)[0]
+        assignee_count = rng.choices(assignees, cum_weights=assignee_weights)[0]
+
+        issue.update({
+            "id": FIRST_ISSUE_ID + i,
+            "node_id": f"I_synthetic{i}",
+            "number": number,
+            "repository_url": base_url,
+            "url": f"{base_url}/issues/{number}",
+            "labels_url": f"{base_url}/issues/{number}/labels{{/name}}",
+            "comments_url": f"{base_url}/issues/{number}/comments",
+            "events_url": f"{base_url}/issues/{number}/events",
+            "user": user,
+            "labels": list(picked.values()),
+            "state": state,
+            "state_reason": state_reason,
+            "locked": rng.random() < dist.locked_share,
+            "assignee": user if assignee_count else None,
+            "assignees": [user] * assignee_count,
+            "milestone": rng.choice(dist.milestones) if dist.milestones and rng.random() < dist.milestone_share else None,
+            "comments": rng.choices(comments, cum_weights=comment_weights)[0],
+            "created_at": _format_ts(created),
+            "updated_at": _format_ts(updated),
+            "closed_at": _format_ts(closed) if closed else None,
+        })
+        yield issue
+
+
+def write_issues(sample: list, n: int, out: Path, seed: int = 0, repo_full_name: str | None = None) -> int:
+    """Write n generated issues as a raw NDJSON file, PAGE_SIZE issues at a time."""
+    issues = generate_issues(sample, n, seed, repo_full_name)
+    pages = iter(lambda: list(islice(issues, PAGE_SIZE)), [])
+    return write_ndjson_pages(pages, out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample", type=Path, required=True, help="raw issues file (NDJSON or JSON array)")
+    parser.add_argument("--issues", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, required=True)
+    args = parser.parse_args(argv)
+
+    write_issues(list(iter_raw_records(args.sample)), args.issues, args.out, args.seed)
+    print(f"Wrote {args.issues} issues to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+landing_format_benchmark.py
+
+Compares the CSV and the typed Parquet landing formats on the same issues:
+file size, write time (stream_issues_to_csv) and read time as DAG 02 does it
+(all staged columns, plus a pruned read of a few columns).
+
+The sample raw dump in landing-input is replicated with fresh issue ids until it has
+--issues records, so the numbers scale to a busy repo without calling the API.
+
+Usage:
+    python benchmarks/landing_format_benchmark.py --raw landing-input/github_issues_raw_2026-02-22.json --issues 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent / "dags"))
+
+from github_issue_parser import TABLES, stream_issues_to_csv
+from github_landing import iter_raw_records
+from github_parquet import SCHEMAS, read_parquet
+
+PRUNED_COLUMNS = {
+    "dim_user": ["user_id", "login", "type"],
+    "fact_issue": ["issue_id", "state", "created_at", "closed_at"],
+    "dim_label": ["label_id", "label_name"],
+    "bridge_issue_label": ["issue_id", "label_id"],
+}
+
+
+def synthetic_issues(sample: list, n: int):
+    """Yield n issues cycling through the sample, each copy with a new id and number."""
+    sample = [x for x in sample if "pull_request" not in x]
+    for i in range(n):
+        issue = copy.copy(sample[i % len(sample)])
+        issue["id"] = 10_000_000_000 + i
+        issue["number"] = i + 1
+        yield issue
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(sample: list, n: int, workdir: Path) -> list[dict]:
+    results = []
+    for fmt, suffix in (("csv", ".csv"), ("parquet", ".parquet")):
+        paths = {t: str(workdir / f"{t}{suffix}") for t in TABLES}
+        _, write_s = _timed(lambda: stream_issues_to_csv(synthetic_issues(sample, n), paths, "great-expectations/great_expectations"))
+
+        for table in TABLES:
+            path = paths[table]
+            columns = SCHEMAS[table].names
+            if fmt == "csv":
+                read_all = lambda: pd.read_csv(path, usecols=columns)
+                read_pruned = lambda: pd.read_csv(path, usecols=PRUNED_COLUMNS[table])
+            else:
+                read_all = lambda: read_parquet(path, columns=columns)
+                read_pruned = lambda: read_parquet(path, columns=PRUNED_COLUMNS[table])
+            df, read_s = _timed(read_all)
+            _, pruned_s = _timed(read_pruned)
+
+            results.append({
+                "format": fmt,
+                "table": table,
+                "rows": len(df),
+                "size_mb": round(Path(path).stat().st_size / 1024 / 1024, 2),
+                "write_s (all tables)": round(write_s, 2),
+                "read_s": round(read_s, 3),
+                "read_pruned_s": round(pruned_s, 3),
+            })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--raw", type=Path, required=True, help="raw issues file (NDJSON or JSON array)")
+    parser.add_argument("--issues", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    sample = list(iter_raw_records(args.raw))
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(sample, args.issues, Path(tmp))
+
+    print(pd.DataFrame(results).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+parser_benchmark.py
+
+Times the dict-per-row DataFrame path (parse_issue_data_to_csv) against the columnar
+path (parse_issue_data_columnar) on synthetic issues, and checks that both produce
+byte-identical CSVs (extracted_at_utc aside).
+
+Usage:
+    python benchmarks/parser_benchmark.py --raw landing-input/github_issues_raw_2026-02-22.json --sizes 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent / "dags"))
+
+from github_issue_parser import TABLES, parse_issue_data_columnar, parse_issue_data_to_csv
+from github_landing import iter_raw_records
+from landing_format_benchmark import synthetic_issues
+
+
+def _csv(df: pd.DataFrame) -> str:
+    return df.drop(columns=["extracted_at_utc"]).to_csv(index=False)
+
+
+def _timed(fn, *args):
+    gc.collect()
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run(sample: list, sizes: list[int], repo_full_name: str) -> list[dict]:
+    results = []
+    for n in sizes:
+        data = list(synthetic_issues(sample, n))
+
+        expected, dict_s = _timed(parse_issue_data_to_csv, data, repo_full_name)
+        actual, columnar_s = _timed(parse_issue_data_columnar, data, repo_full_name)
+
+        mismatched = [t for t, a, b in zip(TABLES, expected, actual) if _csv(a) != _csv(b)]
+        if mismatched:
+            raise AssertionError(f"Columnar output differs for {mismatched} at {n} issues")
+
+        results.append({
+            "issues": n,
+            "dict_path_s": round(dict_s, 3),
+            "columnar_path_s": round(columnar_s, 3),
+            "speedup": round(dict_s / columnar_s, 2),
+        })
+        del data, expected, actual
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--raw", type=Path, required=True, help="raw issues file (NDJSON or JSON array)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args(argv)
+
+    sample = list(iter_raw_records(args.raw))
+    print(pd.DataFrame(run(sample, args.sizes, "great-expectations/great_expectations")).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
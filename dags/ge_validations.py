@@ -9,7 +9,7 @@ that may expose context.data_sources.
 
 What it does:
 - Connects to Postgres via Airflow Connection (pg_warehouse)
-- Ensures a GE datasource exists (create or update)
+- Ensures a GE datasource exists (create or update) and runs it on the pooled warehouse engine
 - Ensures expectation suites exist (dim_user_suite, fact_issue_suite)
 - Validates:
     - dim_user table expectations
@@ -17,6 +17,7 @@ What it does:
     - FK orphan check: fact_issue.user_id must exist in dim_user.user_id
 - Writes full validation results to timestamped JSON files
 - Fails the Airflow task if any validations fail
+- Times every expectation and validation run into the task metrics (github_metrics)
 """
 
 import json
@@ -24,10 +25,13 @@ import logging
 import os
 from datetime import datetime, timezone
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 
 import great_expectations as gx
-from airflow.hooks.base import BaseHook
+
+from github_metrics import current_metrics, instrumented
+from github_profiling import profiled
+from github_warehouse import engine_for_uri, warehouse_uri
 
 # ----------------------------
 # Config
@@ -40,6 +44,7 @@ DIM_USER = "dim_user_github_great_exp_package"
 FACT_ISSUE = "fact_issue_github_great_exp_package"
 
 RESULTS_DIR = "/opt/airflow/ge_validation_results"
+SHARED_ENGINE_GX_SERIES = "0.18."         # the datasource engine caches _share_engine seeds
 
 logger = logging.getLogger("airflow.task")
 
@@ -48,9 +53,8 @@ logger = logging.getLogger("airflow.task")
 # Helpers
 # ----------------------------
 def _pg_uri() -> str:
-    """Build SQLAlchemy URI from the Airflow connection."""
-    c = BaseHook.get_connection(CONN_ID)
-    return c.get_uri()
+    """SQLAlchemy URI of the Airflow connection (looked up once per worker process)."""
+    return warehouse_uri(CONN_ID)
 
 
 def _failed_expectations(validation_result: dict) -> list:
@@ -143,6 +147,39 @@ def _get_or_create_datasource(context, ds_name: str):
         )
 
 
+def _share_engine(ds, engine) -> None:
+    """
+    Run a fluent SQL datasource on the pooled warehouse engine instead of pools of its own.
+
+    GE only takes a connection string (the datasource is persisted in the fluent config, an
+    Engine is not serializable), and SQLDatasource builds one create_engine() pool from it in
+    get_engine() (asset introspection) and another in the SqlAlchemyExecutionEngine of
+    get_execution_engine() (the validations). Both are cached on the datasource, and the context
+    keeps the same datasource instance for the whole run, so the caches are seeded with the
+    shared engine. create_engine() connects lazily, the replaced pool never opened a connection.
+
+    The caches are GE 0.18 internals (great-expectations is pinned in requirements.txt): on any
+    other version, or when the seeded engines do not stick, the task fails instead of quietly
+    going back to pools of its own.
+    """
+    if not gx.__version__.startswith(SHARED_ENGINE_GX_SERIES) \
+            or not all(hasattr(ds, a) for a in ("_engine", "_cached_connection_string", "get_execution_engine")):
+        raise RuntimeError(
+            f"great_expectations {gx.__version__}: datasource {getattr(ds, 'name', ds)} has no engine cache to share "
+            f"the warehouse pool with (supported: {SHARED_ENGINE_GX_SERIES}x), review _share_engine before upgrading"
+        )
+
+    ds._engine = engine
+    ds._cached_connection_string = ds.connection_string
+    execution_engine = ds.get_execution_engine()
+    if execution_engine.engine is not engine:
+        own_engine, execution_engine.engine = execution_engine.engine, engine
+        own_engine.dispose()
+
+    if ds.get_engine() is not engine or ds.get_execution_engine().engine is not engine:
+        raise RuntimeError(f"Datasource {ds.name} did not keep the shared warehouse engine, review _share_engine")
+
+
 def _get_or_add_table_asset(ds, asset_name: str, schema_name: str, table_name: str):
     """
     GE Fluent compatibility helper for table assets.
@@ -175,6 +212,27 @@ def _get_or_add_table_asset(ds, asset_name: str, schema_name: str, table_name: s
     )
 
 
+class _TimedValidator:
+    """Validator proxy: every expect_* call and validate() is timed with the table as label."""
+
+    def __init__(self, validator, table: str):
+        self._validator = validator
+        self._table = table
+
+    def __getattr__(self, name):
+        attr = getattr(self._validator, name)
+        if not callable(attr) or not (name.startswith("expect_") or name == "validate"):
+            return attr
+
+        def timed(*args, **kwargs):
+            metric = "validation_duration_seconds" if name == "validate" else "expectation_duration_seconds"
+            labels = {"table": self._table} if name == "validate" else {"table": self._table, "expectation": name}
+            with current_metrics().timer(metric, **labels):
+                return attr(*args, **kwargs)
+
+        return timed
+
+
 def _ensure_suite(context, suite_name: str):
     """Create expectation suite if it doesn't exist."""
     try:
@@ -186,6 +244,8 @@ def _ensure_suite(context, suite_name: str):
 # ----------------------------
 # Main entrypoint for Airflow task
 # ----------------------------
+@instrumented("validate")
+@profiled(RESULTS_DIR)
 def run_ge_validations():
     """
     Main function to run GE validations.
@@ -193,9 +253,11 @@ def run_ge_validations():
     """
     context = gx.get_context(context_root_dir=GE_ROOT)
 
-    # Datasource (create/update)
+    # Datasource (create/update), on the engine the loads and the FK check below share
     ds_name = "pg_warehouse_ds"
     ds = _get_or_create_datasource(context, ds_name)
+    engine = engine_for_uri(_pg_uri())
+    _share_engine(ds, engine)
 
     # ----------------------------
     # DIM USER VALIDATION
@@ -211,10 +273,10 @@ def run_ge_validations():
         table_name=DIM_USER,
     )
 
-    v_user = context.get_validator(
+    v_user = _TimedValidator(context.get_validator(
         batch_request=asset_user.build_batch_request(),
         expectation_suite_name=suite_user,
-    )
+    ), DIM_USER)
 
     # Expectations (dim_user)
     v_user.expect_table_row_count_to_be_between(min_value=1)
@@ -240,10 +302,10 @@ def run_ge_validations():
         table_name=FACT_ISSUE,
     )
 
-    v_issue = context.get_validator(
+    v_issue = _TimedValidator(context.get_validator(
         batch_request=asset_issue.build_batch_request(),
         expectation_suite_name=suite_issue,
-    )
+    ), FACT_ISSUE)
 
     # Expectations (fact_issue)
     v_issue.expect_table_row_count_to_be_between(min_value=1)
@@ -260,7 +322,6 @@ def run_ge_validations():
     # ----------------------------
     # FK orphan check (facts.user_id must exist in dim_user)
     # ----------------------------
-    engine = create_engine(_pg_uri())
     fk_sql = f"""
     SELECT COUNT(*) AS cnt
     FROM {TARGET_SCHEMA}.{FACT_ISSUE} f
@@ -269,7 +330,8 @@ def run_ge_validations():
     WHERE f.user_id IS NOT NULL
       AND u.user_id IS NULL;
     """
-    with engine.begin() as conn:
+    with current_metrics().timer("expectation_duration_seconds", table=FACT_ISSUE, expectation="fk_orphan_users"), \
+            engine.begin() as conn:
         orphan_cnt = conn.execute(text(fk_sql)).scalar()
 
     # ----------------------------
@@ -287,6 +349,11 @@ def run_ge_validations():
     failed_user = _failed_expectations(res_user)
     failed_issue = _failed_expectations(res_issue)
 
+    metrics = current_metrics()
+    metrics.gauge("expectations_failed", len(failed_user), table=DIM_USER)
+    metrics.gauge("expectations_failed", len(failed_issue), table=FACT_ISSUE)
+    metrics.gauge("orphan_rows", orphan_cnt, table=FACT_ISSUE)
+
     if (not res_user.get("success", False)) or (not res_issue.get("success", False)) or (orphan_cnt > 0):
 
         logger.warning(
@@ -6,17 +6,40 @@ import os
 from pathlib import Path
 import pandas as pd
 
-from datetime import date, timedelta, datetime, timezone
+from datetime import timedelta, datetime, timezone
 from airflow.decorators import dag, task
+from airflow.models import Pool
+from airflow.operators.python import get_current_context
 from pathlib import Path
 
+from github_client import GitHubClient
+from github_http_cache import GitHubHTTPCache
+from github_landing import raw_file_suffix, landing_file_suffix, landing_file_name, write_ndjson_pages, repo_landing_dir
+from github_records import issue_records, iter_issue_records
+from github_issue_parser import stream_issues_to_csv, stream_comments_to_csv, stream_events_to_csv
+from github_graphql import iter_issue_pages_graphql
+from github_manifest import register_files, complete_run
+from github_row_hash import RowHashIndex, promote_hashes
+from github_metrics import current_metrics, instrumented
+from github_profiling import profiled
+from github_watermark import resolve_since, read_watermark, stage_watermark, promote_watermarks, max_timestamp
+
 # --- Config -----
 
-OWNER = "great-expectations"
-REPO = "great_expectations"
-REPO_FULL_NAME = f"{OWNER}/{REPO}"
+# repos to track, "owner/repo" comma separated, can be overridden per run with the "repos" param
+REPOS = [r.strip() for r in os.getenv("GITHUB_REPOS", "great-expectations/great_expectations").split(",") if r.strip()]
 PER_PAGE = 100
-BASE_URL = "https://api.github.com"
+
+FETCH_CONCURRENCY = int(os.getenv("GITHUB_FETCH_CONCURRENCY", "4"))   # 1 = walk rel="next" one page at a time
+REPO_CONCURRENCY = int(os.getenv("GITHUB_REPO_CONCURRENCY", "4"))     # mapped per-repo tasks running at once
+# Airflow pool shared by every task that spends the GitHub token, in any DAG. Create it once with one
+# slot per task allowed to call GitHub at the same time, the rate-limit budget is split by its slots:
+#   airflow pools set github_api 4 "GitHub API token, one slot per concurrent caller"
+GITHUB_POOL = os.getenv("GITHUB_API_POOL", "github_api")
+EXTRACT_BACKEND = os.getenv("GITHUB_EXTRACT_BACKEND", "rest")         # rest | graphql (projected fields only)
+
+DEFAULT_SINCE = "2024-01-01T00:00:00Z"            # used on the first run and on full_refresh
+WATERMARK_OVERLAP = timedelta(hours=1)
 
 API_KEY_ENV_NAME = "GITHUB_API_KEY"
 API_KEY = os.getenv(API_KEY_ENV_NAME)
@@ -28,80 +51,145 @@ if not API_KEY:
 
 LANDING_DIR = Path("/opt/spark-apps/git-great-expectations-package-etl/landing-input")
 LANDING_DIR.mkdir(parents=True, exist_ok=True)
+PROFILE_DIR = LANDING_DIR / "_profiles"      # trigger with conf {"profile": true} to fill it
+
+HTTP_CACHE_PATH = LANDING_DIR / "_github_http_cache.sqlite"     # ETag / Last-Modified cache, 304s are free
+RAW_COMPRESSION = os.getenv("GITHUB_RAW_COMPRESSION", "none")     # none | gzip | zstd for the raw NDJSON
+LANDING_FORMAT = os.getenv("GITHUB_LANDING_FORMAT", "csv")        # csv | parquet (typed) for the parsed tables
+LANDING_SUFFIX = landing_file_suffix(LANDING_FORMAT)
+
+ISSUE_TABLE_PREFIXES = {
+    "dim_user": "github_dim_user",
+    "fact_issue": "github_issue_fact",
+    "dim_label": "github_issue_label_dim",
+    "bridge_issue_label": "github_issue_label_bridge",
+}
 
 
+def issues_watermark_key(repo_full_name: str) -> str:
+    return f"{repo_full_name}:issues"
 
-headers = {
-    "Accept": "application/vnd.github+json",
-    "Authorization": f"Bearer {API_KEY}",
-    "X-GitHub-Api-Version": "2022-11-28"
-}
 
-def get_next_link(link_header: str | None) -> str | None:
+def comments_watermark_key(repo_full_name: str) -> str:
+    return f"{repo_full_name}:issue_comments"
+
 
-    if not link_header:
-        return None
+def events_watermark_key(repo_full_name: str) -> str:
+    return f"{repo_full_name}:issue_events"          # holds the last seen event id, not a timestamp
 
-    for part in link_header.split(','):
-        if 'rel="next"' in part:
-            url = part.split(';')[0].strip()
-            return url.strip("<>")
-        
-    return None     
 
+def current_run_id() -> str:
+    """Airflow run id of the running task, the key of the landing manifest."""
+    return get_current_context()["run_id"]
 
-# Link header example : <https://api.github.com/repositories/103071520/issues?per_page=50&after=Y3Vyc29yOnYyOpLPAAABlY-K-wjOrd6C4Q%3D%3D&page=2>; rel="next"
 
-def fetch_all_issues(repo, owner):
+def github_pool_slots() -> int:
+    """Slots of GITHUB_POOL, read when a task runs; REPO_CONCURRENCY if the pool is missing or unbounded (-1)."""
+    pool = Pool.get_pool(GITHUB_POOL)
+    if pool is None or pool.slots < 1:
+        print(f"Pool {GITHUB_POOL} missing or unbounded, splitting the rate limit by {REPO_CONCURRENCY} tasks")
+        return REPO_CONCURRENCY
+    return pool.slots
+
+
+def make_client(metrics=None) -> GitHubClient:
+    # every task holding a GITHUB_POOL slot spends the same token, so each one only plans with its share of the budget
+    return GitHubClient(API_KEY, cache=GitHubHTTPCache(HTTP_CACHE_PATH), budget_share=1 / github_pool_slots(), metrics=metrics)
+
+
+
+def iter_issue_pages(repo, owner, client: GitHubClient, since: str = DEFAULT_SINCE, concurrency: int = FETCH_CONCURRENCY):
+    """
+    Yield one list of IssueRecords (pull requests removed) per API page, memory stays
+    bounded by a page and only the projected fields outlive it.
+    """
 
     try:
-        url = f"{BASE_URL}/repos/{owner}/{repo}/issues"
+        url = client.url(f"repos/{owner}/{repo}/issues")
         params = {
                    "per_page" : PER_PAGE,
                    "state" : "all",
-                   "since" : "2024-01-01T00:00:00Z"
+                   "since" : since
         }
 
-        all_issues = []
+        total = 0
+        seen_ids = set()        # pages can shift while we read them, keep the first copy of every issue
 
-        while url:
-            response = requests.get(
-                 url, 
-                 params=params, 
-                 headers=headers,
-                 timeout=30
-            )
-            response.raise_for_status()
-            data = [ x for x in response.json() if "pull_request" not in x]
-            all_issues.extend(data)
+        for payload in client.iter_pages(url, params, concurrency=concurrency):
+            data = [x for x in issue_records(payload) if x.id not in seen_ids]
+            seen_ids.update(x.id for x in data)
+            total += len(data)
 
-            print(f"Fetched {len(data)} records. Total we have {len(all_issues)}")
+            print(f"Fetched {len(data)} records. Total we have {total}")
 
-            url = get_next_link(response.headers.get("Link"))
+            yield data
 
-            params = None
+    except requests.exceptions.RequestException as e:
+        raise e    
+
+
+def iter_issue_comment_pages(repo, owner, client: GitHubClient, since: str = DEFAULT_SINCE, concurrency: int = FETCH_CONCURRENCY):
+    """
+    Repo-level comments feed, one request per 100 comments instead of one per issue.
+    Sorted by updated_at ascending so the watermark is simply the last row seen.
+    """
+
+    try:
+        url = client.url(f"repos/{owner}/{repo}/issues/comments")
+        params = {
+                   "per_page" : PER_PAGE,
+                   "sort" : "updated",
+                   "direction" : "asc",
+                   "since" : since
+        }
 
-        return all_issues    
+        total = 0
+
+        for payload in client.iter_pages(url, params, concurrency=concurrency):
+            total += len(payload)
+            print(f"Fetched {len(payload)} comments. Total we have {total}")
+            yield payload
 
     except requests.exceptions.RequestException as e:
-        raise e    
+        raise e
 
 
-def fetch_repo_info(repo, owner):
+def iter_issue_event_pages(repo, owner, client: GitHubClient, last_seen_id: int | None = None):
+    """
+    Repo-level issue events feed. The endpoint has no `since` and returns newest first, so
+    pages are walked one by one and the walk stops at the first event already loaded; a
+    daily run costs a handful of requests.
+    """
 
     try:
-        url = f"{BASE_URL}/repos/{owner}/{repo}"
-        repo_info = []
+        url = client.url(f"repos/{owner}/{repo}/issues/events")
+        params = {"per_page" : PER_PAGE}
 
+        total = 0
+
+        for payload in client.iter_pages(url, params, concurrency=1):
+            data = [ x for x in payload if last_seen_id is None or x["id"] > last_seen_id]
+            total += len(data)
+            print(f"Fetched {len(data)} new events. Total we have {total}")
+
+            if data:
+                yield data
+
+            if len(data) < len(payload):
+                print(f"Reached last seen event id {last_seen_id}, stopping")
+                return
+
+    except requests.exceptions.RequestException as e:
+        raise e
 
-        response = requests.get(
-                 url,
-                 headers=headers,
-                 timeout=30
-            )
 
-        response.raise_for_status()
-        data = response.json()
+def fetch_repo_info(repo, owner, client: GitHubClient):
+
+    try:
+        url = client.url(f"repos/{owner}/{repo}")
+        repo_info = []
+
+        data = client.get_json(url)
 
         dim_repo = {
             "repo_id" : data["id"],
@@ -133,162 +221,247 @@ def fetch_repo_info(repo, owner):
     except requests.exceptions.RequestException as e:
         raise e 
 
-def parse_issue_data_to_csv(data: list[dict]):
-
-    dim_user_list = []
-    label_info = []
-    fact_issue = []
-    bridge_table_lable_issue = []
-
-    try: 
-        for issue in data:                             # user dimension
-            user_info = issue["user"]
-            
-            dim_user = {
-                "user_id" : user_info["id"],
-                "type" : user_info["type"],
-                "login" : user_info["login"],
-                "node_id" : user_info["node_id"],
-                "type" : user_info["type"],
-                "site_admin" : user_info["site_admin"],
-                "avatar_url" : user_info["avatar_url"],
-                "url" : user_info["url"],
-                "html_url" : user_info["html_url"],
-                "followers_url" : user_info["followers_url"],
-                "following_url" : user_info["following_url"],
-                "gists_url" : user_info["gists_url"],
-                "starred_url" : user_info["starred_url"],
-                "subscriptions_url" : user_info["subscriptions_url"],
-                "organizations_url" : user_info["organizations_url"],
-                "repos_url" : user_info["repos_url"],
-                "events_url" : user_info["events_url"],
-                "received_events_url" : user_info["received_events_url"],
-                "type" : user_info["type"],
-                "user_view_type" : user_info["user_view_type"],
-                "site_admin" : user_info["site_admin"]}
-            
-            dim_user_list.append(dim_user)
-
-        df_user = pd.DataFrame(dim_user_list).drop_duplicates(subset=["user_id"])
-        df_user["extracted_at_utc"] = datetime.now(timezone.utc).isoformat()
-
-        for issue in data:                           # fact issue 
-
-            issue_fact = {
-                "issue_id" : issue["id"],
-                "issue_number" : issue["number"],
-                "repo_full_name" : REPO_FULL_NAME,
-                "repository_url" : issue["repository_url"],
-                "title" : issue["title"],
-                "user_id" : issue["user"]["id"],
-                "state" : issue["state"],
-                "locked" : issue["locked"],
-                "assignee_count" : len(issue["assignees"]),
-                "label_count" : len(issue["labels"]),
-                "milestone" : issue["milestone"],
-                "comments" : issue["comments"],
-                "created_at" : issue["created_at"],
-                "updated_at" : issue["updated_at"],
-                "closed_at" : issue["closed_at"],
-                "events_url" : issue["events_url"],
-                "api_url" : issue["url"],
-                "state_reason" : issue["state_reason"]
-
-            }
-
-            fact_issue.append(issue_fact)
-
-        df_issue_fact = pd.DataFrame(fact_issue)
-        df_issue_fact["extracted_at_utc"] = datetime.now(timezone.utc).isoformat()
-
-
-        for issue in data:                         # label dimension
-            issue_label = issue["labels"]
-            
-
-            for item in issue_label:
-                dim_label = {
-                "label_id" : item["id"],
-                "label_name" : item["name"],
-                "label_color" : item["color"],
-                "is_default" : item["default"],
-                "label_description" : item["description"]
-                }
-                label_info.append(dim_label)
-
-        df_issue_label = pd.DataFrame(label_info).drop_duplicates(subset=["label_id"])
-        df_issue_label["extracted_at_utc"] = datetime.now(timezone.utc).isoformat()
-
-
-        for issue in data:                        # bridge table - issue label   
-
-            label_issue_id = issue["id"]
-            issue_label = issue.get("labels")     ## safe to do get() for external APIs
-
-            for item in issue_label:
-                bridge_table = {
-                    "issue_id" : label_issue_id,
-                    "label_id" : item["id"]
-                }
-                bridge_table_lable_issue.append(bridge_table)
-
-        df_bridge_issue_label = pd.DataFrame(bridge_table_lable_issue).drop_duplicates(subset=["issue_id","label_id"])
-        df_bridge_issue_label["extracted_at_utc"] =  datetime.now(timezone.utc).isoformat()        
-
-
-        output_dir = "/opt/spark-apps/git-great-expectations-package-etl/landing-input"
-
-        return df_user, df_issue_fact, df_issue_label, df_bridge_issue_label
-
-    except requests.exceptions.RequestException as e:
-        raise e 
-
 @dag(
     dag_id="github-great-expectations-package-api-etl-01",
     description="Run github-great-expectations-package pipeline using existing functions, manual trigger.",
     start_date=datetime(2026, 1, 1),
     schedule=None,
     catchup=False,
+    params={
+        "full_refresh": False,                    # trigger with {"full_refresh": true} to re-pull the whole history
+        "fetch_concurrency": FETCH_CONCURRENCY,   # parallel page requests per repo, 1 = sequential
+        "repos": REPOS,                           # ["owner/repo", ...], one mapped extract/parse per repo
+        "backend": EXTRACT_BACKEND,               # "rest" or "graphql", both feed the same parser
+    },
     tags=["github-great-expectations-package", "api", "csv"]
 )
 
 def github_great_expectations_api_etl():
 
     @task
-    def t_fetch_repo_info():
-        df_repo = fetch_repo_info(REPO, OWNER)
-        out = LANDING_DIR / f"github_dim_repo_{date.today().isoformat()}.csv"
-        df_repo.to_csv(out, index=False, encoding="utf-8")
+    def t_list_repos() -> list:
+        repos = get_current_context()["params"].get("repos") or REPOS
+        print(f"Extracting {len(repos)} repos: {repos}")
+        return list(repos)
+
+    @task(pool=GITHUB_POOL, max_active_tis_per_dag=REPO_CONCURRENCY)
+    @instrumented("extract", table="dim_repo")
+    def t_fetch_repo_info(repo_full_name: str):
+        owner, repo = repo_full_name.split("/")
+        metrics = current_metrics()
+        metrics.set_labels(repo=repo_full_name)
+        client = make_client(metrics)
+        try:
+            df_repo = fetch_repo_info(repo, owner, client)
+            client.log_stats(f"fetch_repo_info {repo_full_name}")
+        finally:
+            client.close()
+        out = repo_landing_dir(LANDING_DIR, repo_full_name) / landing_file_name("github_dim_repo", current_run_id(), LANDING_SUFFIX)
+        if LANDING_FORMAT == "parquet":
+            from github_parquet import write_dataframe     # pyarrow is only needed for Parquet
+
+            write_dataframe(df_repo, out, "dim_repo")
+        else:
+            df_repo.to_csv(out, index=False, encoding="utf-8")
+        register_files(LANDING_DIR, current_run_id(), repo_full_name, {"dim_repo": (out, len(df_repo))})
+        metrics.incr("records_extracted", len(df_repo))
  
-    @task
-    def t_fetch_all_issues_to_json() -> str:
-        issues = fetch_all_issues(REPO, OWNER)
-        out = LANDING_DIR / f"github_issues_raw_{date.today().isoformat()}.json"
-        out.write_text(json.dumps(issues), encoding="utf-8")
-        return str(out)    # the path is storeded in XCom variable 
+    @task(pool=GITHUB_POOL, max_active_tis_per_dag=REPO_CONCURRENCY)
+    @instrumented("extract", table="issues_raw")
+    @profiled(PROFILE_DIR)
+    def t_fetch_all_issues_to_json(repo_full_name: str) -> dict:
+        owner, repo = repo_full_name.split("/")
+        metrics = current_metrics()
+        metrics.set_labels(repo=repo_full_name)
+        run_params = get_current_context()["params"]
+        full_refresh = bool(run_params.get("full_refresh", False))
+        concurrency = int(run_params.get("fetch_concurrency", FETCH_CONCURRENCY))
+        backend = run_params.get("backend", EXTRACT_BACKEND)
+        since = resolve_since(LANDING_DIR, issues_watermark_key(repo_full_name), DEFAULT_SINCE, full_refresh, WATERMARK_OVERLAP)
+
+        out = repo_landing_dir(LANDING_DIR, repo_full_name) / landing_file_name(
+            "github_issues_raw", current_run_id(), raw_file_suffix(RAW_COMPRESSION)
+        )
+        max_updated_at = None
+
+        def track_watermark(pages):
+            nonlocal max_updated_at
+            for page in pages:
+                max_updated_at = max_timestamp([max_updated_at, *(x.updated_at for x in page)])
+                yield page
+
+        # pages are appended to the NDJSON file as they arrive, nothing is held beyond one page
+        client = make_client(metrics)
+        try:
+            with metrics.timer("step_duration_seconds", step="fetch", backend=backend) as fetch:
+                if backend == "graphql":
+                    pages = (issue_records(page) for page in iter_issue_pages_graphql(repo, owner, client, since=since))
+                else:
+                    pages = iter_issue_pages(repo, owner, client, since=since, concurrency=concurrency)
+                count = write_ndjson_pages(track_watermark(pages), out)
+            stats = client.log_stats(f"fetch_all_issues {repo_full_name}")
+        finally:
+            client.close()
+        metrics.throughput("records_extracted", count, fetch.seconds)
+        register_files(LANDING_DIR, current_run_id(), repo_full_name, {"issues_raw": (out, count)})
+
+        # only small metadata goes to XCom, the watermark is staged after the parse succeeded
+        return {
+            "repo_full_name": repo_full_name,
+            "path": str(out),
+            "count": count,
+            "since": since,
+            "backend": backend,
+            "max_updated_at": max_updated_at,
+            "client_stats": stats,
+        }
 
-    @task
-    def t_parse_issue_data_to_csv(raw_json_path: str) -> dict:
-        data = json.loads(Path(raw_json_path).read_text(encoding="utf-8"))
-        df_user, df_issue_fact, df_label, df_bridge = parse_issue_data_to_csv(data)
-
-        paths = {
-            "dim_user": str(LANDING_DIR / f"github_dim_user_{date.today().isoformat()}.csv"),
-            "fact_issue": str(LANDING_DIR / f"github_issue_fact_{date.today().isoformat()}.csv"),
-            "dim_label": str(LANDING_DIR / f"github_issue_label_dim_{date.today().isoformat()}.csv"),
-            "bridge_issue_label": str(LANDING_DIR / f"github_issue_label_bridge_{date.today().isoformat()}.csv"),
+    @task(max_active_tis_per_dag=REPO_CONCURRENCY)
+    @instrumented("parse")
+    @profiled(PROFILE_DIR)
+    def t_parse_issue_data_to_csv(raw: dict) -> dict:
+        metrics = current_metrics()
+        metrics.set_labels(repo=raw["repo_full_name"])
+        repo_dir = repo_landing_dir(LANDING_DIR, raw["repo_full_name"])
+        run_id = current_run_id()
+        paths = {t: str(repo_dir / landing_file_name(prefix, run_id, LANDING_SUFFIX)) for t, prefix in ISSUE_TABLE_PREFIXES.items()}
+        delta_paths = {
+            t: str(repo_dir / landing_file_name(f"{prefix}_delta", run_id, LANDING_SUFFIX)) for t, prefix in ISSUE_TABLE_PREFIXES.items()
         }
+        full_refresh = bool(get_current_context()["params"].get("full_refresh", False))
+        hash_index = RowHashIndex(LANDING_DIR, run_id, raw["repo_full_name"], ignore_previous=full_refresh)
 
-        df_user.to_csv(paths["dim_user"], index=False, encoding="utf-8")
-        df_issue_fact.to_csv(paths["fact_issue"], index=False, encoding="utf-8")
-        df_label.to_csv(paths["dim_label"], index=False, encoding="utf-8")
-        df_bridge.to_csv(paths["bridge_issue_label"], index=False, encoding="utf-8")
+        # one pass over the raw file, the four CSVs (and their changed-rows deltas) are written in chunks as the issues stream by
+        with metrics.timer("step_duration_seconds", step="parse") as parse:
+            counts = stream_issues_to_csv(
+                iter_issue_records(raw["path"]), paths, raw["repo_full_name"], delta_paths=delta_paths, hash_index=hash_index
+            )
+        changes = hash_index.commit()
+        print(f"Parsed {raw['count']} issues of {raw['repo_full_name']} into {counts}, row changes {changes}")
+        for table in paths:
+            metrics.throughput("rows_written", counts[table], parse.seconds, table=table)
+            for change, n in changes.get(table, {}).items():
+                metrics.incr("rows_classified", n, table=table, change=change)
+
+        # DAG 02 loads the <table>_delta files of a run when they are registered
+        register_files(LANDING_DIR, run_id, raw["repo_full_name"], {
+            **{t: (paths[t], counts[t]) for t in paths},
+            **{f"{t}_delta": (delta_paths[t], counts[f"{t}_delta"]) for t in delta_paths},
+        })
+
+        return {**raw, "paths": paths, "counts": counts, "delta_paths": delta_paths, "changes": changes}
+
+    @task(pool=GITHUB_POOL, max_active_tis_per_dag=REPO_CONCURRENCY)
+    @instrumented("extract", table="fact_issue_comment")
+    def t_fetch_issue_comments_to_csv(repo_full_name: str) -> dict:
+        owner, repo = repo_full_name.split("/")
+        metrics = current_metrics()
+        metrics.set_labels(repo=repo_full_name)
+        run_params = get_current_context()["params"]
+        full_refresh = bool(run_params.get("full_refresh", False))
+        concurrency = int(run_params.get("fetch_concurrency", FETCH_CONCURRENCY))
+        key = comments_watermark_key(repo_full_name)
+        since = resolve_since(LANDING_DIR, key, DEFAULT_SINCE, full_refresh, WATERMARK_OVERLAP)
+
+        repo_dir = repo_landing_dir(LANDING_DIR, repo_full_name)
+        out = repo_dir / landing_file_name("github_issue_comment_fact", current_run_id(), LANDING_SUFFIX)
+        delta_out = repo_dir / landing_file_name("github_issue_comment_fact_delta", current_run_id(), LANDING_SUFFIX)
+        hash_index = RowHashIndex(LANDING_DIR, current_run_id(), repo_full_name, ignore_previous=full_refresh)
+        max_updated_at = None
+
+        def track_watermark(pages):
+            nonlocal max_updated_at
+            for page in pages:
+                max_updated_at = max_timestamp([max_updated_at, *(x["updated_at"] for x in page)])
+                yield from page
+
+        client = make_client(metrics)
+        try:
+            with metrics.timer("step_duration_seconds", step="fetch") as fetch:
+                pages = iter_issue_comment_pages(repo, owner, client, since=since, concurrency=concurrency)
+                count = stream_comments_to_csv(
+                    track_watermark(pages), str(out), repo_full_name, delta_path=str(delta_out), hash_index=hash_index
+                )
+            client.log_stats(f"fetch_issue_comments {repo_full_name}")
+        finally:
+            client.close()
+        metrics.throughput("records_extracted", count, fetch.seconds)
+        changes = hash_index.commit().get("fact_issue_comment", {"insert": 0, "update": 0})
+        register_files(LANDING_DIR, current_run_id(), repo_full_name, {
+            "fact_issue_comment": (out, count),
+            "fact_issue_comment_delta": (delta_out, changes["insert"] + changes["update"]),
+        })
+
+        # the landing file is complete, the watermark moves on once the whole run completes
+        if max_updated_at is not None:
+            stage_watermark(LANDING_DIR, current_run_id(), key, max_updated_at, reset=full_refresh)
+
+        return {"repo_full_name": repo_full_name, "path": str(out), "count": count, "since": since, "changes": changes}
+
+    @task(pool=GITHUB_POOL, max_active_tis_per_dag=REPO_CONCURRENCY)
+    @instrumented("extract", table="fact_issue_event")
+    def t_fetch_issue_events_to_csv(repo_full_name: str) -> dict:
+        owner, repo = repo_full_name.split("/")
+        metrics = current_metrics()
+        metrics.set_labels(repo=repo_full_name)
+        full_refresh = bool(get_current_context()["params"].get("full_refresh", False))
+        key = events_watermark_key(repo_full_name)
+        last_seen = None if full_refresh else read_watermark(LANDING_DIR, key)
+        last_seen_id = int(last_seen) if last_seen is not None else None
+
+        out = repo_landing_dir(LANDING_DIR, repo_full_name) / landing_file_name("github_issue_event_fact", current_run_id(), LANDING_SUFFIX)
+        max_event_id = last_seen_id
+
+        def track_watermark(pages):
+            nonlocal max_event_id
+            for page in pages:
+                max_event_id = max([max_event_id or 0, *(x["id"] for x in page)])
+                yield from page
+
+        client = make_client(metrics)
+        try:
+            with metrics.timer("step_duration_seconds", step="fetch") as fetch:
+                pages = iter_issue_event_pages(repo, owner, client, last_seen_id=last_seen_id)
+                count = stream_events_to_csv(track_watermark(pages), str(out), repo_full_name)
+            client.log_stats(f"fetch_issue_events {repo_full_name}")
+        finally:
+            client.close()
+        metrics.throughput("records_extracted", count, fetch.seconds)
+        register_files(LANDING_DIR, current_run_id(), repo_full_name, {"fact_issue_event": (out, count)})
+
+        if max_event_id is not None and max_event_id != last_seen_id:
+            stage_watermark(LANDING_DIR, current_run_id(), key, str(max_event_id), reset=full_refresh)
+
+        return {"repo_full_name": repo_full_name, "path": str(out), "count": count, "last_seen_id": last_seen_id}
 
-        return paths
+    @task
+    def t_stage_issues_watermark(parsed: dict):
+        if parsed["max_updated_at"] is None:
+            print(f"No issues of {parsed['repo_full_name']} changed since {parsed['since']}, watermark unchanged")
+            return
+        full_refresh = bool(get_current_context()["params"].get("full_refresh", False))
+        stage_watermark(
+            LANDING_DIR, current_run_id(), issues_watermark_key(parsed["repo_full_name"]), parsed["max_updated_at"],
+            reset=full_refresh,
+        )
 
-    repo_path = t_fetch_repo_info()
-    raw_path = t_fetch_all_issues_to_json()
-    extracted_paths = t_parse_issue_data_to_csv(raw_path)
+    @task
+    def t_complete_manifest_run() -> dict:
+        # every mapped task succeeded, DAG 02 may now pick this run's files and the next
+        # run compares its rows against the hashes of this one and resumes from its watermarks
+        counts = complete_run(LANDING_DIR, current_run_id())
+        promote_hashes(LANDING_DIR, current_run_id())
+        promote_watermarks(LANDING_DIR, current_run_id())
+        return counts
+
+    repos = t_list_repos()
+    repo_paths = t_fetch_repo_info.expand(repo_full_name=repos)
+    raw = t_fetch_all_issues_to_json.expand(repo_full_name=repos)
+    parsed = t_parse_issue_data_to_csv.expand(raw=raw)
+    committed = t_stage_issues_watermark.expand(parsed=parsed)
+    comments = t_fetch_issue_comments_to_csv.expand(repo_full_name=repos)
+    events = t_fetch_issue_events_to_csv.expand(repo_full_name=repos)
+    [repo_paths, committed, comments, events] >> t_complete_manifest_run()
 
 
 github_great_expectations_api_etl()
@@ -298,29 +471,37 @@ github_great_expectations_api_etl()
 
 
 # In this Airflow DAG, large API data is not passed directly between tasks; instead, it is written to disk and only the file path is shared using XCom.
-# In the task t_fetch_all_issues_to_json, the GitHub issues are fetched as a Python list[dict], converted into a JSON string using json.dumps(), 
-# and written to a file using Path.write_text().#  The task then returns the file path as a string, which Airflow automatically stores in XCom.
-# 
-# json.dumps()
-# Python object → JSON string
-# json.dump() Python object → write directly to file
-
-# Python object → JSON string → write_text()
-
-
-# The downstream task t_parse_issue_data_to_csv receives this path as an input parameter, reads the file back into memory using
-# Path(raw_json_path).read_text(), and converts the JSON string back into Python objects using json.loads(). 
-
-# JSON file on disk
-#         ↓ read_text()
-# JSON string
-#         ↓ json.loads()
-# Python list[dict]
+# In the task t_fetch_all_issues_to_json, iter_issue_pages is a generator that yields one page of issues at a time, each issue
+# decoded with orjson and projected into a slotted IssueRecord (github_records) that keeps only the fields the landing tables use.
+# Every page is appended to a newline-delimited JSON file (one issue per line, optionally .gz / .zst) and flushed as it arrives,
+# so memory is bounded by one page and a crash keeps the pages written so far. The task then returns the file path and the
+# record count as a small dict, which Airflow automatically stores in XCom.
+#
+# page (list[IssueRecord]) → dumps() per issue (REST subset) → one line in the .ndjson file → flush
+
+# The downstream task t_parse_issue_data_to_csv receives this dict as an input parameter and reads the records back with
+# iter_issue_records(), which streams and validates one JSON line at a time (older github_issues_raw_*.json array files are
+# read the same way; a malformed record fails the task with its file, position and field).
+
+# NDJSON file on disk
+#         ↓ iter_issue_records()
+# one IssueRecord per line
+#         ↓ stream_issues_to_csv()
+# dim_user / fact_issue / dim_label / bridge CSVs, written in chunks in a single pass
+
+# Every task also registers the files it landed (path, row count, sha256) under the Airflow run id in the landing manifest
+# (_landing_manifest.sqlite, see github_manifest.py). t_complete_manifest_run marks the run complete once all mapped tasks
+# succeeded; DAG 02 only ever loads the files of complete runs, resolved when its tasks run.
+#
+# The parse and comments tasks hash every row they write (github_row_hash.py) and also write a <table>_delta file with only
+# the rows whose hash differs from the previous complete run. The hashes and the watermarks are staged under the run id
+# and promoted when the run completes, so a failed run never hides its changes nor moves the next run's `since` past them;
+# DAG 02 loads the delta files of every complete run it has not loaded yet.
 
 
 # This pattern separates the data plane (files on disk containing large payloads) from the control plane 
 # (small metadata like paths passed via XCom), which is a best practice in Airflow to avoid storing large datasets in the metadata database. 
-# Conceptually, the flow becomes: API → raw JSON file → parsed DataFrames → structured CSV outputs, making the pipeline scalable, retry-safe,
+# Conceptually, the flow becomes: API → raw NDJSON file → streamed rows → structured CSV outputs, making the pipeline scalable, retry-safe,
 # and easy to debug.
 
 
@@ -2,46 +2,196 @@ from __future__ import annotations
 from datetime import datetime
 from airflow import DAG
 from airflow.operators.python import PythonOperator
-from airflow.hooks.base import BaseHook
 from pathlib import Path
 
 import os
-import pandas as pd
-from sqlalchemy import create_engine, text, types as sqltypes
+from sqlalchemy import text, types as sqltypes
+
+from github_landing import repo_partitions
+from github_manifest import mark_loaded, run_files, run_tables, runs_to_load
+from github_metrics import current_metrics, instrumented
+from github_pg_copy import copy_landing_files
+from github_profiling import profiled
+from github_warehouse import get_engine as warehouse_engine, transaction
 
 LANDING_DIR = Path("/opt/spark-apps/git-great-expectations-package-etl/landing-input")
+PROFILE_DIR = LANDING_DIR / "_profiles"      # trigger with conf {"profile": true} to fill it
+
+LANDING_SUFFIXES = (".csv", ".parquet")
+
 
-def get_latest_file(prefix: str):
-    files = sorted(LANDING_DIR.glob(f"{prefix}_*.csv"))
+def _landing_files(prefix: str, directory: Path) -> list:
+    """CSV and Parquet landing files of a prefix, oldest first (the date is part of the name, runs of a day by mtime)."""
+    # the date right after the prefix keeps <prefix>_delta_<date> files out
+    files = (f for s in LANDING_SUFFIXES for f in directory.glob(f"{prefix}_[0-9]*{s}"))
+    return sorted(files, key=lambda f: (f.name[len(prefix) + 1:len(prefix) + 11], f.stat().st_mtime_ns))
+
+
+def get_latest_file(prefix: str, directory: Path = LANDING_DIR):
+    files = _landing_files(prefix, directory)
 
     if not files:
-        raise FileNotFoundError(f"No files found for the prefix: {prefix} in the Landing area {LANDING_DIR}")
+        raise FileNotFoundError(f"No files found for the prefix: {prefix} in the Landing area {directory}")
     return files[-1]
-    
 
-CSV_PATH_DIM_USER = get_latest_file("github_dim_user")
-CSV_PATH_DIM_REPO = get_latest_file("github_dim_repo")
-CSV_PATH_DIM_LABEL = get_latest_file("github_issue_label_dim")
-CSV_PATH_BRIDGE_LABEL_ISSUE = get_latest_file("github_issue_label_bridge")
-CSV_PATH_ISSUE_FACT = get_latest_file("github_issue_fact")
+
+def get_latest_files(prefix: str) -> list:
+    """Latest file of every repo partition (repo=<owner>__<repo>), or of the flat landing area before partitioning."""
+    partitions = repo_partitions(LANDING_DIR)
+
+    if not partitions:
+        return [get_latest_file(prefix)]
+
+    files = [f for f in (_landing_files(prefix, p) for p in partitions) if f]
+    if not files:
+        raise FileNotFoundError(f"No files found for the prefix: {prefix} in the repo partitions of {LANDING_DIR}")
+    return [f[-1] for f in files]
+
+
+# landing file prefix per manifest table, only used for landing areas without a manifest
+LANDING_PREFIXES = {
+    "dim_user": "github_dim_user",
+    "dim_repo": "github_dim_repo",
+    "dim_label": "github_issue_label_dim",
+    "bridge_issue_label": "github_issue_label_bridge",
+    "fact_issue": "github_issue_fact",
+    "fact_issue_comment": "github_issue_comment_fact",
+    "fact_issue_event": "github_issue_event_fact",
+}
+RESOLVE_TASK_ID = "resolve_landing_run"
+
+
+def resolve_landing_run(**context):
+    """
+    Pick the DAG 01 runs every load of this DAG run reads: {"landing_run_id": ...} from the
+    trigger conf, else every complete run not loaded yet (newest first, their delta files
+    build on each other). An empty list falls back to the latest file per repo partition
+    (landing areas written before the manifest).
+    """
+    conf = context["dag_run"].conf or {}
+    run_ids = [conf["landing_run_id"]] if conf.get("landing_run_id") else runs_to_load(LANDING_DIR)
+    print(f"Loading landing runs {run_ids}" if run_ids else "No landing manifest, loading the latest files per repo")
+    return run_ids
+
+
+def landing_inputs(context: dict, table: str) -> list:
+    """
+    Files of `table` for this DAG run, resolved when the task runs, never at DAG parse time.
+    Runs that landed a row-hash delta of the table are read from the delta (changed rows only).
+    """
+    return [path for _, paths in landing_inputs_by_run(context, table, oldest_first=False) for path in paths]
+
+
+def landing_inputs_by_run(context: dict, table: str, oldest_first: bool = True) -> list:
+    """
+    [(run_id, files of `table`)] per landing run of this DAG run, for loads that must apply the
+    runs one after the other. Without a manifest: [(None, latest file per repo partition)].
+    """
+    run_ids = context["ti"].xcom_pull(task_ids=RESOLVE_TASK_ID)
+    if not run_ids:
+        return [(None, get_latest_files(LANDING_PREFIXES[table]))]
+
+    delta = f"{table}_delta"
+    runs = reversed(run_ids) if oldest_first else run_ids      # run_ids come newest first
+    return [
+        (run_id, run_files(LANDING_DIR, run_id, delta if delta in run_tables(LANDING_DIR, run_id) else table))
+        for run_id in runs
+    ]
+
+
+def mark_runs_loaded(**context):
+    run_ids = context["ti"].xcom_pull(task_ids=RESOLVE_TASK_ID)
+    if run_ids:
+        mark_loaded(LANDING_DIR, run_ids)
 
 TARGET_SCHEMA = "staging"
 TARGET_TABLE_USER = "dim_user_github_great_exp_package"
 TARGET_TABLE_LABEL = "dim_label_github_great_exp_package"
 TARGET_TABLE_REPO = "dim_repo_github_great_exp_package"
 TARGET_TABLE_ISSUE_FACT = "fact_issue_github_great_exp_package"
+TARGET_TABLE_ISSUE_COMMENT = "fact_issue_comment_github_great_exp_package"
+TARGET_TABLE_ISSUE_EVENT = "fact_issue_event_github_great_exp_package"
+TARGET_TABLE_BRIDGE_ISSUE_LABEL = "bridge_issue_label_github_great_exp_package"
 TMP_TABLE = "github_great_exp_package_tmp"
 CONN_ID = "pg_warehouse"
 
 def get_engine():
-    c = BaseHook.get_connection(CONN_ID)
-    return create_engine(c.get_uri())
+    """The pooled warehouse engine of this worker process (see github_warehouse)."""
+    return warehouse_engine(CONN_ID)
+
+
+def staging_table(table: str) -> str:
+    """TEMP staging table of one load: private to its session, dropped when the load's transaction ends."""
+    return f"{TMP_TABLE}_{table}"
+
+
+def stage_landing_files(conn, paths: list, dtype_map: dict, tmp: str, key: list | None = None) -> int:
+    """
+    Create the TEMP staging table `tmp` in the transaction of conn and COPY the dtype_map columns
+    of the landing files into it, chunk by chunk; shared dimension rows (e.g. a user active in
+    two repos) are kept once. Rows per second go to the task metrics.
+    """
+    metrics = current_metrics()
+    with metrics.timer("step_duration_seconds", step="stage") as stage:
+        rows = copy_landing_files(conn, paths, tmp, dtype_map, key)
+    metrics.throughput("rows_staged", rows, stage.seconds)
+    return rows
+
+
+# timestamps hash as their text, which follows the session time zone
+HASH_SESSION_SQL = "SET LOCAL TimeZone = 'UTC';"
+
+
+def row_hash_sql(dtype_map: dict, key: str, alias: str = "tmp") -> str:
+    """md5 of every staged column but the key and extracted_at_utc, as a 16-byte UUID."""
+    columns = ", ".join(f'{alias}."{c}"' for c in dtype_map if c not in (key, "extracted_at_utc"))
+    return f"md5(ROW({columns})::text)::uuid"
+
+
+def record_rows_written(staged: int, inserted: int, updated: int) -> None:
+    """Rows an upsert actually wrote; the rest of the staged rows matched their row_hash."""
+    metrics = current_metrics()
+    metrics.incr("rows_inserted", inserted)
+    metrics.incr("rows_updated", updated)
+    metrics.incr("rows_unchanged", staged - inserted - updated)
+    print(f"Staged {staged} rows: {inserted} inserted, {updated} updated, {staged - inserted - updated} unchanged")
+
+# columns the loads need on targets created outside this DAG: (table, column, type)
+TARGET_COLUMN_MIGRATIONS = [
+    (TARGET_TABLE_USER, "row_hash", "UUID"),
+    (TARGET_TABLE_ISSUE_FACT, "row_hash", "UUID"),
+    (TARGET_TABLE_ISSUE_FACT, "first_response_at", "TIMESTAMPTZ"),     # derived by the comment load
+]
+
+
+def migrate_target_tables():
+    """
+    One-time column migrations of the targets, in their own short transaction before the loads.
+    ALTER TABLE takes an ACCESS EXCLUSIVE lock even when IF NOT EXISTS turns it into a no-op, so
+    it only runs for columns information_schema reports missing, never inside a load.
+    """
+
+    engine = get_engine()
+    check_sql = """
+    SELECT 1 FROM information_schema.columns
+    WHERE table_schema = :schema AND table_name = :table AND column_name = :column
+    """
+
+    with transaction(engine) as conn:
+        for table, column, column_type in TARGET_COLUMN_MIGRATIONS:
+            params = {"schema": TARGET_SCHEMA, "table": table, "column": column}
+            if conn.execute(text(check_sql), params).first() is None:
+                conn.execute(text(f"ALTER TABLE {TARGET_SCHEMA}.{table} ADD COLUMN IF NOT EXISTS {column} {column_type};"))
+                print(f"Added {TARGET_SCHEMA}.{table}.{column} {column_type}")
+
 
-def load_dim_user():
+@instrumented("load", table="dim_user")
+@profiled(PROFILE_DIR)
+def load_dim_user(**context):
     """Loading dim user table"""
 
     engine = get_engine()
-    df = pd.read_csv(CSV_PATH_DIM_USER)
+    tmp = staging_table("dim_user")
 
     dtype_map = {
         "user_id" : sqltypes.TEXT(),
@@ -65,103 +215,69 @@ def load_dim_user():
         "extracted_at_utc" : sqltypes.TIMESTAMP(timezone=True)
     }
 
-    df.to_sql(
-        name=TMP_TABLE,
-        schema=TARGET_SCHEMA,
-        con=engine,
-        if_exists="replace",
-        index=False,
-        method="multi",
-        chunksize=5000,
-        dtype=dtype_map,
-    )
+    """Single upsert: new users are inserted, existing ones are rewritten only when their row_hash
+       (every column but the key and extracted_at_utc) changed, unchanged rows cost one comparison """
 
-    """Step 1 : Insert all records, if records already exist then insert new records """
+    upsert_sql = f"""
 
-    insert_sql = f"""
+    WITH written AS (
+        INSERT INTO {TARGET_SCHEMA}.{TARGET_TABLE_USER} (
+            user_id, "type", login, node_id, site_admin, avatar_url, url, html_url, followers_url,
+            following_url, gists_url, starred_url, subscriptions_url, organizations_url, repos_url,
+            events_url, received_events_url, user_view_type, extracted_at_utc, row_hash
+        )
 
-    INSERT INTO {TARGET_SCHEMA}.{TARGET_TABLE_USER} (
-        user_id, "type", login, node_id, site_admin, avatar_url, url, html_url, followers_url,
-        following_url, gists_url, starred_url, subscriptions_url, organizations_url, repos_url,
-        events_url, received_events_url, user_view_type, extracted_at_utc
+        SELECT 
+              tmp.user_id, tmp."type", tmp.login, tmp.node_id, tmp.site_admin, tmp.avatar_url, tmp.url, tmp.html_url, tmp.followers_url,
+              tmp.following_url, tmp.gists_url, tmp.starred_url, tmp.subscriptions_url, tmp.organizations_url, tmp.repos_url,
+              tmp.events_url, tmp.received_events_url, tmp.user_view_type, tmp.extracted_at_utc,
+              {row_hash_sql(dtype_map, key="user_id")}
+        FROM 
+              {tmp} tmp
+        ON CONFLICT (user_id) DO UPDATE
+        SET
+            "type" = excluded."type",
+            login = excluded.login,
+            node_id = excluded.node_id,
+            site_admin = excluded.site_admin,
+            avatar_url = excluded.avatar_url,
+            url = excluded.url,
+            html_url = excluded.html_url,
+            followers_url = excluded.followers_url,
+            following_url = excluded.following_url,
+            gists_url = excluded.gists_url,
+            starred_url = excluded.starred_url,
+            subscriptions_url = excluded.subscriptions_url,
+            organizations_url = excluded.organizations_url,
+            repos_url = excluded.repos_url,
+            events_url = excluded.events_url,
+            received_events_url = excluded.received_events_url,
+            user_view_type = excluded.user_view_type,
+            extracted_at_utc = excluded.extracted_at_utc,
+            row_hash = excluded.row_hash
+        WHERE {TARGET_TABLE_USER}.row_hash IS DISTINCT FROM excluded.row_hash
+        RETURNING (xmax = 0) AS inserted
     )
-
-    SELECT 
-          tmp.user_id, tmp."type", tmp.login, tmp.node_id, tmp.site_admin, tmp.avatar_url, tmp.url, tmp.html_url, tmp.followers_url,
-          tmp.following_url, tmp.gists_url, tmp.starred_url, tmp.subscriptions_url, tmp.organizations_url, tmp.repos_url,
-          tmp.events_url, tmp.received_events_url, tmp.user_view_type, tmp.extracted_at_utc     
-    FROM 
-          {TARGET_SCHEMA}.{TMP_TABLE} tmp 
-    LEFT JOIN 
-              {TARGET_SCHEMA}.{TARGET_TABLE_USER} trg
-              on trg.user_id = tmp.user_id
-    WHERE 
-          trg.user_id is null
-          ON CONFLICT (user_id) DO NOTHING;              
+    SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) FROM written;
 
     """
 
-    update_sql = f"""
-    
-    UPDATE {TARGET_SCHEMA}.{TARGET_TABLE_USER} trg 
-    SET 
-        
-        "type" = tmp."type",
-        login = tmp.login,
-        node_id = tmp.node_id,
-        site_admin = tmp.site_admin,
-        avatar_url = tmp.avatar_url,
-        url = tmp.url,
-        html_url = tmp.html_url,
-        followers_url = tmp.followers_url,
-        following_url = tmp.following_url,
-        gists_url = tmp.gists_url,
-        starred_url = tmp.starred_url,
-        subscriptions_url = tmp.subscriptions_url,
-        organizations_url = tmp.organizations_url,
-        repos_url = tmp.repos_url,
-        events_url = tmp.events_url,
-        received_events_url = tmp.received_events_url,
-        user_view_type = tmp.user_view_type,
-        extracted_at_utc = tmp.extracted_at_utc
-
-    FROM {TARGET_SCHEMA}.{TMP_TABLE} tmp
-    WHERE 
-          trg.user_id = tmp.user_id
-    AND 
-         (
-            trg."type" is distinct from tmp."type" or
-            trg.login is distinct from tmp.login or
-            trg.node_id is distinct from tmp.node_id or
-            trg.site_admin is distinct from tmp.site_admin or
-            trg.avatar_url is distinct from tmp.avatar_url or
-            trg.url is distinct from tmp.url or
-            trg.html_url is distinct from tmp.html_url or
-            trg.followers_url is distinct from tmp.followers_url or
-            trg.following_url is distinct from tmp.following_url or
-            trg.gists_url is distinct from tmp.gists_url or
-            trg.starred_url is distinct from tmp.starred_url or
-            trg.subscriptions_url is distinct from tmp.subscriptions_url or
-            trg.organizations_url is distinct from tmp.organizations_url or
-            trg.repos_url is distinct from tmp.repos_url or
-            trg.events_url is distinct from tmp.events_url or
-            trg.received_events_url is distinct from tmp.received_events_url or
-            trg.user_view_type is distinct from tmp.user_view_type or
-            trg.extracted_at_utc is distinct from tmp.extracted_at_utc
-                
-         )         
-    """
-
-    with engine.begin() as conn:
-        conn.execute(text(insert_sql))
-        conn.execute(text(update_sql))
+    with transaction(engine) as conn:
+        # only the staged columns are read (Parquet skips the others on disk)
+        staged = stage_landing_files(conn, landing_inputs(context, "dim_user"), dtype_map, tmp, key=["user_id"])
+        with current_metrics().timer("step_duration_seconds", step="merge"):
+            conn.execute(text(HASH_SESSION_SQL))
+            inserted, updated = conn.execute(text(upsert_sql)).one()
+    record_rows_written(staged, inserted, updated)
 
 
-def load_dim_label():
-    """Loading dim user table"""
+@instrumented("load", table="dim_label")
+@profiled(PROFILE_DIR)
+def load_dim_label(**context):
+    """Loading dim label table"""
 
     engine = get_engine()
-    df = pd.read_csv(CSV_PATH_DIM_LABEL)
+    tmp = staging_table("dim_label")
 
     dtype_map = {
         "label_id" : sqltypes.TEXT(),
@@ -172,17 +288,6 @@ def load_dim_label():
         "extracted_at_utc" : sqltypes.TIMESTAMP(timezone=True)
     }
 
-    df.to_sql(
-        name=TMP_TABLE,
-        schema=TARGET_SCHEMA,
-        con=engine,
-        if_exists="replace",
-        index=False,
-        method="multi",
-        chunksize=5000,
-        dtype=dtype_map,
-    )
-
     create_sql = f"""
     CREATE TABLE IF NOT EXISTS {TARGET_SCHEMA}.{TARGET_TABLE_LABEL} (
         label_id          TEXT PRIMARY KEY,
@@ -195,9 +300,8 @@ def load_dim_label():
     );
     """
 
-    truncate_sql = f"TRUNCATE TABLE {TARGET_SCHEMA}.{TARGET_TABLE_LABEL}; "
-
-    """Insert all records for dim_label"""
+    """Upsert records for dim_label. The landing file only holds the labels of the issues
+       changed since the last watermark, so a truncate + reload would drop the other labels """
 
     insert_sql_dim_label = f"""
 
@@ -206,22 +310,32 @@ def load_dim_label():
     )
 
     SELECT 
-          * 
+          tmp.label_id, tmp.label_name, tmp.label_color, tmp.is_default, tmp.label_description, tmp.extracted_at_utc
     FROM 
-          {TARGET_SCHEMA}.{TMP_TABLE} tmp ;
+          {tmp} tmp
+    ON CONFLICT (label_id) DO UPDATE
+    SET
+        label_name = excluded.label_name,
+        label_color = excluded.label_color,
+        is_default = excluded.is_default,
+        label_description = excluded.label_description,
+        extracted_at_utc = excluded.extracted_at_utc ;
 
     """
-    with engine.begin() as conn:
-        conn.execute(text(create_sql))
-        conn.execute(text(truncate_sql))
-        conn.execute(text(insert_sql_dim_label))
+    with transaction(engine) as conn:
+        stage_landing_files(conn, landing_inputs(context, "dim_label"), dtype_map, tmp, key=["label_id"])
+        with current_metrics().timer("step_duration_seconds", step="merge"):
+            conn.execute(text(create_sql))
+            conn.execute(text(insert_sql_dim_label))
 
 
-def load_dim_repo():
+@instrumented("load", table="dim_repo")
+@profiled(PROFILE_DIR)
+def load_dim_repo(**context):
     """Loading dim repo table"""
 
     engine = get_engine()
-    df = pd.read_csv(CSV_PATH_DIM_REPO)
+    tmp = staging_table("dim_repo")
 
     dtype_map = {
         "repo_id" : sqltypes.TEXT(),
@@ -243,18 +357,7 @@ def load_dim_repo():
         "open_issues_count" : sqltypes.INTEGER(),
         "extracted_at_utc" : sqltypes.TIMESTAMP(timezone=True)
     }
-
-    df.to_sql(
-        name=TMP_TABLE,
-        schema=TARGET_SCHEMA,
-        con=engine,
-        if_exists="replace",
-        index=False,
-        method="multi",
-        chunksize=5000,
-        dtype=dtype_map,
-    )
-    """Step 1 & 2: Create table is not exists and also delete it """
+    """Step 1: Create table if not exists """
 
     create_sql = f"""
     CREATE TABLE IF NOT EXISTS {TARGET_SCHEMA}.{TARGET_TABLE_REPO} (
@@ -279,10 +382,8 @@ def load_dim_repo():
     );
     """
 
-    truncate_sql = f"TRUNCATE TABLE {TARGET_SCHEMA}.{TARGET_TABLE_REPO};"
-
-
-    """Step 3 : Insert all records, if records already exist then insert new records """
+    """Step 2: Upsert records for dim_repo. A run can cover a subset of the repos and
+       load_dim_repo_scd2 reads this table next, so a truncate + reload would drop the others """
 
     insert_sql = f"""
 
@@ -293,21 +394,46 @@ def load_dim_repo():
     )
 
     SELECT 
-          tmp.*    
+          tmp.repo_id, tmp.repo_node_id, tmp."name", tmp.owner_user_id, tmp.private, tmp.fork, tmp.archived,
+          tmp.disabled, tmp.created_at, tmp.updated_at, tmp.pushed_at, tmp.default_branch, tmp."language",
+          tmp.stargazers_count, tmp.watchers_count, tmp.forks_count, tmp.open_issues_count, tmp.extracted_at_utc
     FROM 
-          {TARGET_SCHEMA}.{TMP_TABLE} tmp 
+          {tmp} tmp
+    ON CONFLICT (repo_id) DO UPDATE
+    SET
+        repo_node_id = excluded.repo_node_id,
+        "name" = excluded."name",
+        owner_user_id = excluded.owner_user_id,
+        private = excluded.private,
+        fork = excluded.fork,
+        archived = excluded.archived,
+        disabled = excluded.disabled,
+        created_at = excluded.created_at,
+        updated_at = excluded.updated_at,
+        pushed_at = excluded.pushed_at,
+        default_branch = excluded.default_branch,
+        "language" = excluded."language",
+        stargazers_count = excluded.stargazers_count,
+        watchers_count = excluded.watchers_count,
+        forks_count = excluded.forks_count,
+        open_issues_count = excluded.open_issues_count,
+        extracted_at_utc = excluded.extracted_at_utc ;
+
     """
 
-    with engine.begin() as conn:
-        conn.execute(text(create_sql))
-        conn.execute(text(truncate_sql))
-        conn.execute(text(insert_sql))      
+    with transaction(engine) as conn:
+        stage_landing_files(conn, landing_inputs(context, "dim_repo"), dtype_map, tmp, key=["repo_id"])
+        with current_metrics().timer("step_duration_seconds", step="merge"):
+            conn.execute(text(create_sql))
+            conn.execute(text(insert_sql))
 
-def load_fact_issues():
-    """Loading dim user table"""
+@instrumented("load", table="fact_issue")
+@profiled(PROFILE_DIR)
+def load_fact_issues(**context):
+    """Loading fact issue table"""
 
     engine = get_engine()
-    df = pd.read_csv(CSV_PATH_ISSUE_FACT)
+    tmp = staging_table("fact_issue")
 
     dtype_map = {
         "issue_id" : sqltypes.TEXT(),
@@ -331,95 +457,311 @@ def load_fact_issues():
         "extracted_at_utc" : sqltypes.TIMESTAMP(timezone=True)
     }
 
-    df.to_sql(
-        name=TMP_TABLE,
-        schema=TARGET_SCHEMA,
-        con=engine,
-        if_exists="replace",
-        index=False,
-        method="multi",
-        chunksize=5000,
-        dtype=dtype_map,
+    """Single upsert: new issues are inserted, existing ones are rewritten only when their row_hash
+       (every column but the key and extracted_at_utc) changed, unchanged rows cost one comparison """
+
+    upsert_sql = f"""
+
+    WITH written AS (
+        INSERT INTO {TARGET_SCHEMA}.{TARGET_TABLE_ISSUE_FACT} (
+            issue_id, issue_number, repo_full_name, repository_url, title, user_id, state, locked, assignee_count, label_count, milestone, comments, created_at, updated_at,
+            closed_at, events_url, api_url, state_reason, extracted_at_utc, row_hash
+        )
+
+        SELECT 
+              tmp.issue_id, tmp.issue_number, tmp.repo_full_name, tmp.repository_url, tmp.title, tmp.user_id, tmp.state, tmp.locked, tmp.assignee_count, tmp.label_count,
+              tmp.milestone, tmp.comments, tmp.created_at, tmp.updated_at, tmp.closed_at, tmp.events_url, tmp.api_url, tmp.state_reason, tmp.extracted_at_utc,
+              {row_hash_sql(dtype_map, key="issue_id")}
+        FROM 
+              {tmp} tmp
+        ON CONFLICT (issue_id) DO UPDATE
+        SET
+            issue_number = excluded.issue_number,
+            repo_full_name = excluded.repo_full_name,
+            repository_url = excluded.repository_url,
+            title = excluded.title,
+            user_id = excluded.user_id,
+            state = excluded.state,
+            locked = excluded.locked,
+            assignee_count = excluded.assignee_count,
+            label_count = excluded.label_count,
+            milestone = excluded.milestone,
+            comments = excluded.comments,
+            created_at = excluded.created_at,
+            updated_at = excluded.updated_at,
+            closed_at = excluded.closed_at,
+            events_url = excluded.events_url,
+            api_url = excluded.api_url,
+            state_reason = excluded.state_reason,
+            extracted_at_utc = excluded.extracted_at_utc,
+            row_hash = excluded.row_hash
+        WHERE {TARGET_TABLE_ISSUE_FACT}.row_hash IS DISTINCT FROM excluded.row_hash
+        RETURNING (xmax = 0) AS inserted
     )
+    SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) FROM written;
 
-    """Step 1 : Insert all records, if records already exist then insert new records """
+    """
 
-    insert_sql = f"""
+    with transaction(engine) as conn:
+        staged = stage_landing_files(conn, landing_inputs(context, "fact_issue"), dtype_map, tmp, key=["issue_id"])
+        with current_metrics().timer("step_duration_seconds", step="merge"):
+            conn.execute(text(HASH_SESSION_SQL))
+            inserted, updated = conn.execute(text(upsert_sql)).one()
+    record_rows_written(staged, inserted, updated)
 
-    INSERT INTO {TARGET_SCHEMA}.{TARGET_TABLE_ISSUE_FACT} (
-        issue_id, issue_number, repo_full_name, repository_url, title, user_id, state, locked, assignee_count, label_count, milestone, comments, created_at, updated_at,
-        closed_at, events_url, api_url, state_reason, extracted_at_utc
-        )
+@instrumented("load", table="fact_issue_comment")
+@profiled(PROFILE_DIR)
+def load_fact_issue_comments(**context):
+    """Loading fact issue comment table (incremental) and deriving fact_issue.first_response_at"""
+
+    engine = get_engine()
+    tmp = staging_table("fact_issue_comment")
+
+    dtype_map = {
+        "comment_id" : sqltypes.TEXT(),
+        "repo_full_name" : sqltypes.TEXT(),
+        "issue_number" : sqltypes.INTEGER(),
+        "user_id" : sqltypes.TEXT(),
+        "user_type" : sqltypes.TEXT(),
+        "author_association" : sqltypes.TEXT(),
+        "created_at" : sqltypes.TIMESTAMP(timezone=True),
+        "updated_at" : sqltypes.TIMESTAMP(timezone=True),
+        "extracted_at_utc" : sqltypes.TIMESTAMP(timezone=True)
+    }
+
+    create_sql = f"""
+    CREATE TABLE IF NOT EXISTS {TARGET_SCHEMA}.{TARGET_TABLE_ISSUE_COMMENT} (
+        comment_id          TEXT PRIMARY KEY,
+        repo_full_name      TEXT NOT NULL,
+        issue_number        INTEGER NOT NULL,
+        user_id             TEXT,
+        user_type           TEXT,
+        author_association  TEXT,
+        created_at          TIMESTAMPTZ NOT NULL,
+        updated_at          TIMESTAMPTZ,
+        extracted_at_utc    TIMESTAMPTZ NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS ix_{TARGET_TABLE_ISSUE_COMMENT}_issue
+        ON {TARGET_SCHEMA}.{TARGET_TABLE_ISSUE_COMMENT} (repo_full_name, issue_number, created_at);
+    """
+
+    """Step 1 : Upsert the comments changed since the last watermark """
+
+    upsert_sql = f"""
+
+    INSERT INTO {TARGET_SCHEMA}.{TARGET_TABLE_ISSUE_COMMENT} (
+        comment_id, repo_full_name, issue_number, user_id, user_type, author_association,
+        created_at, updated_at, extracted_at_utc
+    )
 
     SELECT 
-          tmp.issue_id, tmp.issue_number, tmp.repo_full_name, tmp.repository_url, tmp.title, tmp.user_id, tmp.state, tmp.locked, tmp.assignee_count, tmp.label_count,
-          tmp.milestone, tmp.comments, tmp.created_at, tmp.updated_at, tmp.closed_at, tmp.events_url, tmp.api_url, tmp.state_reason, tmp.extracted_at_utc
+          tmp.comment_id, tmp.repo_full_name, tmp.issue_number, tmp.user_id, tmp.user_type, tmp.author_association,
+          tmp.created_at, tmp.updated_at, tmp.extracted_at_utc
     FROM 
-          {TARGET_SCHEMA}.{TMP_TABLE} tmp 
-    LEFT JOIN 
-              {TARGET_SCHEMA}.{TARGET_TABLE_ISSUE_FACT} trg
-              on trg.issue_id = tmp.issue_id
-    WHERE 
-          trg.issue_id is null
-          ON CONFLICT (issue_id) DO NOTHING;
+          {tmp} tmp
+    ON CONFLICT (comment_id) DO UPDATE
+    SET
+        user_id = excluded.user_id,
+        user_type = excluded.user_type,
+        author_association = excluded.author_association,
+        updated_at = excluded.updated_at,
+        extracted_at_utc = excluded.extracted_at_utc
+    WHERE {TARGET_TABLE_ISSUE_COMMENT}.updated_at IS DISTINCT FROM excluded.updated_at;
 
     """
 
-    update_sql = f"""
-    
-    UPDATE {TARGET_SCHEMA}.{TARGET_TABLE_ISSUE_FACT} trg 
+    """Step 2 : first_response_at = first comment by someone other than the issue author (bots excluded),
+       computed in one grouped join for the issues touched by this batch and the ones still without a response """
+
+    first_response_sql = f"""
+
+    UPDATE {TARGET_SCHEMA}.{TARGET_TABLE_ISSUE_FACT} trg
     SET 
-        
-   
-        issue_number = tmp.issue_number,
-        repo_full_name = tmp.repo_full_name,
-        repository_url = tmp.repository_url,
-        title = tmp.title,
-        user_id = tmp.user_id,
-        state = tmp.state,
-        locked = tmp.locked,
-        assignee_count = tmp.assignee_count,
-        label_count = tmp.label_count,
-        milestone = tmp.milestone,
-        comments = tmp.comments,
-        created_at = tmp.created_at,
-        updated_at = tmp.updated_at,
-        closed_at = tmp.closed_at,
-        events_url = tmp.events_url,
-        api_url = tmp.api_url,
-        state_reason = tmp.state_reason,
-        extracted_at_utc = tmp.extracted_at_utc
-
-    FROM {TARGET_SCHEMA}.{TMP_TABLE} tmp
+        first_response_at = r.first_response_at
+    FROM (
+        SELECT 
+              f.issue_id, MIN(c.created_at) AS first_response_at
+        FROM 
+              {TARGET_SCHEMA}.{TARGET_TABLE_ISSUE_FACT} f
+        JOIN 
+              {TARGET_SCHEMA}.{TARGET_TABLE_ISSUE_COMMENT} c
+              on c.repo_full_name = f.repo_full_name and c.issue_number = f.issue_number
+        WHERE 
+              c.user_id IS DISTINCT FROM f.user_id
+          AND c.user_type IS DISTINCT FROM 'Bot'
+          AND (
+                f.first_response_at IS NULL
+                OR (f.repo_full_name, f.issue_number) IN (SELECT repo_full_name, issue_number FROM {tmp})
+              )
+        GROUP BY f.issue_id
+    ) r
     WHERE 
-          trg.issue_id = tmp.issue_id
-    AND 
-         (
-            trg.issue_number is distinct from tmp.issue_number or
-            trg.repo_full_name is distinct from tmp.repo_full_name or
-            trg.repository_url is distinct from tmp.repository_url or
-            trg.title is distinct from tmp.title or
-            trg.user_id is distinct from tmp.user_id or
-            trg.state is distinct from tmp.state or
-            trg.locked is distinct from tmp.locked or
-            trg.assignee_count is distinct from tmp.assignee_count or
-            trg.label_count is distinct from tmp.label_count or
-            trg.milestone is distinct from tmp.milestone or
-            trg.comments is distinct from tmp.comments or
-            trg.created_at is distinct from tmp.created_at or
-            trg.updated_at is distinct from tmp.updated_at or
-            trg.closed_at is distinct from tmp.closed_at or
-            trg.events_url is distinct from tmp.events_url or
-            trg.api_url is distinct from tmp.api_url or
-            trg.state_reason is distinct from tmp.state_reason or
-            trg.extracted_at_utc is distinct from tmp.extracted_at_utc          
-         )         
+          trg.issue_id = r.issue_id
+      AND trg.first_response_at IS DISTINCT FROM r.first_response_at;
+
     """
 
-    with engine.begin() as conn:
-        conn.execute(text(insert_sql))
-        conn.execute(text(update_sql))
+    with transaction(engine) as conn:
+        stage_landing_files(conn, landing_inputs(context, "fact_issue_comment"), dtype_map, tmp, key=["comment_id"])
+        with current_metrics().timer("step_duration_seconds", step="merge"):
+            conn.execute(text(create_sql))
+            conn.execute(text(upsert_sql))
+            conn.execute(text(first_response_sql))
+
+
+@instrumented("load", table="fact_issue_event")
+@profiled(PROFILE_DIR)
+def load_fact_issue_events(**context):
+    """Loading fact issue event table, events never change so new ids are appended"""
+
+    engine = get_engine()
+    tmp = staging_table("fact_issue_event")
 
+    dtype_map = {
+        "issue_id" : sqltypes.TEXT(),
+        "event_id" : sqltypes.BIGINT(),
+        "repo_full_name" : sqltypes.TEXT(),
+        "issue_number" : sqltypes.INTEGER(),
+        "event" : sqltypes.TEXT(),
+        "actor_id" : sqltypes.TEXT(),
+        "label_name" : sqltypes.TEXT(),
+        "state_reason" : sqltypes.TEXT(),
+        "created_at" : sqltypes.TIMESTAMP(timezone=True),
+        "extracted_at_utc" : sqltypes.TIMESTAMP(timezone=True)
+    }
+
+    create_sql = f"""
+    CREATE TABLE IF NOT EXISTS {TARGET_SCHEMA}.{TARGET_TABLE_ISSUE_EVENT} (
+        issue_id          TEXT NOT NULL,
+        event_id          BIGINT NOT NULL,
+        repo_full_name    TEXT NOT NULL,
+        issue_number      INTEGER NOT NULL,
+        event             TEXT NOT NULL,
+        actor_id          TEXT,
+        label_name        TEXT,
+        state_reason      TEXT,
+        created_at        TIMESTAMPTZ NOT NULL,
+        extracted_at_utc  TIMESTAMPTZ NOT NULL,
+        PRIMARY KEY (issue_id, event_id)
+    );
+
+    CREATE INDEX IF NOT EXISTS ix_{TARGET_TABLE_ISSUE_EVENT}_event
+        ON {TARGET_SCHEMA}.{TARGET_TABLE_ISSUE_EVENT} (event, created_at);
+    """
+
+    """Step 1 : Append new events (reopened / closed / labeled ... drive reopen rate and state churn) """
+
+    insert_sql = f"""
+
+    INSERT INTO {TARGET_SCHEMA}.{TARGET_TABLE_ISSUE_EVENT} (
+        issue_id, event_id, repo_full_name, issue_number, event, actor_id, label_name, state_reason,
+        created_at, extracted_at_utc
+    )
+
+    SELECT 
+          tmp.issue_id, tmp.event_id, tmp.repo_full_name, tmp.issue_number, tmp.event, tmp.actor_id,
+          tmp.label_name, tmp.state_reason, tmp.created_at, tmp.extracted_at_utc
+    FROM 
+          {tmp} tmp
+    ON CONFLICT (issue_id, event_id) DO NOTHING;
+
+    """
+
+    with transaction(engine) as conn:
+        stage_landing_files(conn, landing_inputs(context, "fact_issue_event"), dtype_map, tmp, key=["event_id"])
+        with current_metrics().timer("step_duration_seconds", step="merge"):
+            conn.execute(text(create_sql))
+            conn.execute(text(insert_sql))
+
+
+@instrumented("load", table="bridge_issue_label")
+@profiled(PROFILE_DIR)
+def load_bridge_issue_label(**context):
+    """
+    Loading the issue-label bridge (incremental): the landing files hold the complete label set
+    of every issue of the batch, so pairs are synced per issue, never truncated and reloaded.
+    Several pending landing runs are applied one at a time, oldest first, so a label removed in
+    a newer run is not brought back by the label set of an older one.
+    """
+
+    engine = get_engine()
+
+    dtype_map = {
+        "issue_id" : sqltypes.TEXT(),
+        "label_id" : sqltypes.TEXT(),
+        "extracted_at_utc" : sqltypes.TIMESTAMP(timezone=True)
+    }
+    batch_dtype_map = {"issue_id" : sqltypes.TEXT()}
+
+    bridge_runs = landing_inputs_by_run(context, "bridge_issue_label")
+    batch_runs = dict(landing_inputs_by_run(context, "fact_issue"))
+
+    create_sql = f"""
+    CREATE TABLE IF NOT EXISTS {TARGET_SCHEMA}.{TARGET_TABLE_BRIDGE_ISSUE_LABEL} (
+        issue_id          TEXT NOT NULL,
+        label_id          TEXT NOT NULL,
+        extracted_at_utc  TIMESTAMPTZ NOT NULL,
+        PRIMARY KEY (issue_id, label_id)
+    );
+
+    CREATE INDEX IF NOT EXISTS ix_{TARGET_TABLE_BRIDGE_ISSUE_LABEL}_label
+        ON {TARGET_SCHEMA}.{TARGET_TABLE_BRIDGE_ISSUE_LABEL} (label_id, issue_id);
+    """
+
+    """Step 1 : Delete the pairs of the batch's issues whose label was removed. The batch is every
+       issue of the fact_issue input: an issue whose last label was removed has no bridge row left """
+
+    delete_sql = """
+
+    DELETE FROM {target} trg
+    USING {batch} b
+    WHERE 
+          trg.issue_id = b.issue_id
+      AND NOT EXISTS (
+            SELECT 1 FROM {tmp} tmp WHERE tmp.issue_id = trg.issue_id AND tmp.label_id = trg.label_id
+          );
+
+    """
+
+    """Step 2 : Insert the new pairs, existing pairs are left untouched """
+
+    insert_sql = """
+
+    INSERT INTO {target} (
+        issue_id, label_id, extracted_at_utc
+    )
+
+    SELECT 
+          tmp.issue_id, tmp.label_id, tmp.extracted_at_utc
+    FROM 
+          {tmp} tmp
+    ON CONFLICT (issue_id, label_id) DO NOTHING;
+
+    """
+
+    target = f"{TARGET_SCHEMA}.{TARGET_TABLE_BRIDGE_ISSUE_LABEL}"
+    staged = inserted = deleted = 0
+    with transaction(engine) as conn:
+        conn.execute(text(create_sql))
+        # every run gets its own TEMP tables, they all live until the one commit
+        for i, (run_id, paths) in enumerate(bridge_runs):
+            tmp = staging_table(f"bridge_issue_label_{i}")
+            batch = staging_table(f"bridge_issue_label_batch_{i}")
+            staged += stage_landing_files(conn, paths, dtype_map, tmp, key=["issue_id", "label_id"])
+            stage_landing_files(conn, batch_runs[run_id], batch_dtype_map, batch, key=["issue_id"])
+            with current_metrics().timer("step_duration_seconds", step="merge"):
+                deleted += conn.execute(text(delete_sql.format(target=target, batch=batch, tmp=tmp))).rowcount
+                inserted += conn.execute(text(insert_sql.format(target=target, tmp=tmp))).rowcount
+
+    metrics = current_metrics()
+    metrics.incr("rows_inserted", inserted)
+    metrics.incr("rows_deleted", deleted)
+    print(f"Staged {staged} issue-label pairs of {len(bridge_runs)} landing runs: {inserted} inserted, {deleted} removed")
+
+
+@instrumented("load", table="dim_repo_scd2")
+@profiled(PROFILE_DIR)
 def load_dim_repo_scd2():
     """SCD2 for repo based on changes in name, private, language, watchers_count, forks_count, open_issues_count,stargazers_count"""
 
@@ -474,19 +816,12 @@ def load_dim_repo_scd2():
 
     """
 
-    with engine.begin() as conn:
+    with current_metrics().timer("step_duration_seconds", step="merge"), transaction(engine) as conn:
         conn.execute(text(close_sql))
         conn.execute(text(insert_sql))
 
 
 
-def drop_tmp_table():
-
-    engine = get_engine()
-
-    with engine.begin() as conn:
-        conn.execute(text(f"DROP TABLE IF EXISTS {TARGET_SCHEMA}.{TMP_TABLE};"))
-
 with DAG(
     dag_id="github-great-expectations-package-api-etl-02",
     start_date=datetime(2026, 1, 1),
@@ -494,11 +829,21 @@ with DAG(
     catchup=False,
     tags=["github-great-expectations-package","staging", "postgres", "differential", "two-step"],
 ) as dag:
+    t0 = PythonOperator(task_id=RESOLVE_TASK_ID, python_callable=resolve_landing_run)
+    t0m = PythonOperator(task_id="migrate_target_tables", python_callable=migrate_target_tables)
     t1 = PythonOperator(task_id="create_dim_user", python_callable=load_dim_user)
     t2 = PythonOperator(task_id="create_dim_label", python_callable=load_dim_label)
     t3 = PythonOperator(task_id="create_dim_repo", python_callable=load_dim_repo)
     t4 = PythonOperator(task_id="create_fact_issues", python_callable=load_fact_issues)
+    t4b = PythonOperator(task_id="create_fact_issue_comments", python_callable=load_fact_issue_comments)
+    t4c = PythonOperator(task_id="create_fact_issue_events", python_callable=load_fact_issue_events)
+    t4d = PythonOperator(task_id="create_bridge_issue_label", python_callable=load_bridge_issue_label)
     t5 = PythonOperator(task_id="create_update_repo_scd2", python_callable=load_dim_repo_scd2)
-    t6 = PythonOperator(task_id="delete_tmp_table", python_callable=drop_tmp_table)        
-
-    t1 >> t2 >> t3 >> t4 >> t5 >> t6
\ No newline at end of file
+    t7 = PythonOperator(task_id="mark_landing_runs_loaded", python_callable=mark_runs_loaded)
+
+    # every load stages into its own TEMP table, so only real data dependencies order them:
+    # scd2 reads dim_repo, first_response_at of the comment load updates fact_issue
+    t0 >> t0m >> [t1, t2, t3, t4, t4c, t4d]
+    t3 >> t5
+    t4 >> t4b
+    [t1, t2, t4b, t4c, t4d, t5] >> t7
\ No newline at end of file
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import os
+from datetime import date, datetime
+from pathlib import Path
+
+from airflow.decorators import dag, task
+from airflow.operators.python import get_current_context
+
+from github_compaction import (
+    DEFAULT_LANDING_RETENTION_DAYS,
+    DEFAULT_RAW_RETENTION_DAYS,
+    HISTORY_DIR_NAME,
+    apply_retention,
+    compact_landing,
+    rebuild_snapshot,
+)
+
+# --- Config -----
+
+LANDING_DIR = Path("/opt/spark-apps/git-great-expectations-package-etl/landing-input")
+REBUILD_DIR = LANDING_DIR / "_rebuilt"
+
+LANDING_RETENTION_DAYS = int(os.getenv("GITHUB_LANDING_RETENTION_DAYS", str(DEFAULT_LANDING_RETENTION_DAYS)))
+RAW_RETENTION_DAYS = int(os.getenv("GITHUB_RAW_RETENTION_DAYS", str(DEFAULT_RAW_RETENTION_DAYS)))
+
+
+@dag(
+    dag_id="github-great-expectations-package-landing-compaction-03",
+    description="Compact daily landing snapshots into a change-only history and apply retention.",
+    start_date=datetime(2026, 1, 1),
+    schedule="@daily",
+    catchup=False,
+    max_active_runs=1,
+    params={
+        "landing_retention_days": LANDING_RETENTION_DAYS,   # compacted daily table files kept this long
+        "raw_retention_days": RAW_RETENTION_DAYS,           # github_issues_raw_* dumps kept this long
+        "rebuild_date": None,                               # "YYYY-MM-DD" to rebuild full snapshots of that day
+        "rebuild_tables": None,                             # e.g. ["github_issue_fact"], default all tables
+    },
+    tags=["github-great-expectations-package", "landing", "maintenance"]
+)
+
+def github_great_expectations_landing_compaction():
+
+    @task
+    def t_compact_landing() -> dict:
+        return compact_landing(LANDING_DIR)
+
+    @task
+    def t_apply_retention(compacted: dict) -> int:
+        run_params = get_current_context()["params"]
+        # only table files that are in the history are ever deleted, so this runs after compaction;
+        # delta files only need their run to be loaded by DAG 02
+        deleted = apply_retention(
+            LANDING_DIR,
+            landing_retention_days=int(run_params.get("landing_retention_days", LANDING_RETENTION_DAYS)),
+            raw_retention_days=int(run_params.get("raw_retention_days", RAW_RETENTION_DAYS)),
+        )
+        print(f"Deleted {len(deleted)} files: {deleted}")
+        return len(deleted)
+
+    @task
+    def t_rebuild_snapshot(compacted: dict) -> list:
+        run_params = get_current_context()["params"]
+        if not run_params.get("rebuild_date"):
+            print("No rebuild_date given, nothing to rebuild")
+            return []
+
+        day = date.fromisoformat(run_params["rebuild_date"])
+        tables = run_params.get("rebuild_tables") or sorted(
+            p.name for p in (LANDING_DIR / HISTORY_DIR_NAME).glob("*") if p.is_dir()
+        )
+        REBUILD_DIR.mkdir(parents=True, exist_ok=True)
+
+        written = []
+        for prefix in tables:
+            out = REBUILD_DIR / f"{prefix}_{day.isoformat()}.csv"
+            rebuild_snapshot(LANDING_DIR, prefix, day, out=out)
+            written.append(str(out))
+        return written
+
+    compacted = t_compact_landing()
+    t_apply_retention(compacted)
+    t_rebuild_snapshot(compacted)
+
+
+github_great_expectations_landing_compaction()
+
+
+
+
+# Compaction keeps the landing area from growing one full copy of every table per day.
+# history/<table prefix>/<repo partition>/snapshot_date=YYYY-MM-DD.csv.gz holds only the rows that were new or changed that day
+# (plus issue/label pairs removed from an issue), so replaying the history up to a day rebuilds the full snapshot of that day.
+# checkpoint_date=YYYY-MM-DD.csv.gz next to it is the state after the last compacted day, each run starts from it.
+#
+# daily landing files → compact_landing() → change-only history → apply_retention() deletes the old daily / delta / raw files
+#                                                               → rebuild_snapshot() on demand (trigger with {"rebuild_date": ...})
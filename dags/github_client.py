@@ -0,0 +1,413 @@
+"""
+github_client.py
+
+Shared HTTP client for every GitHub REST call made by the project (the extraction DAG and
+api-data-exploration.py).
+
+What it does:
+- Keeps one pooled requests.Session (keep-alive, connection reuse across pages and threads)
+- Retries 5xx / 429 / connection errors with exponential backoff and full jitter
+- Reads X-RateLimit-Remaining / X-RateLimit-Reset and sleeps until the reset when the
+  budget is spent, instead of failing the run halfway through pagination
+- Honours Retry-After and GitHub's secondary rate limits (403 with Retry-After or the
+  "secondary rate limit" message)
+- Walks paginated listings, either sequentially (rel="next") or concurrently over the
+  rel="last" page range
+- Optionally sends If-None-Match / If-Modified-Since from a GitHubHTTPCache and serves the
+  cached body on 304 (304s do not count against the rate limit)
+- Counts requests, retries, throttled seconds and bytes for the current run (client.stats),
+  and times every request into the task's metrics when given one (github_metrics)
+- Decodes bodies with github_records.loads (orjson when installed)
+- Talks to GITHUB_API_BASE_URL when set (e.g. the local stand-in in tools/github_stand_in.py)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from dataclasses import asdict, dataclass
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from github_http_cache import GitHubHTTPCache
+from github_records import loads
+
+# ----------------------------
+# Config
+# ----------------------------
+# a local stand-in (tools/github_stand_in.py) or GitHub Enterprise can be used without code changes
+BASE_URL = os.getenv("GITHUB_API_BASE_URL", "https://api.github.com")
+API_VERSION = "2022-11-28"
+
+DEFAULT_TIMEOUT = 30
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+SECONDARY_LIMIT_WAIT_SECONDS = 60.0    # GitHub asks to wait at least a minute without Retry-After
+MAX_THROTTLE_WAIT_SECONDS = 3700.0     # primary limit resets hourly, never sleep longer than that
+POOL_SIZE = 16
+RATE_LIMIT_RESERVE = 50                # below it a page fan-out goes one page at a time
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger("airflow.task")
+
+
+# ----------------------------
+# Link header helpers
+# ----------------------------
+# Link header example : <https://api.github.com/repositories/103071520/issues?per_page=50&page=2>; rel="next",
+#                       <https://api.github.com/repositories/103071520/issues?per_page=50&page=34>; rel="last"
+
+def get_next_link(link_header: str | None) -> str | None:
+    """URL of the rel="next" link, None on the last page."""
+    if not link_header:
+        return None
+
+    for part in link_header.split(","):
+        if 'rel="next"' in part:
+            url = part.split(";")[0].strip()
+            return url.strip("<>")
+
+    return None
+
+
+def get_last_page(link_header: str | None) -> int | None:
+    """Page number of the rel="last" link, None if the response is not page-numbered."""
+    if not link_header:
+        return None
+
+    for part in link_header.split(","):
+        if 'rel="last"' in part:
+            url = part.split(";")[0].strip().strip("<>")
+            page = parse_qs(urlsplit(url).query).get("page")
+            return int(page[0]) if page else None
+
+    return None
+
+
+def build_page_url(url: str, params: dict | None, page: int) -> str:
+    """Absolute URL for one page of a page-numbered listing."""
+    query = dict(params or {})
+    query["page"] = page
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+# ----------------------------
+# Client
+# ----------------------------
+@dataclass
+class ClientStats:
+    """Per-run counters, logged by the tasks at the end of every extraction."""
+
+    requests: int = 0
+    retries: int = 0
+    throttled_seconds: float = 0.0
+    bytes_received: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class GitHubRateLimitError(requests.exceptions.HTTPError):
+    """Raised when the rate limit would force a wait longer than MAX_THROTTLE_WAIT_SECONDS."""
+
+
+class GitHubClient:
+    """
+    Thin wrapper around a pooled requests.Session.
+
+    One client is meant to be created per task run, so `stats` describes that run. The
+    session is safe to share between the threads of a concurrent page fan-out.
+
+    The rate limit belongs to the token, so tasks running side by side (e.g. mapped per-repo
+    tasks) all see the same X-RateLimit-Remaining. budget_share limits how much of it a
+    single fan-out may plan to spend.
+    """
+
+    def __init__(
+        self,
+        token: str | None,
+        base_url: str = BASE_URL,
+        timeout: int = DEFAULT_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        pool_size: int = POOL_SIZE,
+        cache: GitHubHTTPCache | None = None,
+        budget_share: float = 1.0,
+        metrics=None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache
+        self.budget_share = budget_share        # fraction of the token's budget this client may plan with
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.stats = ClientStats()
+        self.metrics = metrics                  # github_metrics.TaskMetrics, request durations by status
+
+        self.rate_limit_remaining: int | None = None
+        self.rate_limit_reset: float | None = None
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": API_VERSION,
+            "User-Agent": "ronyinc-github-analytics-etl",
+        })
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _sleep(self, seconds: float, reason: str) -> None:
+        if seconds > MAX_THROTTLE_WAIT_SECONDS:
+            raise GitHubRateLimitError(f"Refusing to wait {seconds:.0f}s for {reason}")
+        logger.warning("GitHub throttling (%s), sleeping %.1fs", reason, seconds)
+        with self._lock:
+            self.stats.throttled_seconds += seconds
+        time.sleep(seconds)
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        cap = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def _update_rate_limit(self, response: requests.Response) -> None:
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        with self._lock:
+            if remaining is not None:
+                self.rate_limit_remaining = int(remaining)
+            if reset is not None:
+                self.rate_limit_reset = float(reset)
+
+    def _wait_for_budget(self) -> None:
+        """Sleep until the reset if the last response said the budget is spent."""
+        with self._lock:
+            remaining, reset = self.rate_limit_remaining, self.rate_limit_reset
+        if remaining is not None and remaining <= 0 and reset is not None:
+            wait = reset - time.time() + 1
+            if wait > 0:
+                self._sleep(wait, "rate limit budget exhausted")
+            with self._lock:
+                self.rate_limit_remaining = None
+
+    def _budget_workers(self, workers: int) -> int:
+        """
+        Pages a fan-out may have in flight: `workers`, capped by this client's share of the
+        remaining budget (minus RATE_LIMIT_RESERVE), never below one page at a time.
+        """
+        with self._lock:
+            remaining = self.rate_limit_remaining
+        if remaining is None:
+            return workers
+        return max(1, min(workers, int(remaining * self.budget_share) - RATE_LIMIT_RESERVE))
+
+    def _throttle_wait(self, response: requests.Response) -> float | None:
+        """
+        Seconds to wait for a rate-limited response, None if the response is not throttled.
+
+        - Retry-After (secondary limits, abuse detection, 429)
+        - X-RateLimit-Remaining: 0 (primary limit) -> until X-RateLimit-Reset
+        - 403 mentioning the secondary rate limit without Retry-After -> one minute
+        """
+        if response.status_code not in (403, 429):
+            return None
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            return float(retry_after)
+
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = float(response.headers.get("X-RateLimit-Reset", time.time()))
+            return max(reset - time.time(), 0) + 1
+
+        if response.status_code == 403 and "secondary rate limit" in response.text.lower():
+            return SECONDARY_LIMIT_WAIT_SECONDS
+
+        return None
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: dict | None = None,
+        json: dict | None = None,
+        headers: dict | None = None,
+    ) -> requests.Response:
+        """
+        Send a request with retries. Raises requests.HTTPError for non-retryable responses,
+        or once max_retries is used up.
+
+        With a cache attached, GETs are made conditional and a 304 is answered with the
+        cached body.
+        """
+        attempt = 0
+        entry = None
+        use_cache = self.cache is not None and method == "GET"
+
+        if use_cache:
+            # the cache is keyed by the full URL, so resolve the params into it once
+            url = requests.Request("GET", url, params=params).prepare().url
+            params = None
+            entry = self.cache.lookup(url)
+            headers = {**(headers or {}), **GitHubHTTPCache.conditional_headers(entry)}
+
+        while True:
+            self._wait_for_budget()
+
+            start = time.perf_counter()
+            try:
+                response = self.session.request(
+                    method, url, params=params, json=json, headers=headers, timeout=self.timeout
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                with self._lock:
+                    self.stats.requests += 1
+                if attempt >= self.max_retries:
+                    raise e
+                attempt += 1
+                with self._lock:
+                    self.stats.retries += 1
+                delay = self._backoff(attempt)
+                logger.warning("GitHub request error %s, retry %s in %.1fs", e, attempt, delay)
+                time.sleep(delay)
+                continue
+
+            with self._lock:
+                self.stats.requests += 1
+                self.stats.bytes_received += len(response.content)
+            if self.metrics is not None:
+                self.metrics.observe("github_request_duration_seconds", time.perf_counter() - start,
+                                     method=method, status=response.status_code)
+            self._update_rate_limit(response)
+
+            if use_cache and response.status_code == 304 and entry is not None:
+                return self.cache.as_response(entry, url)
+
+            throttle = self._throttle_wait(response)
+            if throttle is None and response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+                if use_cache:
+                    self.cache.store(url, response)
+                return response
+
+            if attempt >= self.max_retries:
+                response.raise_for_status()
+
+            attempt += 1
+            with self._lock:
+                self.stats.retries += 1
+
+            if throttle is not None:
+                self._sleep(throttle, f"HTTP {response.status_code}")
+            else:
+                delay = self._backoff(attempt)
+                logger.warning("GitHub HTTP %s on %s, retry %s in %.1fs", response.status_code, url, attempt, delay)
+                time.sleep(delay)
+
+    def get(self, url: str, params: dict | None = None, headers: dict | None = None) -> requests.Response:
+        return self.request("GET", url, params=params, headers=headers)
+
+    def get_json(self, url: str, params: dict | None = None):
+        return loads(self.get(url, params=params).content)
+
+    def post_json(self, url: str, payload: dict):
+        return loads(self.request("POST", url, json=payload).content)
+
+    def iter_pages(self, url: str, params: dict | None = None, concurrency: int = 1):
+        """
+        Yield the JSON payload of every page of a listing, in page order.
+
+        With concurrency > 1 and a page-numbered listing (rel="last" present), pages
+        2..last are fetched on a bounded thread pool with at most `concurrency` pages in
+        flight, fewer when the budget share runs low (see _budget_workers). Cursor-paginated
+        listings fall back to walking rel="next".
+        """
+        response = self.get(url, params=params)
+        yield loads(response.content)
+
+        last_page = get_last_page(response.headers.get("Link"))
+
+        if concurrency > 1 and last_page and last_page > 1:
+            workers = min(concurrency, last_page - 1)
+            page_urls = [build_page_url(url, params, page) for page in range(2, last_page + 1)]
+            logger.info("Fetching pages 2..%s with up to %s workers (%s allowed by the rate-limit budget)",
+                        last_page, workers, self._budget_workers(workers))
+
+            # at most `workers` pages are in flight or waiting for the consumer: a new request is
+            # only submitted once the oldest page was yielded, so pages come back in order and a
+            # slow consumer never lets fetched pages pile up in memory. The window also shrinks
+            # with the budget share, down to one page at a time, where request() sleeps until the
+            # reset once the budget is spent instead of failing the listing halfway
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                next_urls = iter(page_urls)
+
+                def fill() -> None:
+                    while len(pending) < self._budget_workers(workers):
+                        page_url = next(next_urls, None)
+                        if page_url is None:
+                            return
+                        pending.append(pool.submit(self.get, page_url))
+
+                try:
+                    fill()
+                    while pending:
+                        page_response = pending.popleft().result()
+                        fill()
+                        yield loads(page_response.content)
+                finally:
+                    for future in pending:      # consumer stopped early or a page failed
+                        future.cancel()
+            return
+
+        url = get_next_link(response.headers.get("Link"))
+        while url:
+            response = self.get(url)
+            yield loads(response.content)
+            url = get_next_link(response.headers.get("Link"))
+
+    def log_stats(self, label: str = "GitHub") -> dict:
+        stats = self.stats.as_dict()
+        logger.info(
+            "%s client stats: requests=%s retries=%s throttled_seconds=%.1f bytes=%s rate_limit_remaining=%s",
+            label, stats["requests"], stats["retries"], stats["throttled_seconds"], stats["bytes_received"],
+            self.rate_limit_remaining,
+        )
+        if self.metrics is not None:
+            from github_metrics import record_client_stats
+
+            record_client_stats(self.metrics, self)
+        if self.cache is not None:
+            cache_stats = self.cache.stats.as_dict()
+            logger.info(
+                "%s HTTP cache: hits=%s misses=%s stores=%s evictions=%s",
+                label, cache_stats["hits"], cache_stats["misses"], cache_stats["stores"], cache_stats["evictions"],
+            )
+            stats["cache"] = cache_stats
+        return stats
+
+    def close(self) -> None:
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,383 @@
+"""
+github_compaction.py
+
+Compaction and retention of the landing area.
+
+DAG 01 writes one file per table per run (<prefix>_<date>__<run id>, older areas hold one
+<prefix>_<date> file per day) and most rows are the same from one day to the next.
+Compaction folds those snapshots into a date-partitioned history that keeps only the rows
+that changed on each day; the runs of one day are applied in the order they were written:
+
+    history/<table prefix>/<repo partition>/snapshot_date=YYYY-MM-DD.csv.gz
+
+Every history file holds the rows that were new or changed that day (_op = "U"), and for
+the issue / label bridge the pairs removed from issues seen that day (_op = "D"). Replaying
+the history up to a date gives back the full snapshot of that day.
+
+Next to the history, every table / partition keeps a checkpoint of the folded state after
+its last compacted day:
+
+    history/<table prefix>/<repo partition>/checkpoint_date=YYYY-MM-DD.csv.gz
+
+so a run only applies the days compacted since then instead of replaying the whole
+history. Only the newest checkpoint is kept; a snapshot of an earlier day is replayed
+from the first history file.
+
+What it does:
+- compact_landing() -> fold every not yet compacted daily file into the history
+- apply_retention() -> delete compacted daily files and raw issue dumps past their retention,
+  the newest file of every table / repo and every file of a run DAG 02 has not loaded yet
+  (see github_manifest.pending_files) are always kept; the row-hash delta files
+  (<prefix>_delta_<date>) are not compacted, the full files hold their rows, and go once
+  DAG 02 loaded their run and they are past the landing retention
+- rebuild_snapshot() -> full snapshot of one table on any compacted day
+
+Rows are compared on every column except extracted_at_utc, as text.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from github_landing import repo_partitions
+from github_manifest import pending_files
+
+# ----------------------------
+# Config
+# ----------------------------
+HISTORY_DIR_NAME = "history"
+FLAT_PARTITION = "_flat"                    # files written before the repo partitions existed
+OP_COLUMN = "_op"
+IGNORED_COLUMNS = ["extracted_at_utc"]
+
+TABLE_KEYS = {
+    "github_dim_user": ["user_id"],
+    "github_dim_repo": ["repo_id"],
+    "github_issue_label_dim": ["label_id"],
+    "github_issue_fact": ["issue_id"],
+    "github_issue_label_bridge": ["issue_id", "label_id"],
+    "github_issue_comment_fact": ["comment_id"],
+    "github_issue_event_fact": ["event_id"],
+}
+# the bridge of an issue is complete in every file that has the issue in its fact table,
+# so pairs missing for those issues were removed on GitHub
+BRIDGE_PREFIX = "github_issue_label_bridge"
+BRIDGE_SCOPE_PREFIX = "github_issue_fact"
+
+DELTA_SUFFIX = "_delta"                     # <prefix>_delta_<date>: changed rows only, for DAG 02
+RAW_PREFIX = "github_issues_raw"
+DEFAULT_LANDING_RETENTION_DAYS = 7
+DEFAULT_RAW_RETENTION_DAYS = 30
+
+# the run id part (see github_landing.landing_file_name) is missing from files landed before it
+DAILY_FILE_RE = re.compile(r"^(?P<prefix>[a-z_]+)_(?P<day>\d{4}-\d{2}-\d{2})(__(?P<run>[A-Za-z0-9_.-]+))?\.(csv|parquet)$")
+RAW_FILE_RE = re.compile(
+    rf"^{RAW_PREFIX}_(?P<day>\d{{4}}-\d{{2}}-\d{{2}})(__(?P<run>[A-Za-z0-9_.-]+))?\.(json|ndjson)(\.gz|\.zst)?$"
+)
+HISTORY_FILE_RE = re.compile(r"^snapshot_date=(?P<day>\d{4}-\d{2}-\d{2})\.csv\.gz$")
+CHECKPOINT_FILE_RE = re.compile(r"^checkpoint_date=(?P<day>\d{4}-\d{2}-\d{2})\.csv\.gz$")
+
+logger = logging.getLogger("airflow.task")
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def _locations(landing_dir: Path) -> dict:
+    """partition name -> directory holding daily files."""
+    locations = {FLAT_PARTITION: Path(landing_dir)}
+    locations.update({p.name: p for p in repo_partitions(landing_dir)})
+    return locations
+
+
+def _daily_files(directory: Path) -> dict:
+    """{prefix: {day: {run: path}}} of the table files in one directory, the runs of a day oldest first."""
+    found = []
+    for path in directory.iterdir():
+        match = DAILY_FILE_RE.match(path.name)
+        if match and match["prefix"] in TABLE_KEYS:
+            found.append((path.stat().st_mtime_ns, match, path))
+
+    files = {}
+    for _, match, path in sorted(found, key=lambda f: f[0]):
+        day = date.fromisoformat(match["day"])
+        files.setdefault(match["prefix"], {}).setdefault(day, {})[match["run"] or ""] = path
+    return files
+
+
+def _delta_files(directory: Path) -> list:
+    """[(day, path)] of the row-hash delta files of the known tables in one directory."""
+    files = []
+    for path in directory.iterdir():
+        match = DAILY_FILE_RE.match(path.name)
+        if match and match["prefix"].endswith(DELTA_SUFFIX) and match["prefix"][:-len(DELTA_SUFFIX)] in TABLE_KEYS:
+            files.append((date.fromisoformat(match["day"]), path))
+    return files
+
+
+def _history_dir(landing_dir: Path, prefix: str, partition: str) -> Path:
+    return Path(landing_dir) / HISTORY_DIR_NAME / prefix / partition
+
+
+def _history_files(landing_dir: Path, prefix: str, partition: str) -> dict:
+    directory = _history_dir(landing_dir, prefix, partition)
+    if not directory.exists():
+        return {}
+    files = {}
+    for path in directory.iterdir():
+        match = HISTORY_FILE_RE.match(path.name)
+        if match:
+            files[date.fromisoformat(match["day"])] = path
+    return files
+
+
+def _checkpoint(landing_dir: Path, prefix: str, partition: str) -> tuple:
+    """(day, path) of the newest checkpoint of one table / partition, (None, None) without one."""
+    directory = _history_dir(landing_dir, prefix, partition)
+    if not directory.exists():
+        return None, None
+    found = []
+    for path in directory.iterdir():
+        match = CHECKPOINT_FILE_RE.match(path.name)
+        if match:
+            found.append((date.fromisoformat(match["day"]), path))
+    return max(found) if found else (None, None)
+
+
+def _write_checkpoint(landing_dir: Path, prefix: str, partition: str, state: pd.DataFrame, day: date) -> None:
+    """Replace the checkpoint of one table / partition with the state after `day`."""
+    if state.columns.empty:
+        return                              # nothing compacted but empty files, the replay is free
+    out_dir = _history_dir(landing_dir, prefix, partition)
+    tmp = out_dir / f".checkpoint_date={day.isoformat()}.csv.gz.tmp"
+    state.to_csv(tmp, index=False, compression="gzip")
+    path = tmp.replace(out_dir / f"checkpoint_date={day.isoformat()}.csv.gz")
+
+    for old in out_dir.iterdir():
+        if CHECKPOINT_FILE_RE.match(old.name) and old != path:
+            old.unlink()
+
+
+def _read_text_frame(path: Path) -> pd.DataFrame:
+    """Landing or history file with every value as text, missing values as ""."""
+    if path.name.endswith(".parquet"):
+        from github_parquet import read_parquet     # pyarrow is only needed for Parquet
+
+        df = read_parquet(path)
+        return df.astype(object).where(df.notna(), "").astype(str)
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def _row_hashes(df: pd.DataFrame, columns: list) -> pd.Series:
+    return pd.util.hash_pandas_object(df[columns], index=False)
+
+
+def _apply(state: pd.DataFrame, changes: pd.DataFrame, keys: list) -> pd.DataFrame:
+    """Replay one history file on top of a snapshot."""
+    if changes.empty:
+        return state
+    touched = pd.MultiIndex.from_frame(changes[keys])
+    if not state.empty:
+        state = state[~pd.MultiIndex.from_frame(state[keys]).isin(touched)]
+    upserts = changes[changes[OP_COLUMN] == "U"].drop(columns=[OP_COLUMN])
+    return pd.concat([state, upserts], ignore_index=True)
+
+
+def _replay(landing_dir: Path, prefix: str, partition: str, until: date | None = None) -> tuple:
+    """
+    (snapshot, last compacted day) from the history of one table / partition: the checkpoint
+    when it is not past `until`, plus the history files after it.
+    """
+    keys = TABLE_KEYS[prefix]
+    state = pd.DataFrame()
+    last_day = None
+
+    checkpoint_day, checkpoint_path = _checkpoint(landing_dir, prefix, partition)
+    if checkpoint_day is not None and (until is None or checkpoint_day <= until):
+        state = _read_text_frame(checkpoint_path)
+        last_day = checkpoint_day
+
+    for day, path in sorted(_history_files(landing_dir, prefix, partition).items()):
+        if last_day is not None and day <= last_day:
+            continue
+        if until is not None and day > until:
+            break
+        state = _apply(state, _read_text_frame(path), keys)
+        last_day = day
+    return state, last_day
+
+
+def _changes(state: pd.DataFrame, daily: pd.DataFrame, keys: list, scope_ids: set | None) -> pd.DataFrame:
+    """Rows of `daily` that are new or differ from `state`, plus bridge deletions."""
+    daily = daily.drop_duplicates(subset=keys)
+    columns = list(dict.fromkeys(list(state.columns) + list(daily.columns)))
+    state = state.reindex(columns=columns, fill_value="")
+    daily = daily.reindex(columns=columns, fill_value="")
+    compared = [c for c in columns if c not in IGNORED_COLUMNS]
+
+    state_index = pd.MultiIndex.from_frame(state[keys])
+    daily_index = pd.MultiIndex.from_frame(daily[keys])
+    previous = pd.Series(_row_hashes(state, compared).values, index=state_index)
+    current = _row_hashes(daily, compared).values
+
+    known = daily_index.isin(state_index)
+    changed = ~known
+    changed[known] = previous.reindex(daily_index[known]).values != current[known]
+    upserts = daily[changed].assign(**{OP_COLUMN: "U"})
+
+    if scope_ids is None:
+        return upserts
+
+    removed = state[state["issue_id"].isin(scope_ids) & ~state_index.isin(daily_index)]
+    return pd.concat([upserts, removed.assign(**{OP_COLUMN: "D"})], ignore_index=True)
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+def compact_landing(landing_dir: Path) -> dict:
+    """
+    Fold every daily file newer than the last compacted day into the history.
+    Returns {"<prefix>/<partition>": {"days": n, "upserts": n, "deletes": n}}.
+    """
+    summary = {}
+
+    for partition, directory in _locations(landing_dir).items():
+        daily_files = _daily_files(directory)
+
+        for prefix, files in sorted(daily_files.items()):
+            keys = TABLE_KEYS[prefix]
+            state, last_day = _replay(landing_dir, prefix, partition)
+            pending = sorted(day for day in files if last_day is None or day > last_day)
+            late = [day for day in files if last_day is not None and day < last_day
+                    and day not in _history_files(landing_dir, prefix, partition)]
+            if late:
+                logger.warning("%s/%s: files older than the history (%s) are not compacted", prefix, partition, late)
+            if not pending:
+                continue
+
+            out_dir = _history_dir(landing_dir, prefix, partition)
+            out_dir.mkdir(parents=True, exist_ok=True)
+            stats = {"days": 0, "upserts": 0, "deletes": 0}
+
+            for day in pending:
+                day_changes = []
+                for run, path in files[day].items():
+                    scope_ids = None
+                    if prefix == BRIDGE_PREFIX:
+                        scope_file = daily_files.get(BRIDGE_SCOPE_PREFIX, {}).get(day, {}).get(run)
+                        scope_ids = set(_read_text_frame(scope_file)["issue_id"]) if scope_file else set()
+
+                    run_changes = _changes(state, _read_text_frame(path), keys, scope_ids)
+                    state = _apply(state, run_changes, keys)
+                    day_changes.append(run_changes)
+
+                # the last change of a key wins, replaying it gives the state after the day's last run
+                changes = day_changes[0]
+                if len(day_changes) > 1:
+                    changes = pd.concat(day_changes, ignore_index=True).drop_duplicates(subset=keys, keep="last")
+
+                # an empty file still marks the day as compacted
+                tmp = out_dir / f".snapshot_date={day.isoformat()}.csv.gz.tmp"
+                changes.to_csv(tmp, index=False, compression="gzip")
+                tmp.replace(out_dir / f"snapshot_date={day.isoformat()}.csv.gz")
+
+                stats["days"] += 1
+                stats["upserts"] += int((changes[OP_COLUMN] == "U").sum()) if not changes.empty else 0
+                stats["deletes"] += int((changes[OP_COLUMN] == "D").sum()) if not changes.empty else 0
+
+            _write_checkpoint(landing_dir, prefix, partition, state, pending[-1])
+            summary[f"{prefix}/{partition}"] = stats
+            logger.info("Compacted %s/%s: %s", prefix, partition, stats)
+
+    return summary
+
+
+def apply_retention(
+    landing_dir: Path,
+    landing_retention_days: int = DEFAULT_LANDING_RETENTION_DAYS,
+    raw_retention_days: int = DEFAULT_RAW_RETENTION_DAYS,
+    today: date | None = None,
+) -> list[str]:
+    """
+    Delete compacted daily table files older than landing_retention_days and raw issue
+    dumps older than raw_retention_days, and delta files older than landing_retention_days.
+    The newest file of every table, the newest raw dump of every location and the files of
+    runs still waiting for DAG 02 are kept. Returns the deleted paths.
+    """
+    today = today or date.today()
+    pending = pending_files(landing_dir)
+    deleted = []
+
+    for partition, directory in _locations(landing_dir).items():
+        for prefix, files in _daily_files(directory).items():
+            compacted = _history_files(landing_dir, prefix, partition)
+            newest = max(files)
+            for day, paths in files.items():
+                if day != newest and day in compacted and day < today - timedelta(days=landing_retention_days):
+                    for path in paths.values():
+                        if path.resolve() in pending:
+                            continue
+                        path.unlink()
+                        deleted.append(str(path))
+
+        for day, path in _delta_files(directory):
+            if day < today - timedelta(days=landing_retention_days) and path.resolve() not in pending:
+                path.unlink()
+                deleted.append(str(path))
+
+        raw_files = {}
+        for path in directory.iterdir():
+            match = RAW_FILE_RE.match(path.name)
+            if match:
+                raw_files.setdefault(date.fromisoformat(match["day"]), []).append(path)
+        if raw_files:
+            newest = max(raw_files)
+            for day, paths in raw_files.items():
+                if day != newest and day < today - timedelta(days=raw_retention_days):
+                    for path in paths:
+                        if path.resolve() in pending:
+                            continue
+                        path.unlink()
+                        deleted.append(str(path))
+
+    logger.info("Retention deleted %s files from %s, kept %s files of runs not loaded yet", len(deleted), landing_dir,
+                len(pending))
+    return deleted
+
+
+def rebuild_snapshot(
+    landing_dir: Path,
+    prefix: str,
+    day: date,
+    partition: str | None = None,
+    out: Path | None = None,
+) -> pd.DataFrame:
+    """
+    Full snapshot of one table as of `day`, from the history of one partition (or of all
+    partitions concatenated). Written to `out` as CSV when given.
+    """
+    if prefix not in TABLE_KEYS:
+        raise ValueError(f"Unknown table prefix {prefix!r}, expected one of {sorted(TABLE_KEYS)}")
+
+    history_root = Path(landing_dir) / HISTORY_DIR_NAME / prefix
+    partitions = [partition] if partition else sorted(p.name for p in history_root.glob("*") if p.is_dir())
+    frames = []
+    for name in partitions:
+        state, last_day = _replay(landing_dir, prefix, name, until=day)
+        if last_day is not None:
+            frames.append(state)
+
+    if not frames:
+        raise FileNotFoundError(f"No compacted history of {prefix} on or before {day} in {history_root}")
+
+    snapshot = pd.concat(frames, ignore_index=True)
+    if out is not None:
+        snapshot.to_csv(out, index=False)
+        logger.info("Rebuilt %s as of %s: %s rows -> %s", prefix, day, len(snapshot), out)
+    return snapshot
@@ -0,0 +1,249 @@
+"""
+github_graphql.py
+
+GraphQL extraction backend for repository issues.
+
+The REST /issues payload carries dozens of fields the warehouse never stores (the embedded
+user object with its URL templates, reactions, body, pull request stubs that are dropped
+afterwards). The GraphQL query below asks only for the issue, author and label fields that
+the landing tables use, excludes pull requests on the server (the `issues` connection never
+returns them) and pages with cursors.
+
+Every node is reshaped into the subset of the REST issue document that
+github_issue_parser reads, so the raw NDJSON file and the parsed CSVs look the same
+whichever backend produced them.
+
+Differences to the REST payload:
+- the URL fields of users (followers_url, repos_url, ...) are rebuilt from the login with
+  the same templates the REST API uses
+- label ids are decoded from the label node id (GraphQL has no databaseId on Label)
+- milestone is reduced to {"number", "title", "state"}, the REST milestones are reduced to the
+  same subset (github_records.milestone_subset) so switching backend changes no row hash
+"""
+
+from __future__ import annotations
+
+import base64
+import logging
+
+from github_client import GitHubClient
+from github_records import milestone_subset
+
+# ----------------------------
+# Config
+# ----------------------------
+PAGE_SIZE = 100
+LABELS_PER_ISSUE = 100
+WEB_URL = "https://github.com"
+
+ISSUES_QUERY = """
+query($owner: String!, $repo: String!, $since: DateTime, $cursor: String, $pageSize: Int!, $labelsPerIssue: Int!) {
+  repository(owner: $owner, name: $repo) {
+    issues(first: $pageSize, after: $cursor, filterBy: {since: $since},
+           orderBy: {field: UPDATED_AT, direction: ASC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        databaseId
+        number
+        title
+        state
+        stateReason
+        locked
+        createdAt
+        updatedAt
+        closedAt
+        assignees { totalCount }
+        comments { totalCount }
+        milestone { number title state }
+        author {
+          __typename
+          login
+          avatarUrl
+          url
+          ... on User { id databaseId isSiteAdmin }
+          ... on Bot { id databaseId }
+          ... on Organization { id databaseId }
+          ... on Mannequin { id databaseId }
+        }
+        labels(first: $labelsPerIssue) {
+          totalCount
+          nodes { id name color isDefault description }
+        }
+      }
+    }
+  }
+  rateLimit { cost remaining resetAt }
+}
+"""
+
+logger = logging.getLogger("airflow.task")
+
+
+class GitHubGraphQLError(RuntimeError):
+    """GraphQL answered 200 with an `errors` list."""
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def _msgpack_uints(data: bytes) -> list[int]:
+    """Decode the small msgpack array of unsigned ints inside new-style node ids."""
+    if not data or data[0] & 0xF0 != 0x90:
+        raise ValueError("Node id payload is not a msgpack fixarray")
+
+    sizes = {0xCC: 1, 0xCD: 2, 0xCE: 4, 0xCF: 8}
+    values = []
+    pos = 1
+    for _ in range(data[0] & 0x0F):
+        tag = data[pos]
+        if tag <= 0x7F:
+            values.append(tag)
+            pos += 1
+        elif tag in sizes:
+            size = sizes[tag]
+            values.append(int.from_bytes(data[pos + 1:pos + 1 + size], "big"))
+            pos += 1 + size
+        else:
+            raise ValueError(f"Unsupported msgpack tag {tag:#x} in node id")
+    return values
+
+
+def database_id_from_node_id(node_id: str) -> int:
+    """
+    REST id of an object from its GraphQL node id.
+
+    - new format  LA_kwDOBiS_IM8AAAABuiwVtw -> msgpack [0, repo_id, label_id]
+    - legacy      MDU6TGFiZWw2ODg3MjEyMzM=  -> base64("05:Label688721233")
+    """
+    if "_" in node_id[:4]:
+        payload = node_id.split("_", 1)[1]
+        payload += "=" * (-len(payload) % 4)
+        return _msgpack_uints(base64.urlsafe_b64decode(payload))[-1]
+
+    decoded = base64.b64decode(node_id).decode("ascii")
+    digits = ""
+    for ch in reversed(decoded):
+        if not ch.isdigit():
+            break
+        digits = ch + digits
+    if not digits:
+        raise ValueError(f"Cannot decode database id from node id {node_id!r}")
+    return int(digits)
+
+
+def _rest_user(author: dict | None, api_url: str) -> dict:
+    """Rebuild the REST user fields the landing tables keep."""
+    if author is None:
+        # deleted accounts show up as the "ghost" user in REST
+        author = {"__typename": "User", "login": "ghost", "databaseId": 10137, "id": "MDQ6VXNlcjEwMTM3",
+                  "avatarUrl": "https://avatars.githubusercontent.com/u/10137?v=4", "url": f"{WEB_URL}/ghost",
+                  "isSiteAdmin": False}
+
+    kind = author["__typename"]
+    login = author["login"] + ("[bot]" if kind == "Bot" else "")
+    user_api = f"{api_url}/users/{login}"
+
+    return {
+        "id": author["databaseId"],
+        "login": login,
+        "node_id": author["id"],
+        "type": kind,
+        "site_admin": bool(author.get("isSiteAdmin", False)),
+        "avatar_url": author["avatarUrl"],
+        "url": user_api,
+        "html_url": author["url"],
+        "followers_url": f"{user_api}/followers",
+        "following_url": f"{user_api}/following{{/other_user}}",
+        "gists_url": f"{user_api}/gists{{/gist_id}}",
+        "starred_url": f"{user_api}/starred{{/owner}}{{/repo}}",
+        "subscriptions_url": f"{user_api}/subscriptions",
+        "organizations_url": f"{user_api}/orgs",
+        "repos_url": f"{user_api}/repos",
+        "events_url": f"{user_api}/events{{/privacy}}",
+        "received_events_url": f"{user_api}/received_events",
+        "user_view_type": "public",
+    }
+
+
+def to_rest_issue(node: dict, owner: str, repo: str, api_url: str) -> dict:
+    """Reshape one GraphQL issue node into the REST fields github_issue_parser reads."""
+    repository_url = f"{api_url}/repos/{owner}/{repo}"
+    issue_url = f"{repository_url}/issues/{node['number']}"
+
+    labels = node["labels"]
+    if labels["totalCount"] > len(labels["nodes"]):
+        logger.warning("Issue #%s has %s labels, only %s fetched", node["number"], labels["totalCount"], len(labels["nodes"]))
+
+    return {
+        "id": node["databaseId"],
+        "number": node["number"],
+        "title": node["title"],
+        "user": _rest_user(node["author"], api_url),
+        "labels": [
+            {
+                "id": database_id_from_node_id(label["id"]),
+                "node_id": label["id"],
+                "name": label["name"],
+                "color": label["color"],
+                "default": label["isDefault"],
+                "description": label["description"],
+            }
+            for label in labels["nodes"]
+        ],
+        "state": node["state"].lower(),
+        "locked": node["locked"],
+        "assignee_count": node["assignees"]["totalCount"],
+        "milestone": milestone_subset(node["milestone"]),
+        "comments": node["comments"]["totalCount"],
+        "created_at": node["createdAt"],
+        "updated_at": node["updatedAt"],
+        "closed_at": node["closedAt"],
+        "repository_url": repository_url,
+        "url": issue_url,
+        "events_url": f"{issue_url}/events",
+        "state_reason": node["stateReason"].lower() if node["stateReason"] else None,
+    }
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+def iter_issue_pages_graphql(repo, owner, client: GitHubClient, since: str | None = None, page_size: int = PAGE_SIZE):
+    """
+    Yield one list of REST-shaped issues per GraphQL page.
+
+    Same contract as the REST iter_issue_pages in DAG 01: pull requests are never
+    included and every page can be written straight to the raw NDJSON file.
+    """
+    url = client.url("graphql")
+    cursor = None
+    total = 0
+
+    while True:
+        payload = client.post_json(url, {
+            "query": ISSUES_QUERY,
+            "variables": {
+                "owner": owner,
+                "repo": repo,
+                "since": since,
+                "cursor": cursor,
+                "pageSize": page_size,
+                "labelsPerIssue": LABELS_PER_ISSUE,
+            },
+        })
+
+        if payload.get("errors"):
+            raise GitHubGraphQLError(f"GraphQL errors for {owner}/{repo}: {payload['errors']}")
+
+        connection = payload["data"]["repository"]["issues"]
+        data = [to_rest_issue(node, owner, repo, client.base_url) for node in connection["nodes"]]
+        total += len(data)
+
+        rate = payload["data"].get("rateLimit") or {}
+        print(f"Fetched {len(data)} records. Total we have {total} (graphql cost={rate.get('cost')} remaining={rate.get('remaining')})")
+
+        yield data
+
+        if not connection["pageInfo"]["hasNextPage"]:
+            return
+        cursor = connection["pageInfo"]["endCursor"]
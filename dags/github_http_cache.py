@@ -0,0 +1,196 @@
+"""
+github_http_cache.py
+
+Persistent conditional-request cache for GitHub responses.
+
+GitHub does not count `304 Not Modified` answers against the rate limit. This cache keeps
+the ETag, Last-Modified, Link header and body of every cacheable GET in a small SQLite file
+in the landing area, so the client can send If-None-Match / If-Modified-Since and serve the
+stored body when GitHub answers 304.
+
+What it does:
+- lookup(url) -> cached entry (or None), used to build the conditional headers
+- store(url, response) -> saves a 200 response that carries an ETag or Last-Modified
+- as_response(entry, url) -> rebuilds a requests.Response from a cached entry on 304
+- prune() -> age-based and size-based (least recently used first) eviction
+- stats -> hit / miss / store counts, logged by the client at the end of a task
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# ----------------------------
+# Config
+# ----------------------------
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024      # 256 MB of cached bodies
+DEFAULT_MAX_AGE_SECONDS = 7 * 24 * 3600    # entries unused for a week are dropped
+CACHED_HEADERS = ("Link", "Content-Type", "ETag", "Last-Modified")
+
+logger = logging.getLogger("airflow.task")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class GitHubHTTPCache:
+    """SQLite-backed URL -> (ETag, Last-Modified, headers, body) store."""
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_seconds: int = DEFAULT_MAX_AGE_SECONDS,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # one connection shared by the fan-out threads, serialised by self._lock; the timeout
+        # covers other task processes (mapped repos) writing to the same file
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url            TEXT PRIMARY KEY,
+                etag           TEXT,
+                last_modified  TEXT,
+                headers        TEXT NOT NULL,
+                body           BLOB NOT NULL,
+                size_bytes     INTEGER NOT NULL,
+                stored_at      REAL NOT NULL,
+                last_used_at   REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_http_cache_last_used ON http_cache (last_used_at)")
+        self._conn.commit()
+        self.prune()
+
+    # ----------------------------
+    # Lookup / store
+    # ----------------------------
+    def lookup(self, url: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, headers, body FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "headers": json.loads(row[2]), "body": row[3]}
+
+    @staticmethod
+    def conditional_headers(entry: dict | None) -> dict:
+        if entry is None:
+            return {}
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, response: requests.Response) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            self.record_miss()
+            return
+
+        headers = {k: response.headers[k] for k in CACHED_HEADERS if k in response.headers}
+        body = response.content
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO http_cache (url, etag, last_modified, headers, body, size_bytes, stored_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    headers = excluded.headers,
+                    body = excluded.body,
+                    size_bytes = excluded.size_bytes,
+                    stored_at = excluded.stored_at,
+                    last_used_at = excluded.last_used_at
+                """,
+                (url, etag, last_modified, json.dumps(headers), body, len(body), now, now),
+            )
+            self._conn.commit()
+            self.stats.misses += 1
+            self.stats.stores += 1
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.stats.misses += 1
+
+    def as_response(self, entry: dict, url: str) -> requests.Response:
+        """Rebuild a 200 response from a cached entry (used when GitHub answered 304)."""
+        with self._lock:
+            self._conn.execute("UPDATE http_cache SET last_used_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+            self.stats.hits += 1
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"]
+        response.encoding = "utf-8"
+        response.from_cache = True
+        return response
+
+    # ----------------------------
+    # Eviction
+    # ----------------------------
+    def prune(self) -> int:
+        """Drop entries older than max_age, then least recently used ones until under max_bytes."""
+        with self._lock:
+            cutoff = time.time() - self.max_age_seconds
+            evicted = self._conn.execute("DELETE FROM http_cache WHERE last_used_at < ?", (cutoff,)).rowcount
+
+            total = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM http_cache").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute("SELECT url, size_bytes FROM http_cache ORDER BY last_used_at").fetchall()
+                to_delete = []
+                for url, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    to_delete.append((url,))
+                    total -= size
+                self._conn.executemany("DELETE FROM http_cache WHERE url = ?", to_delete)
+                evicted += len(to_delete)
+
+            self._conn.commit()
+            self.stats.evictions += evicted
+
+        if evicted:
+            logger.info("HTTP cache evicted %s entries from %s", evicted, self.path)
+        return evicted
+
+    def close(self) -> None:
+        self.prune()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,501 @@
+"""
+github_issue_parser.py
+
+Turns raw GitHub issue payloads into the four landing tables of the star schema:
+dim_user, fact_issue, dim_label and bridge_issue_label.
+
+Three paths produce the same CSVs:
+- parse_issue_data_to_csv() -> DataFrame path, needs the whole issue list in memory
+- parse_issue_data_columnar() -> same four DataFrames, built column by column: the issue
+  list is projected to the needed fields once, labels are exploded for the bridge table and
+  de-duplication / list lengths are vectorised pandas operations
+- stream_issues_to_csv() -> single pass over an iterator of issues (e.g. iter_issue_records()),
+  de-duplicates with running key sets and writes the four CSVs in fixed-size chunks, so
+  memory does not grow with the number of issues
+
+stream_comments_to_csv() does the same for the repo-level issue comments feed
+(fact_issue_comment), which is joined to fact_issue on (repo_full_name, issue_number), and
+stream_events_to_csv() for the repo-level issue events feed (fact_issue_event).
+
+The streaming path reads typed IssueRecords (github_records), so only the projected fields
+of every issue are kept while it is written out.
+
+The streaming writers pick the landing format from the file name: *.csv is written with
+the chunked CSV writer below, *.parquet with the typed writer of github_parquet.
+"""
+
+from __future__ import annotations
+
+import csv
+import logging
+from datetime import datetime, timezone
+from operator import itemgetter
+from typing import Iterable
+
+import pandas as pd
+
+from github_records import IssueRecord, as_issue_record, milestone_subset
+
+# ----------------------------
+# Config
+# ----------------------------
+TABLES = ("dim_user", "fact_issue", "dim_label", "bridge_issue_label")
+CHUNK_ROWS = 5000
+
+# column order of the landing tables, fixed so an empty delta still writes a header
+DIM_USER_COLUMNS = [
+    "user_id", "type", "login", "node_id", "site_admin", "avatar_url", "url", "html_url",
+    "followers_url", "following_url", "gists_url", "starred_url", "subscriptions_url",
+    "organizations_url", "repos_url", "events_url", "received_events_url", "user_view_type"
+]
+FACT_ISSUE_COLUMNS = [
+    "issue_id", "issue_number", "repo_full_name", "repository_url", "title", "user_id", "state",
+    "locked", "assignee_count", "label_count", "milestone", "comments", "created_at", "updated_at",
+    "closed_at", "events_url", "api_url", "state_reason"
+]
+DIM_LABEL_COLUMNS = ["label_id", "label_name", "label_color", "is_default", "label_description"]
+BRIDGE_ISSUE_LABEL_COLUMNS = ["issue_id", "label_id"]
+FACT_ISSUE_COMMENT_COLUMNS = [
+    "comment_id", "repo_full_name", "issue_number", "user_id", "user_type", "author_association",
+    "created_at", "updated_at"
+]
+FACT_ISSUE_EVENT_COLUMNS = [
+    "issue_id", "event_id", "repo_full_name", "issue_number", "event", "actor_id", "label_name",
+    "state_reason", "created_at"
+]
+
+logger = logging.getLogger("airflow.task")
+
+
+# ----------------------------
+# DataFrame path
+# ----------------------------
+def parse_issue_data_to_csv(data: list[dict], repo_full_name: str):
+    """DataFrame path: builds the four star-schema tables in memory, one pass per table."""
+
+    dim_user_list = []
+    label_info = []
+    fact_issue = []
+    bridge_table_lable_issue = []
+
+    for issue in data:                             # user dimension
+        user_info = issue["user"]
+        
+        dim_user = {
+            "user_id" : user_info["id"],
+            "type" : user_info["type"],
+            "login" : user_info["login"],
+            "node_id" : user_info["node_id"],
+            "type" : user_info["type"],
+            "site_admin" : user_info["site_admin"],
+            "avatar_url" : user_info["avatar_url"],
+            "url" : user_info["url"],
+            "html_url" : user_info["html_url"],
+            "followers_url" : user_info["followers_url"],
+            "following_url" : user_info["following_url"],
+            "gists_url" : user_info["gists_url"],
+            "starred_url" : user_info["starred_url"],
+            "subscriptions_url" : user_info["subscriptions_url"],
+            "organizations_url" : user_info["organizations_url"],
+            "repos_url" : user_info["repos_url"],
+            "events_url" : user_info["events_url"],
+            "received_events_url" : user_info["received_events_url"],
+            "type" : user_info["type"],
+            "user_view_type" : user_info["user_view_type"],
+            "site_admin" : user_info["site_admin"]}
+        
+        dim_user_list.append(dim_user)
+
+    df_user = pd.DataFrame(dim_user_list, columns=DIM_USER_COLUMNS).drop_duplicates(subset=["user_id"])
+    df_user["extracted_at_utc"] = datetime.now(timezone.utc).isoformat()
+
+    for issue in data:                           # fact issue 
+
+        issue_fact = {
+            "issue_id" : issue["id"],
+            "issue_number" : issue["number"],
+            "repo_full_name" : repo_full_name,
+            "repository_url" : issue["repository_url"],
+            "title" : issue["title"],
+            "user_id" : issue["user"]["id"],
+            "state" : issue["state"],
+            "locked" : issue["locked"],
+            "assignee_count" : issue["assignee_count"] if "assignee_count" in issue else len(issue["assignees"]),
+            "label_count" : len(issue["labels"]),
+            "milestone" : milestone_subset(issue["milestone"]),
+            "comments" : issue["comments"],
+            "created_at" : issue["created_at"],
+            "updated_at" : issue["updated_at"],
+            "closed_at" : issue["closed_at"],
+            "events_url" : issue["events_url"],
+            "api_url" : issue["url"],
+            "state_reason" : issue["state_reason"]
+
+        }
+
+        fact_issue.append(issue_fact)
+
+    df_issue_fact = pd.DataFrame(fact_issue, columns=FACT_ISSUE_COLUMNS)
+    df_issue_fact["extracted_at_utc"] = datetime.now(timezone.utc).isoformat()
+
+
+    for issue in data:                         # label dimension
+        issue_label = issue["labels"]
+        
+
+        for item in issue_label:
+            dim_label = {
+            "label_id" : item["id"],
+            "label_name" : item["name"],
+            "label_color" : item["color"],
+            "is_default" : item["default"],
+            "label_description" : item["description"]
+            }
+            label_info.append(dim_label)
+
+    df_issue_label = pd.DataFrame(label_info, columns=DIM_LABEL_COLUMNS).drop_duplicates(subset=["label_id"])
+    df_issue_label["extracted_at_utc"] = datetime.now(timezone.utc).isoformat()
+
+
+    for issue in data:                        # bridge table - issue label   
+
+        label_issue_id = issue["id"]
+        issue_label = issue.get("labels")     ## safe to do get() for external APIs
+
+        for item in issue_label:
+            bridge_table = {
+                "issue_id" : label_issue_id,
+                "label_id" : item["id"]
+            }
+            bridge_table_lable_issue.append(bridge_table)
+
+    df_bridge_issue_label = pd.DataFrame(bridge_table_lable_issue, columns=BRIDGE_ISSUE_LABEL_COLUMNS).drop_duplicates(subset=["issue_id","label_id"])
+    df_bridge_issue_label["extracted_at_utc"] =  datetime.now(timezone.utc).isoformat()        
+
+    return df_user, df_issue_fact, df_issue_label, df_bridge_issue_label
+
+
+# ----------------------------
+# Columnar path
+# ----------------------------
+# raw issue fields read by the fact table, in FACT_ISSUE_COLUMNS order (user / repo name aside)
+RAW_ISSUE_FIELDS = [
+    "id", "number", "repository_url", "title", "user", "state", "locked", "assignees", "assignee_count",
+    "labels", "milestone", "comments", "created_at", "updated_at", "closed_at", "events_url", "url", "state_reason"
+]
+RAW_LABEL_FIELDS = ["id", "name", "color", "default", "description"]
+_get_id = itemgetter("id")
+
+
+def _assignee_counts(issues: pd.DataFrame) -> pd.Series:
+    """assignee_count as written by the records / GraphQL backend, else the REST assignee list length."""
+    counts = issues["assignee_count"]
+    missing = counts.isna()
+    if missing.any():
+        counts = counts.where(~missing, issues["assignees"][missing].str.len())
+    return counts.astype("int64")
+
+
+def parse_issue_data_columnar(data: list[dict], repo_full_name: str):
+    """
+    Columnar path: same four DataFrames as parse_issue_data_to_csv(), without one dict
+    per issue per table.
+
+    Users and labels are de-duplicated on their id column first, so the nested objects
+    are only expanded for the first occurrence of every user / label.
+    """
+    extracted_at_utc = datetime.now(timezone.utc).isoformat()
+    issues = pd.DataFrame.from_records(data, columns=RAW_ISSUE_FIELDS)
+
+    # user dimension
+    user_ids = issues["user"].map(_get_id)
+    first_users = issues["user"][~user_ids.duplicated()]
+    df_user = pd.DataFrame.from_records(first_users.tolist(), columns=["id"] + DIM_USER_COLUMNS[1:])
+    df_user = df_user.rename(columns={"id": "user_id"})
+    df_user["extracted_at_utc"] = extracted_at_utc
+
+    # fact issue
+    df_issue_fact = pd.DataFrame({
+        "issue_id": issues["id"],
+        "issue_number": issues["number"],
+        "repo_full_name": repo_full_name,
+        "repository_url": issues["repository_url"],
+        "title": issues["title"],
+        "user_id": user_ids,
+        "state": issues["state"],
+        "locked": issues["locked"],
+        "assignee_count": _assignee_counts(issues),
+        "label_count": issues["labels"].str.len(),
+        "milestone": issues["milestone"].map(milestone_subset, na_action="ignore"),
+        "comments": issues["comments"],
+        "created_at": issues["created_at"],
+        "updated_at": issues["updated_at"],
+        "closed_at": issues["closed_at"],
+        "events_url": issues["events_url"],
+        "api_url": issues["url"],
+        "state_reason": issues["state_reason"],
+    }, columns=FACT_ISSUE_COLUMNS)
+    df_issue_fact["extracted_at_utc"] = extracted_at_utc
+
+    # one row per (issue, label), issues without labels drop out
+    exploded = issues[["id", "labels"]].explode("labels", ignore_index=True).dropna(subset=["labels"])
+    label_ids = exploded["labels"].map(_get_id)
+
+    # label dimension
+    first_labels = exploded["labels"][~label_ids.duplicated()]
+    df_issue_label = pd.DataFrame.from_records(first_labels.tolist(), columns=RAW_LABEL_FIELDS)
+    df_issue_label.columns = DIM_LABEL_COLUMNS
+    df_issue_label["extracted_at_utc"] = extracted_at_utc
+
+    # bridge table - issue label
+    df_bridge_issue_label = (
+        pd.DataFrame({"issue_id": exploded["id"], "label_id": label_ids}, columns=BRIDGE_ISSUE_LABEL_COLUMNS)
+        .drop_duplicates()
+        .reset_index(drop=True)
+    )
+    df_bridge_issue_label["extracted_at_utc"] = extracted_at_utc
+
+    return df_user, df_issue_fact, df_issue_label, df_bridge_issue_label
+
+
+# ----------------------------
+# Streaming path
+# ----------------------------
+class _ChunkedCsvWriter:
+    """Buffers rows and writes them in chunks, formatting values the way DataFrame.to_csv does."""
+
+    def __init__(self, path: str, columns: list, extracted_at_utc: str, chunk_rows: int):
+        self._f = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._f, lineterminator="\n")
+        self._writer.writerow(columns + ["extracted_at_utc"])
+        self._extracted_at_utc = extracted_at_utc
+        self._chunk_rows = chunk_rows
+        self._buffer = []
+        self.rows = 0
+
+    def add(self, row: list) -> None:
+        # to_csv writes missing values as empty fields
+        row = ["" if v is None else v for v in row]
+        row.append(self._extracted_at_utc)
+        self._buffer.append(row)
+        if len(self._buffer) >= self._chunk_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        self._writer.writerows(self._buffer)
+        self.rows += len(self._buffer)
+        self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
+        self._f.close()
+
+
+def _open_writer(path, table: str, columns: list, chunk_rows: int):
+    """Chunk writer for one landing table, CSV or typed Parquet depending on the suffix."""
+    extracted_at_utc = datetime.now(timezone.utc).isoformat()
+    if str(path).endswith(".parquet"):
+        from github_parquet import ParquetChunkWriter     # pyarrow is only needed for Parquet
+
+        return ParquetChunkWriter(path, table, extracted_at_utc, chunk_rows)
+    return _ChunkedCsvWriter(path, columns, extracted_at_utc, chunk_rows)
+
+
+class _DeltaWriter:
+    """
+    Full landing writer plus a delta writer that only receives the rows the row-hash index
+    classifies as inserted or updated.
+    """
+
+    def __init__(self, full, delta, hash_index, table: str, key_columns: int):
+        self._full = full
+        self._delta = delta
+        self._hash_index = hash_index
+        self._table = table
+        self._key_columns = key_columns
+
+    @property
+    def rows(self) -> int:
+        return self._full.rows
+
+    @property
+    def delta_rows(self) -> int:
+        return self._delta.rows
+
+    def add(self, row: list, force: bool = False) -> str:
+        change = self._hash_index.classify(self._table, row[:self._key_columns], row)
+        self._full.add(row)
+        if force or change != "unchanged":
+            self._delta.add(row)
+        return change
+
+    def close(self) -> None:
+        self._full.close()
+        self._delta.close()
+
+
+def _open_tracked_writer(path, delta_path, hash_index, table: str, columns: list, key_columns: int, chunk_rows: int):
+    writer = _open_writer(path, table, columns, chunk_rows)
+    if delta_path is None:
+        return writer
+    return _DeltaWriter(writer, _open_writer(delta_path, table, columns, chunk_rows), hash_index, table, key_columns)
+
+
+def stream_issues_to_csv(
+    issues: Iterable[IssueRecord | dict],
+    paths: dict,
+    repo_full_name: str,
+    chunk_rows: int = CHUNK_ROWS,
+    delta_paths: dict | None = None,
+    hash_index=None,
+) -> dict:
+    """
+    Single pass over `issues`, writing the four landing CSVs named in `paths`
+    (keys: dim_user, fact_issue, dim_label, bridge_issue_label).
+
+    `issues` are IssueRecords (iter_issue_records()) or raw REST dicts, which are projected
+    and validated on the way in. First occurrence wins for duplicate users, labels and
+    issue/label pairs, like drop_duplicates() on the DataFrame path. Returns the row count
+    per table.
+
+    With `delta_paths` and a RowHashIndex (github_row_hash), every table also gets a delta
+    file holding only its inserted / updated rows; the bridge delta holds the complete label
+    set of every changed issue, so removed labels can be synced. The insert / update /
+    unchanged counts end up in hash_index.stats, the delta row counts in the returned dict as
+    "<table>_delta".
+    """
+    columns = {
+        "dim_user": DIM_USER_COLUMNS,
+        "fact_issue": FACT_ISSUE_COLUMNS,
+        "dim_label": DIM_LABEL_COLUMNS,
+        "bridge_issue_label": BRIDGE_ISSUE_LABEL_COLUMNS,
+    }
+    writers = {
+        table: _open_tracked_writer(
+            paths[table], (delta_paths or {}).get(table), hash_index, table, columns[table],
+            len(BRIDGE_ISSUE_LABEL_COLUMNS) if table == "bridge_issue_label" else 1, chunk_rows,
+        )
+        for table in TABLES
+    }
+    tracked = delta_paths is not None
+
+    seen_users = set()
+    seen_labels = set()
+    seen_pairs = set()
+
+    try:
+        for issue in issues:
+            issue = as_issue_record(issue)
+            if issue.user.id not in seen_users:
+                seen_users.add(issue.user.id)
+                writers["dim_user"].add(issue.user.row())
+
+            issue_change = writers["fact_issue"].add(issue.fact_row(repo_full_name))
+            issue_changed = tracked and issue_change != "unchanged"
+
+            for label in issue.labels:
+                if label.id not in seen_labels:
+                    seen_labels.add(label.id)
+                    writers["dim_label"].add(label.row())
+
+                pair = (issue.id, label.id)
+                if pair not in seen_pairs:
+                    seen_pairs.add(pair)
+                    if tracked:
+                        writers["bridge_issue_label"].add(list(pair), force=issue_changed)
+                    else:
+                        writers["bridge_issue_label"].add(list(pair))
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    counts = {table: writers[table].rows for table in TABLES}
+    if tracked:
+        counts.update({f"{table}_delta": writers[table].delta_rows for table in TABLES})
+    logger.info("Streamed landing tables: %s", counts)
+    return counts
+
+
+def _comment_row(comment: dict, repo_full_name: str) -> list:
+    user = comment.get("user") or {}       # deleted accounts come back as null
+    return [
+        comment["id"],
+        repo_full_name,
+        int(comment["issue_url"].rsplit("/", 1)[-1]),     # .../issues/<number>, the feed has no issue id
+        user.get("id"),
+        user.get("type"),
+        comment["author_association"],
+        comment["created_at"],
+        comment["updated_at"],
+    ]
+
+
+def stream_comments_to_csv(
+    comments: Iterable[dict],
+    path: str,
+    repo_full_name: str,
+    chunk_rows: int = CHUNK_ROWS,
+    delta_path: str | None = None,
+    hash_index=None,
+) -> int:
+    """
+    Write the fact_issue_comment landing CSV from an iterator of raw comments, returns the
+    row count. With `delta_path` and a RowHashIndex, edited / new comments also go to the delta file.
+    """
+    writer = _open_tracked_writer(
+        path, delta_path, hash_index, "fact_issue_comment", FACT_ISSUE_COMMENT_COLUMNS, 1, chunk_rows
+    )
+    seen = set()
+
+    try:
+        for comment in comments:
+            if comment["id"] in seen:
+                continue
+            seen.add(comment["id"])
+            writer.add(_comment_row(comment, repo_full_name))
+    finally:
+        writer.close()
+
+    return writer.rows
+
+
+def _event_row(event: dict, repo_full_name: str) -> list:
+    actor = event.get("actor") or {}
+    label = event.get("label") or {}
+    return [
+        event["issue"]["id"],
+        event["id"],
+        repo_full_name,
+        event["issue"]["number"],
+        event["event"],
+        actor.get("id"),
+        label.get("name"),
+        event.get("state_reason"),
+        event["created_at"],
+    ]
+
+
+def stream_events_to_csv(
+    events: Iterable[dict],
+    path: str,
+    repo_full_name: str,
+    chunk_rows: int = CHUNK_ROWS,
+) -> int:
+    """
+    Write the fact_issue_event landing CSV from an iterator of raw issue events, returns the
+    row count. Events of pull requests are skipped, like on the issues feed.
+    """
+    writer = _open_writer(path, "fact_issue_event", FACT_ISSUE_EVENT_COLUMNS, chunk_rows)
+    seen = set()
+
+    try:
+        for event in events:
+            issue = event.get("issue")
+            if issue is None or "pull_request" in issue or event["id"] in seen:
+                continue
+            seen.add(event["id"])
+            writer.add(_event_row(event, repo_full_name))
+    finally:
+        writer.close()
+
+    return writer.rows
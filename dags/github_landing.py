@@ -0,0 +1,234 @@
+"""
+github_landing.py
+
+Read / write helpers for the raw files in the landing area.
+
+Raw GitHub pages are streamed to newline-delimited JSON (one issue per line) as they
+arrive, optionally gzip or zstd compressed, so the extraction never holds more than one
+page in memory and a crash keeps every page written so far.
+
+What it does:
+- raw_file_suffix() -> ".ndjson", ".ndjson.gz" or ".ndjson.zst" for a compression name
+- landing_file_suffix() -> ".csv" or ".parquet" for the parsed landing tables
+- open_landing_file() -> text handle for plain / .gz / .zst paths
+- write_ndjson_pages() -> append pages to an NDJSON file, flushing after every page
+- iter_raw_records() -> stream records back from NDJSON (any compression) or from the
+  older single JSON array files (github_issues_raw_*.json)
+- repo_landing_dir() -> per-repo partition of the landing area (repo=<owner>__<repo>)
+- landing_file_name() -> <prefix>_<date>__<run id>.<ext>, one file per DAG run, so a second
+  run on the same day never overwrites the files an earlier, not yet loaded run registered
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import logging
+import re
+import zlib
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from github_records import dumps, loads
+
+# ----------------------------
+# Config
+# ----------------------------
+COMPRESSIONS = {"none": ".ndjson", "gzip": ".ndjson.gz", "zstd": ".ndjson.zst"}
+LANDING_FORMATS = {"csv": ".csv", "parquet": ".parquet"}
+READ_CHUNK_CHARS = 1024 * 1024
+REPO_PARTITION_PREFIX = "repo="
+
+logger = logging.getLogger("airflow.task")
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def _zstd():
+    """zstandard is optional, only needed when zstd compression is configured."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd compression needs the 'zstandard' package (pip install zstandard)") from e
+    return zstandard
+
+
+def raw_file_suffix(compression: str) -> str:
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression!r}, expected one of {sorted(COMPRESSIONS)}")
+    return COMPRESSIONS[compression]
+
+
+def landing_file_suffix(landing_format: str) -> str:
+    if landing_format not in LANDING_FORMATS:
+        raise ValueError(f"Unknown landing format {landing_format!r}, expected one of {sorted(LANDING_FORMATS)}")
+    return LANDING_FORMATS[landing_format]
+
+
+def open_landing_file(path: Path, mode: str = "r"):
+    """
+    Open a landing file as text, picking the codec from the file name.
+
+    mode is "r", "w" or "a".
+    """
+    path = Path(path)
+    name = path.name
+
+    if name.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+
+    if name.endswith(".zst"):
+        zstd = _zstd()
+        if mode == "r":
+            raw = zstd.ZstdDecompressor().stream_reader(open(path, "rb"))
+        else:
+            raw = zstd.ZstdCompressor().stream_writer(open(path, mode + "b"))
+        return io.TextIOWrapper(raw, encoding="utf-8")
+
+    return open(path, mode, encoding="utf-8")
+
+
+def _flush(handle) -> None:
+    """Flush a text handle all the way to disk, including the compressor's buffer."""
+    handle.flush()
+    raw = getattr(handle, "buffer", None)
+    raw = getattr(raw, "raw", raw)
+    if isinstance(raw, gzip.GzipFile):
+        raw.flush(zlib.Z_SYNC_FLUSH)
+    elif raw is not None and hasattr(raw, "flush"):
+        raw.flush()
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+def repo_partition_name(repo_full_name: str) -> str:
+    """great-expectations/great_expectations -> repo=great-expectations__great_expectations"""
+    return REPO_PARTITION_PREFIX + repo_full_name.replace("/", "__")
+
+
+def repo_landing_dir(landing_dir: Path, repo_full_name: str) -> Path:
+    """Landing sub directory of one repo, created on first use."""
+    path = Path(landing_dir) / repo_partition_name(repo_full_name)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def landing_file_name(prefix: str, run_id: str, suffix: str, day: date | None = None) -> str:
+    """
+    github_issue_fact + manual__2026-03-01T10:00:00+00:00 + .csv
+    -> github_issue_fact_2026-03-01__manual__2026-03-01T10_00_00_00_00.csv
+    """
+    day = (day or date.today()).isoformat()
+    return f"{prefix}_{day}__{re.sub(r'[^A-Za-z0-9_.-]', '_', run_id)}{suffix}"
+
+
+def repo_partitions(landing_dir: Path) -> list[Path]:
+    """Every per-repo partition directory of the landing area."""
+    return sorted(p for p in Path(landing_dir).glob(f"{REPO_PARTITION_PREFIX}*") if p.is_dir())
+
+
+def write_ndjson_pages(pages: Iterable[list], path: Path) -> int:
+    """
+    Write every record of every page as one JSON line and flush after each page.
+
+    Returns the number of records written.
+    """
+    count = 0
+    with open_landing_file(path, "w") as f:
+        for page in pages:
+            for record in page:
+                f.write(dumps(record))          # IssueRecords are written as their REST subset
+                f.write("\n")
+            count += len(page)
+            _flush(f)
+
+    logger.info("Wrote %s records to %s", count, path)
+    return count
+
+
+_JSON_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+_NUMBER_TAIL = re.compile(r"(\.\d*)?([eE][-+]?\d*)?")
+
+
+def _needs_more_input(error: json.JSONDecodeError) -> bool:
+    """True when the decoder only failed because the element runs past the end of the buffer."""
+    if error.pos >= len(error.doc):
+        return True
+    # an unterminated string or escape sequence reports where it started, not the end of the buffer
+    if error.msg.startswith("Unterminated string"):
+        return True
+    # so does a literal cut short (`tr` of true, a lone minus sign) and a number cut after `1.` / `1e`
+    tail = error.doc[error.pos:]
+    if error.msg.startswith("Expecting value") and any(lit.startswith(tail) for lit in _JSON_LITERALS):
+        return True
+    if error.pos > 0 and error.doc[error.pos - 1].isdigit() and _NUMBER_TAIL.fullmatch(tail):
+        return True
+    return error.msg.startswith("Invalid \\uXXXX escape") and error.pos >= len(error.doc) - 6
+
+
+def _iter_json_array(f, chunk_chars: int = READ_CHUNK_CHARS) -> Iterator[dict]:
+    """
+    Stream the elements of a top-level JSON array without loading the whole file.
+
+    Only an element cut by the end of the buffer reads more input; a malformed element
+    raises right away with its offset. The read size doubles while one element stays
+    incomplete, so a large element is decoded a logarithmic number of times.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    offset = 0                              # bytes (UTF-8) before buf
+    started = False
+    read_chars = chunk_chars
+
+    while True:
+        chunk = f.read(read_chars)
+        offset += len(buf[:pos].encode("utf-8"))
+        buf = buf[pos:] + chunk
+        pos = 0
+        read_chars = chunk_chars
+
+        while True:
+            # skip whitespace, the opening bracket and separators
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if not started and pos < len(buf):
+                if buf[pos] != "[":
+                    raise ValueError("Raw issue file is neither NDJSON nor a JSON array")
+                started = True
+                pos += 1
+                continue
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if not _needs_more_input(e):
+                    at = offset + len(buf[:e.pos].encode("utf-8"))
+                    raise ValueError(f"Malformed JSON array element at byte {at}: {e.msg}") from None
+                read_chars = max(chunk_chars, len(buf) - pos)   # element split over the boundary
+                break
+            yield record
+            pos = end
+
+        if not chunk:
+            if buf[pos:].strip():
+                raise ValueError("Truncated JSON array in raw issue file")
+            return
+
+
+def iter_raw_records(path: Path) -> Iterator[dict]:
+    """Yield raw records one at a time from an NDJSON (any compression) or JSON array file."""
+    path = Path(path)
+
+    with open_landing_file(path, "r") as f:
+        if ".ndjson" in path.name:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
+        else:
+            yield from _iter_json_array(f)
@@ -0,0 +1,213 @@
+"""
+github_manifest.py
+
+Run manifest of the landing area.
+
+DAG 01 records every file it lands (run id, repo, table, path, row count, sha256) in a
+small SQLite index next to the files, and marks the run complete once every mapped task
+succeeded. DAG 02 resolves its inputs from that index at run time instead of globbing the
+landing directory when the DAG file is parsed, so every load of a DAG 02 run reads the
+files of one and the same complete extraction run.
+
+What it does:
+- register_files() -> add the files of one repo / task to a run (idempotent on retries)
+- complete_run() -> mark a run complete, only complete runs are handed to DAG 02
+- latest_complete_run() -> run id of the newest complete run (None without a manifest)
+- runs_to_load() -> complete runs DAG 02 has not loaded yet, newest first
+- mark_loaded() -> record that DAG 02 loaded a set of runs
+- pending_files() -> paths of the runs DAG 02 will still read, retention must keep them
+- run_tables() / run_files() -> tables of a run / paths of one table, checksums verified
+  before the load reads them
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+
+# ----------------------------
+# Config
+# ----------------------------
+MANIFEST_FILE_NAME = "_landing_manifest.sqlite"
+CHECKSUM_CHUNK_BYTES = 1024 * 1024
+
+logger = logging.getLogger("airflow.task")
+
+
+class ManifestError(RuntimeError):
+    """The manifest does not describe a loadable run (unknown run, missing or changed file)."""
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def _manifest_path(landing_dir: Path) -> Path:
+    return Path(landing_dir) / MANIFEST_FILE_NAME
+
+
+def _connect(landing_dir: Path) -> sqlite3.Connection:
+    # mapped DAG 01 tasks register their files at the same time, the timeout covers the lock
+    conn = sqlite3.connect(str(_manifest_path(landing_dir)), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS landing_runs (
+            run_id         TEXT PRIMARY KEY,
+            started_at     TEXT NOT NULL,
+            completed_at   TEXT
+        )
+        """
+    )
+    # added with the row-hash deltas: a run's delta files must be loaded, not skipped
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(landing_runs)")}
+    if "loaded_at" not in columns:
+        conn.execute("ALTER TABLE landing_runs ADD COLUMN loaded_at TEXT")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS landing_files (
+            run_id          TEXT NOT NULL,
+            repo_full_name  TEXT NOT NULL,
+            table_name      TEXT NOT NULL,
+            path            TEXT NOT NULL,
+            row_count       INTEGER NOT NULL,
+            sha256          TEXT NOT NULL,
+            registered_at   TEXT NOT NULL,
+            PRIMARY KEY (run_id, repo_full_name, table_name)
+        )
+        """
+    )
+    return conn
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def file_checksum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHECKSUM_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+def register_files(landing_dir: Path, run_id: str, repo_full_name: str, files: dict) -> None:
+    """
+    Record the files one task landed for a repo.
+
+    files: {table: (path, row_count)}. A retried task replaces its earlier entries.
+    """
+    rows = [
+        (run_id, repo_full_name, table, str(path), int(row_count), file_checksum(path), _now())
+        for table, (path, row_count) in files.items()
+    ]
+
+    with closing(_connect(landing_dir)) as conn, conn:
+        conn.execute("INSERT OR IGNORE INTO landing_runs (run_id, started_at) VALUES (?, ?)", (run_id, _now()))
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO landing_files
+                (run_id, repo_full_name, table_name, path, row_count, sha256, registered_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    logger.info("Manifest %s: registered %s for %s", run_id, sorted(files), repo_full_name)
+
+
+def complete_run(landing_dir: Path, run_id: str) -> dict:
+    """Mark a run complete and return its row count per table."""
+    with closing(_connect(landing_dir)) as conn, conn:
+        counts = dict(conn.execute(
+            "SELECT table_name, SUM(row_count) FROM landing_files WHERE run_id = ? GROUP BY table_name", (run_id,)
+        ).fetchall())
+        if not counts:
+            raise ManifestError(f"Run {run_id} registered no landing files")
+        conn.execute("UPDATE landing_runs SET completed_at = ? WHERE run_id = ?", (_now(), run_id))
+
+    logger.info("Manifest %s complete: %s", run_id, counts)
+    return counts
+
+
+def latest_complete_run(landing_dir: Path) -> str | None:
+    if not _manifest_path(landing_dir).exists():
+        return None
+    with closing(_connect(landing_dir)) as conn:
+        row = conn.execute(
+            "SELECT run_id FROM landing_runs WHERE completed_at IS NOT NULL ORDER BY completed_at DESC LIMIT 1"
+        ).fetchone()
+    return row[0] if row else None
+
+
+def runs_to_load(landing_dir: Path) -> list[str]:
+    """
+    Complete runs not loaded by DAG 02 yet, newest first (so keeping the first copy of a key
+    keeps its newest version). Falls back to the latest complete run when all are loaded.
+    """
+    if not _manifest_path(landing_dir).exists():
+        return []
+    with closing(_connect(landing_dir)) as conn:
+        runs = [r[0] for r in conn.execute(
+            "SELECT run_id FROM landing_runs WHERE completed_at IS NOT NULL AND loaded_at IS NULL "
+            "ORDER BY completed_at DESC"
+        ).fetchall()]
+    if not runs:
+        latest = latest_complete_run(landing_dir)
+        runs = [latest] if latest else []
+    return runs
+
+
+def mark_loaded(landing_dir: Path, run_ids: list[str]) -> None:
+    with closing(_connect(landing_dir)) as conn, conn:
+        conn.executemany("UPDATE landing_runs SET loaded_at = ? WHERE run_id = ?", [(_now(), r) for r in run_ids])
+    logger.info("Manifest runs loaded: %s", run_ids)
+
+
+def pending_files(landing_dir: Path) -> set[Path]:
+    """Every path registered to a run runs_to_load() still returns (resolved)."""
+    run_ids = runs_to_load(landing_dir)
+    if not run_ids:
+        return set()
+    with closing(_connect(landing_dir)) as conn:
+        rows = conn.execute(
+            f"SELECT path FROM landing_files WHERE run_id IN ({', '.join('?' * len(run_ids))})", run_ids
+        ).fetchall()
+    return {Path(r[0]).resolve() for r in rows}
+
+
+def run_tables(landing_dir: Path, run_id: str) -> set[str]:
+    with closing(_connect(landing_dir)) as conn:
+        return {r[0] for r in conn.execute("SELECT DISTINCT table_name FROM landing_files WHERE run_id = ?", (run_id,))}
+
+
+def run_files(landing_dir: Path, run_id: str, table: str, verify: bool = True) -> list[Path]:
+    """
+    Paths of `table` in a complete run, one per repo. With verify, a file that is missing
+    or no longer matches its recorded checksum raises ManifestError.
+    """
+    with closing(_connect(landing_dir)) as conn:
+        run = conn.execute("SELECT completed_at FROM landing_runs WHERE run_id = ?", (run_id,)).fetchone()
+        if run is None or run[0] is None:
+            raise ManifestError(f"Run {run_id} is not a complete run in {_manifest_path(landing_dir)}")
+        rows = conn.execute(
+            "SELECT path, sha256 FROM landing_files WHERE run_id = ? AND table_name = ? ORDER BY repo_full_name",
+            (run_id, table),
+        ).fetchall()
+
+    if not rows:
+        raise ManifestError(f"Run {run_id} has no {table} files")
+
+    paths = []
+    for path, sha256 in rows:
+        path = Path(path)
+        if verify and (not path.exists() or file_checksum(path) != sha256):
+            raise ManifestError(f"{path} is missing or changed since run {run_id} registered it")
+        paths.append(path)
+    return paths
@@ -0,0 +1,256 @@
+"""
+github_metrics.py
+
+Per-task performance metrics for the extract, parse, load and validate stages.
+
+Every instrumented task collects timers, counters and gauges in a TaskMetrics. Each value
+is sent to Airflow's StatsD integration as it is recorded (airflow.stats.Stats, so it goes
+wherever the [metrics] section of airflow.cfg points, with the labels as tags). When the task
+ends, everything is also written as an OpenMetrics text file (one per task instance), which
+the node_exporter textfile collector or a Pushgateway job can pick up.
+
+Every metric carries the dag_id, task, stage and run_id labels. It also carries repo and
+table when the task knows them.
+
+What it does:
+- instrumented() -> decorator for a task callable (TaskFlow or PythonOperator): task
+  duration and status, OpenMetrics file written even when the task fails
+- current_metrics() -> the TaskMetrics of the running task (an in-memory one outside a task)
+- TaskMetrics.incr() / gauge() / observe() / timer() -> counters, gauges, duration histograms
+- record_client_stats() -> request / retry / throttling / rate-budget counters of a GitHubClient
+
+Metric names are prefixed with github_etl (github_etl.<name> in StatsD).
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from pathlib import Path
+
+try:
+    from airflow.stats import Stats
+except ImportError:         # outside Airflow (benchmarks, tools) metrics stay in memory
+    Stats = None
+
+# ----------------------------
+# Config
+# ----------------------------
+METRIC_PREFIX = "github_etl"
+METRICS_DIR = Path(os.getenv("GITHUB_ETL_METRICS_DIR", "/opt/airflow/metrics"))
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+logger = logging.getLogger("airflow.task")
+
+_CURRENT: ContextVar = ContextVar("github_task_metrics", default=None)
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def _safe_name(value) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_labels(labels: tuple, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _statsd(method: str, name: str, value, tags: dict) -> None:
+    if Stats is None:
+        return
+    stat = f"{METRIC_PREFIX}.{name}"
+    try:
+        getattr(Stats, method)(stat, value, tags=tags)
+    except TypeError:       # Airflow versions whose Stats takes no tags
+        getattr(Stats, method)(stat, value)
+    except Exception:
+        logger.debug("StatsD %s %s failed", method, stat, exc_info=True)
+
+
+class _Timer:
+    seconds: float | None = None
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+class TaskMetrics:
+    """Metrics of one task instance, safe to record from the threads of a page fan-out."""
+
+    def __init__(self, dag_id: str | None = None, task: str | None = None, run_id: str | None = None,
+                 map_index: int = -1, stage: str | None = None, **labels):
+        self.dag_id = dag_id
+        self.task = task
+        self.run_id = run_id
+        self.map_index = map_index
+        self.labels = {"dag_id": dag_id, "task": task, "stage": stage, "run_id": run_id, **labels}
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_current_task(cls, stage: str, **labels) -> "TaskMetrics":
+        """Metrics labelled with the running Airflow task, unbound outside Airflow."""
+        try:
+            from airflow.operators.python import get_current_context
+
+            context = get_current_context()
+        except (ImportError, RuntimeError):
+            return cls(stage=stage, **labels)
+        ti = context["ti"]
+        return cls(ti.dag_id, ti.task_id, context["run_id"], getattr(ti, "map_index", -1), stage, **labels)
+
+    def set_labels(self, **labels) -> None:
+        """Labels known only inside the task (e.g. the mapped repo), applied to every later value."""
+        with self._lock:
+            self.labels.update(labels)
+
+    def _key(self, name: str, labels: dict) -> tuple:
+        merged = {**self.labels, **labels}
+        return name, tuple(sorted((k, str(v)) for k, v in merged.items() if v is not None))
+
+    def incr(self, name: str, value: float = 1, **labels) -> None:
+        with self._lock:
+            key = self._key(name, labels)
+            self._counters[key] = self._counters.get(key, 0) + value
+        _statsd("incr", name, value, dict(key[1]))
+
+    def gauge(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            key = self._key(name, labels)
+            self._gauges[key] = value
+        _statsd("gauge", name, value, dict(key[1]))
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """One duration into the histogram `name` (a StatsD timer)."""
+        with self._lock:
+            key = self._key(name, labels)
+            buckets, total, count = self._histograms.get(key, ([0] * len(DURATION_BUCKETS), 0.0, 0))
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+            self._histograms[key] = (buckets, total + seconds, count + 1)
+        _statsd("timing", name, timedelta(seconds=seconds), dict(key[1]))
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe the duration of the block; the yielded object has .seconds afterwards."""
+        timer = _Timer()
+        start = time.perf_counter()
+        try:
+            yield timer
+        finally:
+            timer.seconds = time.perf_counter() - start
+            self.observe(name, timer.seconds, **labels)
+
+    def throughput(self, name: str, rows: int, seconds: float | None, **labels) -> None:
+        """Rows counter plus a rows-per-second gauge for one step."""
+        self.incr(name, rows, **labels)
+        if seconds:
+            self.gauge(f"{name}_per_second", rows / seconds, **labels)
+
+    def render(self) -> str:
+        """OpenMetrics text exposition of everything recorded so far."""
+        lines = []
+        with self._lock:
+            for kind, values in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted({n for n, _ in values}):
+                    metric = f"{METRIC_PREFIX}_{name}"
+                    lines.append(f"# TYPE {metric} {kind}")
+                    suffix = "_total" if kind == "counter" else ""
+                    for (n, labels), value in sorted(values.items()):
+                        if n == name:
+                            lines.append(f"{metric}{suffix}{_render_labels(labels)} {value}")
+
+            for name in sorted({n for n, _ in self._histograms}):
+                metric = f"{METRIC_PREFIX}_{name}"
+                lines += [f"# TYPE {metric} histogram", f"# UNIT {metric} seconds"]
+                for (n, labels), (buckets, total, count) in sorted(self._histograms.items()):
+                    if n != name:
+                        continue
+                    for bound, cumulative in zip(DURATION_BUCKETS, buckets):
+                        le = 'le="%s"' % bound
+                        lines.append(f"{metric}_bucket{_render_labels(labels, le)} {cumulative}")
+                    inf = 'le="+Inf"'
+                    lines.append(f"{metric}_bucket{_render_labels(labels, inf)} {count}")
+                    lines.append(f"{metric}_sum{_render_labels(labels)} {total}")
+                    lines.append(f"{metric}_count{_render_labels(labels)} {count}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, metrics_dir: Path = METRICS_DIR) -> Path | None:
+        """Write the OpenMetrics file of this task instance (atomically), None outside a task."""
+        if self.run_id is None:
+            return None
+        name = "__".join(_safe_name(p) for p in (self.dag_id, self.run_id, self.task))
+        if self.map_index is not None and self.map_index >= 0:
+            name += f"__{self.map_index}"
+        metrics_dir = Path(metrics_dir)
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        path = metrics_dir / f"{name}.prom"
+        tmp = path.with_suffix(".prom.tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        tmp.replace(path)
+        return path
+
+
+def current_metrics() -> TaskMetrics:
+    metrics = _CURRENT.get()
+    return metrics if metrics is not None else TaskMetrics()
+
+
+def instrumented(stage: str, **labels):
+    """
+    Decorator for a task callable: binds a TaskMetrics for current_metrics(), records the
+    task duration by status and writes the OpenMetrics file when the task ends.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            metrics = TaskMetrics.for_current_task(stage, **labels)
+            token = _CURRENT.set(metrics)
+            status = "failed"
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                status = "success"
+                return result
+            finally:
+                metrics.observe("task_duration_seconds", time.perf_counter() - start, status=status)
+                try:
+                    path = metrics.write()
+                    if path is not None:
+                        logger.info("Task metrics written to %s", path)
+                except OSError:
+                    logger.warning("Could not write the task metrics file", exc_info=True)
+                _CURRENT.reset(token)
+        return wrapper
+    return decorate
+
+
+def record_client_stats(metrics: TaskMetrics, client, **labels) -> None:
+    """Counters of a GitHubClient run plus the rate budget it left."""
+    stats = client.stats.as_dict()
+    metrics.incr("github_requests", stats["requests"], **labels)
+    metrics.incr("github_retries", stats["retries"], **labels)
+    metrics.incr("github_throttled_seconds", stats["throttled_seconds"], **labels)
+    metrics.incr("github_bytes_received", stats["bytes_received"], **labels)
+    if client.rate_limit_remaining is not None:
+        metrics.gauge("github_rate_limit_remaining", client.rate_limit_remaining, **labels)
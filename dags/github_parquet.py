@@ -0,0 +1,175 @@
+"""
+github_parquet.py
+
+Typed Parquet landing format.
+
+The CSV landing files lose every type: DAG 02 lets pandas re-infer them with read_csv and
+then casts again through the dtype_map of each load. The Arrow schemas below mirror those
+dtype_maps, so booleans, timestamps and nullable integers are parsed once, on write, and
+read back already typed.
+
+What it does:
+- SCHEMAS -> one Arrow schema per landing table (same column order as the CSVs)
+- repetitive low-cardinality columns (repo_full_name, state, type, ...) are dictionary encoded
+- ParquetChunkWriter -> drop-in for the CSV chunk writer of github_issue_parser
+- write_dataframe() -> typed Parquet file from a DataFrame (dim_repo)
+- read_parquet() -> DataFrame with only the requested columns (column pruning)
+- iter_parquet_batches() -> the same, as DataFrames of at most batch_rows rows (bounded memory)
+
+pyarrow is only imported by the Parquet path; the CSV landing format does not need it.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ----------------------------
+# Config
+# ----------------------------
+PARQUET_SUFFIX = ".parquet"
+COMPRESSION = "zstd"
+
+TEXT = pa.string()
+LOW_CARDINALITY = pa.dictionary(pa.int32(), pa.string())
+BOOLEAN = pa.bool_()
+INTEGER = pa.int32()
+BIGINT = pa.int64()
+TIMESTAMPTZ = pa.timestamp("us", tz="UTC")
+
+SCHEMAS = {
+    "dim_user": pa.schema([
+        ("user_id", TEXT), ("type", LOW_CARDINALITY), ("login", TEXT), ("node_id", TEXT),
+        ("site_admin", BOOLEAN), ("avatar_url", TEXT), ("url", TEXT), ("html_url", TEXT),
+        ("followers_url", TEXT), ("following_url", TEXT), ("gists_url", TEXT), ("starred_url", TEXT),
+        ("subscriptions_url", TEXT), ("organizations_url", TEXT), ("repos_url", TEXT),
+        ("events_url", TEXT), ("received_events_url", TEXT), ("user_view_type", LOW_CARDINALITY),
+        ("extracted_at_utc", TIMESTAMPTZ),
+    ]),
+    "fact_issue": pa.schema([
+        ("issue_id", TEXT), ("issue_number", INTEGER), ("repo_full_name", LOW_CARDINALITY),
+        ("repository_url", LOW_CARDINALITY), ("title", TEXT), ("user_id", TEXT), ("state", LOW_CARDINALITY),
+        ("locked", BOOLEAN), ("assignee_count", INTEGER), ("label_count", INTEGER), ("milestone", TEXT),
+        ("comments", INTEGER), ("created_at", TIMESTAMPTZ), ("updated_at", TIMESTAMPTZ),
+        ("closed_at", TIMESTAMPTZ), ("events_url", TEXT), ("api_url", TEXT),
+        ("state_reason", LOW_CARDINALITY), ("extracted_at_utc", TIMESTAMPTZ),
+    ]),
+    "dim_label": pa.schema([
+        ("label_id", TEXT), ("label_name", TEXT), ("label_color", TEXT), ("is_default", BOOLEAN),
+        ("label_description", TEXT), ("extracted_at_utc", TIMESTAMPTZ),
+    ]),
+    "bridge_issue_label": pa.schema([
+        ("issue_id", TEXT), ("label_id", TEXT), ("extracted_at_utc", TIMESTAMPTZ),
+    ]),
+    "dim_repo": pa.schema([
+        ("repo_id", TEXT), ("repo_node_id", TEXT), ("name", TEXT), ("owner_user_id", TEXT),
+        ("private", BOOLEAN), ("fork", BOOLEAN), ("archived", BOOLEAN), ("disabled", BOOLEAN),
+        ("created_at", TIMESTAMPTZ), ("updated_at", TIMESTAMPTZ), ("pushed_at", TIMESTAMPTZ),
+        ("default_branch", TEXT), ("language", TEXT), ("stargazers_count", INTEGER),
+        ("watchers_count", INTEGER), ("forks_count", INTEGER), ("open_issues_count", INTEGER),
+        ("extracted_at_utc", TIMESTAMPTZ),
+    ]),
+    "fact_issue_comment": pa.schema([
+        ("comment_id", TEXT), ("repo_full_name", LOW_CARDINALITY), ("issue_number", INTEGER),
+        ("user_id", TEXT), ("user_type", LOW_CARDINALITY), ("author_association", LOW_CARDINALITY),
+        ("created_at", TIMESTAMPTZ), ("updated_at", TIMESTAMPTZ), ("extracted_at_utc", TIMESTAMPTZ),
+    ]),
+    "fact_issue_event": pa.schema([
+        ("issue_id", TEXT), ("event_id", BIGINT), ("repo_full_name", LOW_CARDINALITY),
+        ("issue_number", INTEGER), ("event", LOW_CARDINALITY), ("actor_id", TEXT),
+        ("label_name", TEXT), ("state_reason", LOW_CARDINALITY), ("created_at", TIMESTAMPTZ),
+        ("extracted_at_utc", TIMESTAMPTZ),
+    ]),
+}
+
+logger = logging.getLogger("airflow.task")
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def _as_text(v):
+    if v is None or (isinstance(v, float) and v != v):      # None / NaN
+        return None
+    return v if isinstance(v, str) else str(v)
+
+
+def _column(values: list, field: pa.Field) -> pa.Array:
+    """Python values of one column -> Arrow array of the schema type."""
+    if field.type == TIMESTAMPTZ:
+        # GitHub sends ISO strings ("...Z"), extracted_at_utc is "+00:00"; Arrow parses both
+        return pa.array([_as_text(v) for v in values], TEXT).cast(TIMESTAMPTZ)
+    if field.type == TEXT:
+        return pa.array([_as_text(v) for v in values], TEXT)
+    if field.type == LOW_CARDINALITY:
+        return pa.array([_as_text(v) for v in values], TEXT).dictionary_encode()
+    return pa.array([None if v is None or v != v else v for v in values], field.type)
+
+
+def build_table(table: str, rows: list) -> pa.Table:
+    """Row-major Python lists -> typed Arrow table for a landing table."""
+    schema = SCHEMAS[table]
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    arrays = [_column(list(values), field) for values, field in zip(columns, schema)]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+class ParquetChunkWriter:
+    """Same add / flush / close interface as the CSV chunk writer, one row group per chunk."""
+
+    def __init__(self, path: str, table: str, extracted_at_utc: str, chunk_rows: int):
+        self._table = table
+        self._writer = pq.ParquetWriter(str(path), SCHEMAS[table], compression=COMPRESSION)
+        self._extracted_at_utc = extracted_at_utc
+        self._chunk_rows = chunk_rows
+        self._buffer = []
+        self.rows = 0
+
+    def add(self, row: list) -> None:
+        row = list(row)
+        row.append(self._extracted_at_utc)
+        self._buffer.append(row)
+        if len(self._buffer) >= self._chunk_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        self._writer.write_table(build_table(self._table, self._buffer))
+        self.rows += len(self._buffer)
+        self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+
+def write_dataframe(df: pd.DataFrame, path: str, table: str) -> None:
+    """Typed Parquet file from a DataFrame whose columns follow SCHEMAS[table]."""
+    rows = df[SCHEMAS[table].names].astype(object).values.tolist()
+    pq.write_table(build_table(table, rows), str(path), compression=COMPRESSION)
+
+
+def read_parquet(path: str, columns: list | None = None) -> pd.DataFrame:
+    """
+    Read a landing Parquet file, only materialising `columns`. Dictionary columns come
+    back as plain strings so the frame behaves like the CSV path in to_sql.
+    """
+    table = pq.read_table(str(path), columns=columns)
+    return table.cast(_plain_schema(table.schema)).to_pandas()
+
+
+def _plain_schema(schema: pa.Schema) -> pa.Schema:
+    return pa.schema([pa.field(f.name, TEXT) if pa.types.is_dictionary(f.type) else f for f in schema])
+
+
+def iter_parquet_batches(path: str, columns: list | None = None, batch_rows: int = 50_000):
+    """read_parquet() one record batch at a time, so only batch_rows rows are in memory."""
+    for batch in pq.ParquetFile(str(path)).iter_batches(batch_size=batch_rows, columns=columns):
+        yield pa.Table.from_batches([batch]).cast(_plain_schema(batch.schema)).to_pandas()
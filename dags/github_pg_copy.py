@@ -0,0 +1,162 @@
+"""
+github_pg_copy.py
+
+COPY-based bulk loading of the DAG 02 staging table.
+
+DataFrame.to_sql(method="multi", chunksize=5000) renders every chunk as one INSERT with a
+bound parameter per value (95k parameters for a fact_issue chunk), which psycopg2 formats
+client side and Postgres parses and plans again. COPY ... FROM STDIN streams CSV text that
+Postgres parses straight into the table, and nothing but the current chunk is held in
+memory: the landing files are read chunk_rows rows at a time and every chunk goes out as
+one CSV buffer.
+
+The staging table is created from the dtype_map of the load (same types to_sql used), so
+COPY casts the text to BOOLEAN / INTEGER / TIMESTAMPTZ on the server. By default it is a
+TEMP table created, filled, merged from and dropped in the transaction of one load, so
+loads running at the same time never share a staging table and a failed load leaves
+nothing behind.
+
+What it does:
+- staging_table_ddl() -> CREATE of the staging table (TEMP ... ON COMMIT DROP) with the types of a dtype_map
+- iter_landing_chunks() -> CSV / Parquet landing files as DataFrames of at most chunk_rows rows
+- copy_dataframe() -> one DataFrame into a table through cursor.copy_expert
+- copy_landing_files() -> landing files streamed into a fresh staging table, in the caller's
+  transaction; rows whose key was already copied are dropped (the first file wins, like drop_duplicates)
+- copy_frames() -> the same for DataFrames already in memory
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import time
+
+import pandas as pd
+from sqlalchemy import types as sqltypes
+from sqlalchemy.dialects import postgresql
+
+from github_profiling import record_sql
+
+# ----------------------------
+# Config
+# ----------------------------
+COPY_CHUNK_ROWS = 50_000
+NULL_MARKER = r"\N"         # unquoted \N is NULL, an unquoted empty field stays an empty string
+
+logger = logging.getLogger("airflow.task")
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _copy_ready(df: pd.DataFrame, dtype_map: dict) -> pd.DataFrame:
+    """
+    Integer columns with nulls come back from pandas / pyarrow as float64 and would be written
+    as 3.0, which COPY rejects for INTEGER; they go out as nullable Int64 instead.
+    """
+    casts = {
+        c: "Int64" for c, t in dtype_map.items()
+        if isinstance(t, sqltypes.Integer) and pd.api.types.is_float_dtype(df[c])
+    }
+    return df.astype(casts) if casts else df
+
+
+def _drop_seen(chunk: pd.DataFrame, key: list, seen: set) -> pd.DataFrame:
+    """Rows whose key is new, the keys are remembered for the next chunks."""
+    chunk = chunk.drop_duplicates(subset=key)
+    if len(key) == 1:
+        ids = chunk[key[0]]
+    else:
+        ids = pd.Series(list(chunk[key].itertuples(index=False, name=None)), index=chunk.index)
+    fresh = ~ids.isin(seen)
+    seen.update(ids[fresh])
+    return chunk[fresh]
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+def staging_table_ddl(table: str, dtype_map: dict, schema: str | None = None) -> str:
+    """
+    CREATE of the staging table with the types of dtype_map: without a schema a TEMP table,
+    private to the session and dropped when the transaction ends; with one, DROP + CREATE
+    of schema.table.
+    """
+    dialect = postgresql.dialect()
+    columns = ",\n    ".join(f"{_quote(c)} {t.compile(dialect=dialect)}" for c, t in dtype_map.items())
+    if schema is None:
+        return f"CREATE TEMP TABLE {table} (\n    {columns}\n) ON COMMIT DROP;"
+    return f"DROP TABLE IF EXISTS {schema}.{table};\nCREATE TABLE {schema}.{table} (\n    {columns}\n);"
+
+
+def iter_landing_chunks(paths: list, columns: list, dtype_map: dict | None = None, chunk_rows: int = COPY_CHUNK_ROWS):
+    """
+    DataFrames of at most chunk_rows rows over every file, in order. Text columns of CSV files
+    are read as str, so ids keep the exact text that landed (no int / float re-inference).
+    """
+    text_columns = {c: str for c, t in (dtype_map or {}).items() if isinstance(t, sqltypes.String)}
+    for path in paths:
+        if str(path).endswith(".parquet"):
+            from github_parquet import iter_parquet_batches     # pyarrow is only needed for Parquet landing files
+
+            yield from iter_parquet_batches(path, columns=columns, batch_rows=chunk_rows)
+        else:
+            yield from pd.read_csv(path, usecols=columns, dtype=text_columns, chunksize=chunk_rows)
+
+
+def copy_dataframe(cursor, df: pd.DataFrame, qualified_table: str, dtype_map: dict) -> int:
+    """
+    COPY the dtype_map columns of df into qualified_table, returns the number of rows. The COPY
+    goes through the raw cursor, so it is timed here for the task profile (record_sql).
+    """
+    if df.empty:
+        return 0
+    columns = list(dtype_map)
+    buffer = io.StringIO()
+    _copy_ready(df[columns], dtype_map).to_csv(buffer, index=False, header=False, na_rep=NULL_MARKER)
+    buffer.seek(0)
+    statement = (
+        f"COPY {qualified_table} ({', '.join(_quote(c) for c in columns)}) "
+        f"FROM STDIN WITH (FORMAT csv, NULL '{NULL_MARKER}')"
+    )
+    start = time.perf_counter()
+    cursor.copy_expert(statement, buffer)
+    record_sql(statement, time.perf_counter() - start, len(df))
+    return len(df)
+
+
+def copy_frames(conn, frames, table: str, dtype_map: dict, key: list | None = None, schema: str | None = None) -> int:
+    """
+    Create the staging table (see staging_table_ddl) and COPY every DataFrame of `frames` into
+    it, inside the transaction of the SQLAlchemy connection `conn`, so the statements that read
+    the staging table run in the same transaction. Returns the number of rows copied.
+    """
+    qualified = f"{schema}.{table}" if schema else table
+    seen = set()
+    rows = 0
+    cursor = conn.connection.cursor()       # psycopg2 cursor, copy_expert is not in the DB-API
+    try:
+        ddl = staging_table_ddl(table, dtype_map, schema)
+        start = time.perf_counter()
+        cursor.execute(ddl)
+        record_sql(ddl, time.perf_counter() - start, cursor.rowcount)
+        for chunk in frames:
+            if key:
+                chunk = _drop_seen(chunk, key, seen)
+            rows += copy_dataframe(cursor, chunk, qualified, dtype_map)
+    finally:
+        cursor.close()
+
+    logger.info("Copied %s rows into %s", rows, qualified)
+    return rows
+
+
+def copy_landing_files(conn, paths: list, table: str, dtype_map: dict, key: list | None = None,
+                       schema: str | None = None, chunk_rows: int = COPY_CHUNK_ROWS) -> int:
+    """Stream the dtype_map columns of the landing files into a fresh staging table (see copy_frames)."""
+    chunks = iter_landing_chunks(paths, list(dtype_map), dtype_map, chunk_rows)
+    return copy_frames(conn, chunks, table, dtype_map, key, schema)
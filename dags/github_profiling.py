@@ -0,0 +1,257 @@
+"""
+github_profiling.py
+
+Opt-in profiling of the heavy task callables, switched on per DAG run through the trigger conf:
+
+    {"profile": true}                                     every profiled task of the run
+    {"profile": ["t_parse_issue_data_to_csv", "create_fact_issues"]}    only these task ids
+
+When a task is profiled, its artifacts go to <artifacts_dir>/<dag_id>/<run_id>/<task_id>[__<map_index>]/:
+- cpu.prof -> cProfile stats of the task thread (snakeviz cpu.prof, python -m pstats)
+- cpu.folded -> sampled stacks of every thread in collapsed format (flamegraph.pl, speedscope,
+  inferno); page fan-out threads show up here, cProfile only sees the calling thread
+- memory.json -> tracemalloc peak / current and the top allocation sites
+- sql.json -> every SQL statement run through SQLAlchemy with its duration and row count, plus
+  the statements run on the raw DB-API cursor that report themselves (record_sql(), e.g. the
+  COPY ... FROM STDIN of github_pg_copy, which SQLAlchemy's events never see)
+- summary.json -> wall time, sample count and the files above
+
+Without the conf flag the wrapper only looks the flag up and calls the task: no profiler,
+tracer, sampler thread or SQLAlchemy listener is installed.
+
+What it does:
+- profiled() -> decorator for a task callable (TaskFlow or PythonOperator)
+- TaskProfiler -> the profilers as a context manager, usable outside Airflow too
+- record_sql() -> add a statement timed outside SQLAlchemy to the active profile (no-op otherwise)
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+
+# ----------------------------
+# Config
+# ----------------------------
+CONF_KEY = "profile"
+SAMPLE_INTERVAL_SECONDS = float(os.getenv("GITHUB_ETL_PROFILE_SAMPLE_INTERVAL", "0.005"))
+TOP_ALLOCATIONS = 25
+MAX_SQL_CHARS = 2000
+
+logger = logging.getLogger("airflow.task")
+
+_ACTIVE_SQL: ContextVar = ContextVar("github_profile_sql", default=None)
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def _safe_name(value) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(value))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class _StackSampler(threading.Thread):
+    """Samples the stacks of every other thread at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, interval: float):
+        super().__init__(name="github-profile-sampler", daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class _SqlTimer:
+    """SQLAlchemy cursor-execute listeners, attached only while a task is profiled."""
+
+    def __init__(self):
+        self.statements = []
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("github_profile_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["github_profile_start"].pop()
+        self.record(statement, time.perf_counter() - start, cursor.rowcount, executemany)
+
+    def record(self, statement: str, seconds: float, rows: int, executemany: bool = False) -> None:
+        self.statements.append({
+            "seconds": round(seconds, 6),
+            "rows": rows,
+            "executemany": executemany,
+            "statement": " ".join(statement.split())[:MAX_SQL_CHARS],
+        })
+
+    def attach(self) -> bool:
+        try:
+            from sqlalchemy import event
+            from sqlalchemy.engine import Engine
+        except ImportError:
+            return False
+        event.listen(Engine, "before_cursor_execute", self._before)
+        event.listen(Engine, "after_cursor_execute", self._after)
+        return True
+
+    def detach(self) -> None:
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        event.remove(Engine, "before_cursor_execute", self._before)
+        event.remove(Engine, "after_cursor_execute", self._after)
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+class TaskProfiler:
+    """cProfile + stack sampler + tracemalloc + SQL timings around a block, written to out_dir."""
+
+    def __init__(self, out_dir: Path, sample_interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.out_dir = Path(out_dir)
+        self.sample_interval = sample_interval
+        self._profile = cProfile.Profile()
+        self._sampler = _StackSampler(sample_interval)
+        self._sql = _SqlTimer()
+        self._sql_attached = False
+        self._sql_token = None
+        self._own_tracemalloc = False
+        self._start = None
+
+    def __enter__(self) -> "TaskProfiler":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._sql_attached = self._sql.attach()
+        self._sql_token = _ACTIVE_SQL.set(self._sql)
+        self._sampler.start()
+        self._start = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._profile.disable()
+        wall = time.perf_counter() - self._start
+        self._sampler.stop()
+        _ACTIVE_SQL.reset(self._sql_token)
+        if self._sql_attached:
+            self._sql.detach()
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+
+        try:
+            self._write(wall, current, peak, top, failed=exc_type is not None)
+        except OSError:
+            logger.warning("Could not write the profile to %s", self.out_dir, exc_info=True)
+
+    def _write(self, wall: float, current: int, peak: int, top: list, failed: bool) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._profile.dump_stats(str(self.out_dir / "cpu.prof"))
+        with open(self.out_dir / "cpu.folded", "w", encoding="utf-8") as f:
+            for stack, count in self._sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        (self.out_dir / "memory.json").write_text(json.dumps({
+            "peak_bytes": peak,
+            "current_bytes": current,
+            "top_allocations": [
+                {"site": str(stat.traceback), "bytes": stat.size, "blocks": stat.count} for stat in top
+            ],
+        }, indent=2), encoding="utf-8")
+
+        sql = self._sql.statements
+        (self.out_dir / "sql.json").write_text(json.dumps({
+            "statements": len(sql),
+            "seconds": round(sum(s["seconds"] for s in sql), 6),
+            "by_duration": sorted(sql, key=lambda s: s["seconds"], reverse=True),
+        }, indent=2), encoding="utf-8")
+
+        (self.out_dir / "summary.json").write_text(json.dumps({
+            "wall_seconds": round(wall, 3),
+            "failed": failed,
+            "samples": self._sampler.samples,
+            "sample_interval_seconds": self.sample_interval,
+            "peak_traced_bytes": peak,
+            "sql_statements": len(sql),
+            "files": ["cpu.prof", "cpu.folded", "memory.json", "sql.json"],
+        }, indent=2), encoding="utf-8")
+        logger.info("Profile written to %s (wall %.1fs, peak %.1f MB)", self.out_dir, wall, peak / 1024 / 1024)
+
+
+def record_sql(statement: str, seconds: float, rows: int) -> None:
+    """Add a statement run outside SQLAlchemy's cursor events to sql.json of the active profile."""
+    sql = _ACTIVE_SQL.get()
+    if sql is not None:
+        sql.record(statement, seconds, rows)
+
+
+def _profile_target(artifacts_dir: Path) -> Path | None:
+    """Output directory when the running task is profiled in this DAG run, else None."""
+    try:
+        from airflow.operators.python import get_current_context
+
+        context = get_current_context()
+    except (ImportError, RuntimeError):
+        return None
+
+    flag = (getattr(context.get("dag_run"), "conf", None) or {}).get(CONF_KEY)
+    ti = context["ti"]
+    if not flag or (isinstance(flag, (list, tuple)) and ti.task_id not in flag):
+        return None
+
+    name = _safe_name(ti.task_id)
+    if getattr(ti, "map_index", -1) >= 0:
+        name += f"__{ti.map_index}"
+    return Path(artifacts_dir) / _safe_name(ti.dag_id) / _safe_name(context["run_id"]) / name
+
+
+def profiled(artifacts_dir: Path):
+    """Decorator: profile the task callable when the DAG run conf asks for it (see module doc)."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            target = _profile_target(artifacts_dir)
+            if target is None:
+                return fn(*args, **kwargs)
+            with TaskProfiler(target):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,309 @@
+"""
+github_records.py
+
+Fast, typed decoding of GitHub issue payloads.
+
+A REST issue carries ~30 top-level fields plus a full user object, reactions, the body and
+a pull request stub; the landing tables use a fraction of that. The records below keep only
+the projected fields of issue, user and label in slotted classes (no per-instance __dict__).
+
+The projection happens after decoding: orjson has no field-limited mode, so loads() builds
+the full dicts of one page and from_rest() copies the projected fields out of them. Unused
+fields are not skipped while parsing; what shrinks is the raw NDJSON written from the
+records, and the decode gains only come from orjson itself.
+
+What it does:
+- loads() / dumps() -> orjson when installed, the standard json module otherwise (full decode)
+- UserRecord / LabelRecord / IssueRecord -> projected, slotted records with the landing rows
+- IssueRecord.from_rest() -> validates one REST-shaped issue, raising MalformedRecordError
+  with the issue id and the offending field instead of failing later in the parser
+- milestone_subset() -> the backend independent milestone kept in fact_issue
+- issue_records() -> page of raw dicts -> page of records (pull requests dropped)
+- iter_issue_records() -> stream records back from a raw NDJSON / JSON array file
+
+Records serialise back to the REST subset (to_rest()), the same shape the GraphQL backend
+writes, so raw NDJSON files stay readable by every reader of the landing area. The
+assignee list is not kept: both write an explicit assignee_count instead.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+try:
+    import orjson
+except ImportError:         # optional, the standard library decoder is the fallback
+    orjson = None
+
+# ----------------------------
+# Config
+# ----------------------------
+USER_FIELDS = (
+    "id", "type", "login", "node_id", "site_admin", "avatar_url", "url", "html_url",
+    "followers_url", "following_url", "gists_url", "starred_url", "subscriptions_url",
+    "organizations_url", "repos_url", "events_url", "received_events_url", "user_view_type"
+)
+LABEL_FIELDS = ("id", "name", "color", "default", "description")
+# the GraphQL backend only fetches these, REST milestones are reduced to them as well so the
+# fact_issue milestone (and its row hash) does not depend on the backend
+MILESTONE_FIELDS = ("number", "title", "state")
+
+logger = logging.getLogger("airflow.task")
+
+
+class MalformedRecordError(ValueError):
+    """A GitHub payload is missing a projected field or has it with the wrong type."""
+
+
+# ----------------------------
+# JSON
+# ----------------------------
+def _default(obj):
+    if isinstance(obj, (IssueRecord, UserRecord, LabelRecord)):
+        return obj.to_rest()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def loads(data: bytes | str):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj) -> str:
+    """JSON text of obj, records are written as their REST subset."""
+    if orjson is not None:
+        # passthrough: orjson would otherwise serialise the dataclass fields, not to_rest()
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_PASSTHROUGH_DATACLASS).decode("utf-8")
+    return json.dumps(obj, default=_default)
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def _check(value, kinds, field: str, context: str, nullable: bool = False):
+    if value is None and nullable:
+        return value
+    # bool is an int subclass, never accept it where an id / count is expected
+    if not isinstance(value, kinds) or (isinstance(value, bool) and bool not in kinds):
+        expected = " or ".join(k.__name__ for k in kinds)
+        raise MalformedRecordError(f"{context}: field {field!r} is {type(value).__name__}, expected {expected}")
+    return value
+
+
+def _field(payload: dict, field: str, context: str):
+    try:
+        return payload[field]
+    except KeyError:
+        raise MalformedRecordError(f"{context}: missing field {field!r}") from None
+    except TypeError:
+        raise MalformedRecordError(f"{context}: expected an object, got {type(payload).__name__}") from None
+
+
+def milestone_subset(milestone: dict | None) -> dict | None:
+    """REST or GraphQL milestone -> {"number", "title", "state"} with the REST (lower case) state."""
+    if milestone is None:
+        return None
+    subset = {f: milestone.get(f) for f in MILESTONE_FIELDS}
+    if subset["state"] is not None:
+        subset["state"] = subset["state"].lower()
+    return subset
+
+
+# ----------------------------
+# Records
+# ----------------------------
+@dataclass
+class UserRecord:
+    __slots__ = USER_FIELDS
+
+    id: int
+    type: str
+    login: str
+    node_id: str
+    site_admin: bool
+    avatar_url: str
+    url: str
+    html_url: str
+    followers_url: str
+    following_url: str
+    gists_url: str
+    starred_url: str
+    subscriptions_url: str
+    organizations_url: str
+    repos_url: str
+    events_url: str
+    received_events_url: str
+    user_view_type: str
+
+    @classmethod
+    def from_rest(cls, payload: dict, context: str) -> "UserRecord":
+        context = f"{context} user"
+        values = [_field(payload, f, context) for f in USER_FIELDS]
+        _check(values[0], (int,), "id", context)
+        return cls(*values)
+
+    def row(self) -> list:
+        """dim_user row (user_id first, then the API field names)."""
+        return [getattr(self, f) for f in USER_FIELDS]
+
+    def to_rest(self) -> dict:
+        return {f: getattr(self, f) for f in USER_FIELDS}
+
+
+@dataclass
+class LabelRecord:
+    __slots__ = LABEL_FIELDS
+
+    id: int
+    name: str
+    color: str
+    default: bool
+    description: str | None
+
+    @classmethod
+    def from_rest(cls, payload: dict, context: str) -> "LabelRecord":
+        context = f"{context} label"
+        values = [_field(payload, f, context) for f in LABEL_FIELDS]
+        _check(values[0], (int,), "id", context)
+        _check(values[1], (str,), "name", context)
+        return cls(*values)
+
+    def row(self) -> list:
+        """dim_label row."""
+        return [self.id, self.name, self.color, self.default, self.description]
+
+    def to_rest(self) -> dict:
+        return {f: getattr(self, f) for f in LABEL_FIELDS}
+
+
+@dataclass
+class IssueRecord:
+    __slots__ = (
+        "id", "number", "title", "user", "labels", "state", "locked", "assignee_count", "milestone",
+        "comments", "created_at", "updated_at", "closed_at", "repository_url", "url", "events_url",
+        "state_reason",
+    )
+
+    id: int
+    number: int
+    title: str
+    user: UserRecord
+    labels: list
+    state: str
+    locked: bool
+    assignee_count: int
+    milestone: dict | None
+    comments: int
+    created_at: str
+    updated_at: str
+    closed_at: str | None
+    repository_url: str
+    url: str
+    events_url: str
+    state_reason: str | None
+
+    @classmethod
+    def from_rest(cls, payload: dict, context: str = "issue") -> "IssueRecord":
+        """Project and validate a REST issue (or the GraphQL backend's REST subset)."""
+        issue_id = _check(_field(payload, "id", context), (int,), "id", context)
+        context = f"{context} id={issue_id}"
+        get = lambda f: _field(payload, f, context)     # noqa: E731
+
+        labels = _check(get("labels"), (list,), "labels", context)
+        if "assignee_count" in payload:     # raw NDJSON written from records
+            assignee_count = _check(payload["assignee_count"], (int,), "assignee_count", context)
+        else:
+            assignee_count = len(_check(get("assignees"), (list,), "assignees", context))
+
+        return cls(
+            id=issue_id,
+            number=_check(get("number"), (int,), "number", context),
+            title=get("title"),
+            user=UserRecord.from_rest(_check(get("user"), (dict,), "user", context), context),
+            labels=[LabelRecord.from_rest(label, context) for label in labels],
+            state=_check(get("state"), (str,), "state", context),
+            locked=get("locked"),
+            assignee_count=assignee_count,
+            milestone=milestone_subset(_check(get("milestone"), (dict,), "milestone", context, nullable=True)),
+            comments=_check(get("comments"), (int,), "comments", context),
+            created_at=_check(get("created_at"), (str,), "created_at", context),
+            updated_at=_check(get("updated_at"), (str,), "updated_at", context),
+            closed_at=_check(get("closed_at"), (str,), "closed_at", context, nullable=True),
+            repository_url=get("repository_url"),
+            url=get("url"),
+            events_url=get("events_url"),
+            state_reason=_check(get("state_reason"), (str,), "state_reason", context, nullable=True),
+        )
+
+    def fact_row(self, repo_full_name: str) -> list:
+        """fact_issue row, in FACT_ISSUE_COLUMNS order."""
+        return [
+            self.id,
+            self.number,
+            repo_full_name,
+            self.repository_url,
+            self.title,
+            self.user.id,
+            self.state,
+            self.locked,
+            self.assignee_count,
+            len(self.labels),
+            self.milestone,
+            self.comments,
+            self.created_at,
+            self.updated_at,
+            self.closed_at,
+            self.events_url,
+            self.url,
+            self.state_reason,
+        ]
+
+    def to_rest(self) -> dict:
+        return {
+            "id": self.id,
+            "number": self.number,
+            "title": self.title,
+            "user": self.user.to_rest(),
+            "labels": [label.to_rest() for label in self.labels],
+            "state": self.state,
+            "locked": self.locked,
+            "assignee_count": self.assignee_count,
+            "milestone": self.milestone,
+            "comments": self.comments,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "closed_at": self.closed_at,
+            "repository_url": self.repository_url,
+            "url": self.url,
+            "events_url": self.events_url,
+            "state_reason": self.state_reason,
+        }
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+def as_issue_record(issue) -> IssueRecord:
+    return issue if isinstance(issue, IssueRecord) else IssueRecord.from_rest(issue)
+
+
+def issue_records(payload: Iterable[dict]) -> list[IssueRecord]:
+    """One page of raw REST issues -> records, pull requests dropped."""
+    if not isinstance(payload, list):
+        raise MalformedRecordError(f"Expected a list of issues, got {type(payload).__name__}")
+    return [IssueRecord.from_rest(x) for x in payload if "pull_request" not in x]
+
+
+def iter_issue_records(path: Path) -> Iterator[IssueRecord]:
+    """Yield validated records from a raw issue file (pull requests dropped)."""
+    from github_landing import iter_raw_records
+
+    for i, raw in enumerate(iter_raw_records(path)):
+        if "pull_request" in raw:
+            continue
+        yield IssueRecord.from_rest(raw, context=f"{Path(path).name} record {i}")
@@ -0,0 +1,153 @@
+"""
+github_row_hash.py
+
+Row-hash change detection for the landing tables.
+
+The parse stage hashes the content of every row it writes and compares it with the hash
+the same row (same key) had in the previous complete run. Rows whose hash is new or
+different go to a delta file next to the full landing file, so DAG 02 only ships the
+rows that actually changed instead of asking Postgres to diff the whole table.
+
+The hashes of a run are staged under its run id and only promoted to the index when the
+run completes (t_complete_manifest_run in DAG 01). A failed run therefore never hides
+its changes from the next one.
+
+What it does:
+- row_hash() -> stable content hash of a landing row (values as CSV text, extracted_at_utc excluded)
+- RowHashIndex -> classify rows as insert / update / unchanged for one run and repo, stage the new hashes
+- promote_hashes() -> make the staged hashes of a completed run the new baseline
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+# ----------------------------
+# Config
+# ----------------------------
+INDEX_FILE_NAME = "_row_hash_index.sqlite"
+CHANGES = ("insert", "update", "unchanged")
+
+logger = logging.getLogger("airflow.task")
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def _connect(landing_dir: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(Path(landing_dir) / INDEX_FILE_NAME), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS row_hashes (
+            table_name      TEXT NOT NULL,
+            repo_full_name  TEXT NOT NULL,
+            row_key         TEXT NOT NULL,
+            row_hash        TEXT NOT NULL,
+            PRIMARY KEY (table_name, repo_full_name, row_key)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS staged_hashes (
+            run_id          TEXT NOT NULL,
+            table_name      TEXT NOT NULL,
+            repo_full_name  TEXT NOT NULL,
+            row_key         TEXT NOT NULL,
+            row_hash        TEXT NOT NULL,
+            PRIMARY KEY (run_id, table_name, repo_full_name, row_key)
+        )
+        """
+    )
+    return conn
+
+
+def row_hash(row) -> str:
+    """Hash of the row values as the CSV writer prints them (None -> empty field)."""
+    text = "\x1f".join("" if v is None else str(v) for v in row)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _row_key(key) -> str:
+    return "|".join(str(k) for k in key)
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+class RowHashIndex:
+    """Change classification of the rows one parse task writes for one repo."""
+
+    def __init__(self, landing_dir: Path, run_id: str, repo_full_name: str, ignore_previous: bool = False):
+        self.landing_dir = Path(landing_dir)
+        self.run_id = run_id
+        self.repo_full_name = repo_full_name
+        self.ignore_previous = ignore_previous      # full refresh: every row counts as an insert
+        self.stats = {}
+        self._previous = {}
+        self._staged = {}
+
+    def _previous_hashes(self, table: str) -> dict:
+        if table not in self._previous:
+            hashes = {}
+            if not self.ignore_previous:
+                with closing(_connect(self.landing_dir)) as conn:
+                    hashes = dict(conn.execute(
+                        "SELECT row_key, row_hash FROM row_hashes WHERE table_name = ? AND repo_full_name = ?",
+                        (table, self.repo_full_name),
+                    ).fetchall())
+            self._previous[table] = hashes
+            self._staged[table] = {}
+            self.stats[table] = dict.fromkeys(CHANGES, 0)
+        return self._previous[table]
+
+    def classify(self, table: str, key, row) -> str:
+        """insert / update / unchanged for one row, staging its hash when it changed."""
+        previous = self._previous_hashes(table)
+        row_key = _row_key(key)
+        new_hash = row_hash(row)
+        old_hash = previous.get(row_key)
+
+        if old_hash == new_hash:
+            change = "unchanged"
+        else:
+            change = "insert" if old_hash is None else "update"
+            self._staged[table][row_key] = new_hash
+        self.stats[table][change] += 1
+        return change
+
+    def commit(self) -> dict:
+        """Stage the new hashes under the run id (retries replace their earlier staging)."""
+        with closing(_connect(self.landing_dir)) as conn, conn:
+            for table, staged in self._staged.items():
+                conn.execute(
+                    "DELETE FROM staged_hashes WHERE run_id = ? AND table_name = ? AND repo_full_name = ?",
+                    (self.run_id, table, self.repo_full_name),
+                )
+                conn.executemany(
+                    "INSERT INTO staged_hashes (run_id, table_name, repo_full_name, row_key, row_hash) VALUES (?, ?, ?, ?, ?)",
+                    [(self.run_id, table, self.repo_full_name, k, h) for k, h in staged.items()],
+                )
+        logger.info("Row changes for %s in %s: %s", self.repo_full_name, self.run_id, self.stats)
+        return self.stats
+
+
+def promote_hashes(landing_dir: Path, run_id: str) -> int:
+    """Move the staged hashes of a completed run into the index, returns the number of rows."""
+    with closing(_connect(landing_dir)) as conn, conn:
+        promoted = conn.execute(
+            """
+            INSERT OR REPLACE INTO row_hashes (table_name, repo_full_name, row_key, row_hash)
+            SELECT table_name, repo_full_name, row_key, row_hash FROM staged_hashes WHERE run_id = ?
+            """,
+            (run_id,),
+        ).rowcount
+        conn.execute("DELETE FROM staged_hashes WHERE run_id = ?", (run_id,))
+
+    logger.info("Promoted %s row hashes of %s", promoted, run_id)
+    return promoted
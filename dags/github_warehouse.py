@@ -0,0 +1,115 @@
+"""
+github_warehouse.py
+
+Shared, pooled SQLAlchemy engines for the warehouse tasks (DAG 02 loads, GE validations).
+
+create_engine() on every call meant a new pool per call: every load, the FK check of the
+validations and the SCD2 step paid for a fresh TCP / TLS / auth handshake and left an idle
+pool behind. Engines are cached per connection URI and per process instead, so every
+statement of a task, and every task an executor runs in the same process, reuses the pooled
+connections. A forked child gets its own engine (pools must not cross a fork).
+
+Pool and session settings:
+- pool_pre_ping -> a connection dropped by the server or a proxy is replaced, not handed out
+- pool_recycle -> connections are renewed before idle timeouts on the warehouse side kick in
+- statement_timeout -> a runaway statement fails the task instead of holding locks for hours
+- application_name -> the task connections show up as such in pg_stat_activity
+
+What it does:
+- get_engine() -> the engine of an Airflow connection id (the URI is looked up once per process)
+- engine_for_uri() -> the engine of a SQLAlchemy URI
+- transaction() -> a connection + transaction; nested transaction() blocks on the same engine
+  join it, so a sequence of load steps can run on one connection and commit together
+- dispose_engines() -> close every cached pool
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import create_engine
+
+# ----------------------------
+# Config
+# ----------------------------
+POOL_SIZE = int(os.getenv("GITHUB_ETL_PG_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("GITHUB_ETL_PG_MAX_OVERFLOW", "5"))
+POOL_RECYCLE_SECONDS = int(os.getenv("GITHUB_ETL_PG_POOL_RECYCLE", "1800"))
+STATEMENT_TIMEOUT_MS = int(os.getenv("GITHUB_ETL_PG_STATEMENT_TIMEOUT_MS", str(30 * 60 * 1000)))
+APPLICATION_NAME = "github_etl"
+
+logger = logging.getLogger("airflow.task")
+
+_ENGINES = {}
+_URIS = {}
+_LOCK = threading.Lock()
+_TRANSACTION: ContextVar = ContextVar("github_warehouse_transaction", default=None)
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+def warehouse_uri(conn_id: str) -> str:
+    """SQLAlchemy URI of an Airflow connection, read from the metadata DB once per process."""
+    key = (os.getpid(), conn_id)
+    if key not in _URIS:
+        from airflow.hooks.base import BaseHook
+
+        _URIS[key] = BaseHook.get_connection(conn_id).get_uri()
+    return _URIS[key]
+
+
+def engine_for_uri(uri: str):
+    key = (os.getpid(), uri)
+    with _LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            options = {"pool_pre_ping": True, "pool_recycle": POOL_RECYCLE_SECONDS}
+            if uri.startswith("postgresql"):
+                options.update(
+                    pool_size=POOL_SIZE,
+                    max_overflow=MAX_OVERFLOW,
+                    connect_args={
+                        "application_name": APPLICATION_NAME,
+                        "options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}",
+                    },
+                )
+            engine = create_engine(uri, **options)
+            _ENGINES[key] = engine
+            logger.info("Created pooled engine for %s (pool %s + %s)", engine.url.render_as_string(hide_password=True),
+                        POOL_SIZE, MAX_OVERFLOW)
+    return engine
+
+
+def get_engine(conn_id: str):
+    return engine_for_uri(warehouse_uri(conn_id))
+
+
+@contextmanager
+def transaction(engine):
+    """
+    engine.begin(), unless a transaction() on the same engine is already open in this context:
+    then its connection is yielded and the outer block commits or rolls back everything.
+    """
+    current = _TRANSACTION.get()
+    if current is not None and current[0] is engine:
+        yield current[1]
+        return
+
+    with engine.begin() as conn:
+        token = _TRANSACTION.set((engine, conn))
+        try:
+            yield conn
+        finally:
+            _TRANSACTION.reset(token)
+
+
+def dispose_engines() -> None:
+    with _LOCK:
+        for engine in _ENGINES.values():
+            engine.dispose()
+        _ENGINES.clear()
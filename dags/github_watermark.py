@@ -0,0 +1,193 @@
+"""
+github_watermark.py
+
+High-watermark state for the incremental GitHub extraction.
+
+The extraction DAG only asks GitHub for records that changed since the last
+successful run. The max `updated_at` of that run is kept in a small JSON state
+file inside the landing area, keyed by stream (e.g. "owner/repo:issues"), so
+the next run can resume from it.
+
+The extraction tasks only stage their watermark under the run id; the staged
+values are promoted to the state file when the whole run completes
+(t_complete_manifest_run in DAG 01), like the row hashes. A run with a failed
+task is never loaded by DAG 02, so the next run must fetch its window again
+instead of resuming after it.
+
+Promotion only moves a watermark forward: runs can complete out of order, and an
+older run promoted after a newer one must not send the next run back over its
+window. Only a full_refresh run (staged with reset=True) may set it lower.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# ----------------------------
+# Config
+# ----------------------------
+STATE_FILE_NAME = "_github_watermarks.json"
+STAGED_FILE_NAME = "_github_watermarks_staged.json"     # {run_id: {key: {"value": ..., "reset": ...}}}
+DEFAULT_OVERLAP = timedelta(hours=1)
+
+logger = logging.getLogger("airflow.task")
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def _state_path(landing_dir: Path) -> Path:
+    return Path(landing_dir) / STATE_FILE_NAME
+
+
+def _read_json(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _read_state(landing_dir: Path) -> dict:
+    return _read_json(_state_path(landing_dir))
+
+
+def _write_json(path: Path, data: dict) -> None:
+    """Temp file + rename, so a crash never leaves a half written file behind."""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+@contextmanager
+def _locked(landing_dir: Path):
+    """Exclusive lock around a read-modify-write of the state files (mapped tasks run side by side)."""
+    with open(_state_path(landing_dir).with_suffix(".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _parse_ts(value: str) -> datetime:
+    """GitHub timestamps look like 2026-02-21T14:00:36Z."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _format_ts(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _latest(current: str | None, candidate: str) -> str:
+    """The further of two watermarks: event ids compare as numbers, everything else as timestamps."""
+    if current is None:
+        return candidate
+    if current.isdigit() and candidate.isdigit():
+        return str(max(int(current), int(candidate)))
+    return max_timestamp([current, candidate])
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+def read_watermark(landing_dir: Path, key: str) -> str | None:
+    """Return the stored watermark for a stream, or None on first run."""
+    return _read_state(landing_dir).get(key)
+
+
+def write_watermark(landing_dir: Path, key: str, value: str) -> None:
+    """Persist the watermark for a stream right away (see stage_watermark for the extraction tasks)."""
+    path = _state_path(landing_dir)
+
+    with _locked(landing_dir):
+        state = _read_state(landing_dir)
+        state[key] = value
+        _write_json(path, state)
+
+    logger.info("Watermark %s set to %s", key, value)
+
+
+def stage_watermark(landing_dir: Path, run_id: str, key: str, value: str, reset: bool = False) -> None:
+    """
+    Stage the watermark of a stream under the run id, it only becomes the stored
+    watermark once promote_watermarks() runs for the completed run. Retries of a
+    task replace their earlier staging.
+
+    reset=True (a full_refresh run) lets the value replace a further stored watermark.
+    """
+    path = Path(landing_dir) / STAGED_FILE_NAME
+
+    with _locked(landing_dir):
+        staged = _read_json(path)
+        staged.setdefault(run_id, {})[key] = {"value": value, "reset": reset}
+        _write_json(path, staged)
+
+    logger.info("Watermark %s staged at %s for %s (reset=%s)", key, value, run_id, reset)
+
+
+def promote_watermarks(landing_dir: Path, run_id: str) -> dict:
+    """
+    Move the staged watermarks of a completed run into the state file, returns the
+    stored values. A key only moves forward unless the run staged it with reset=True.
+    """
+    staged_path = Path(landing_dir) / STAGED_FILE_NAME
+    promoted = {}
+
+    with _locked(landing_dir):
+        staged = _read_json(staged_path)
+        entries = staged.pop(run_id, {})
+        if entries:
+            state = _read_state(landing_dir)
+            for key, entry in entries.items():
+                if not isinstance(entry, dict):     # staged before the reset flag existed
+                    entry = {"value": entry, "reset": False}
+                if entry["reset"]:
+                    state[key] = entry["value"]
+                else:
+                    state[key] = _latest(state.get(key), entry["value"])
+                if state[key] != entry["value"]:
+                    logger.info("Watermark %s kept at %s, %s staged %s", key, state[key], run_id, entry["value"])
+                promoted[key] = state[key]
+            _write_json(_state_path(landing_dir), state)
+            _write_json(staged_path, staged)
+
+    logger.info("Promoted %s watermarks of %s: %s", len(promoted), run_id, promoted)
+    return promoted
+
+
+def resolve_since(
+    landing_dir: Path,
+    key: str,
+    default_since: str,
+    full_refresh: bool = False,
+    overlap: timedelta = DEFAULT_OVERLAP,
+) -> str:
+    """
+    Work out the `since` value for the next request.
+
+    - full_refresh or no stored watermark -> default_since (full history)
+    - otherwise -> stored watermark minus the overlap window, so records that
+      were updated while the last run was paginating are picked up again
+    """
+    if full_refresh:
+        logger.info("Full refresh requested for %s, since=%s", key, default_since)
+        return default_since
+
+    watermark = read_watermark(landing_dir, key)
+    if watermark is None:
+        logger.info("No watermark stored for %s, since=%s", key, default_since)
+        return default_since
+
+    since = _format_ts(_parse_ts(watermark) - overlap)
+    logger.info("Incremental run for %s, watermark=%s since=%s", key, watermark, since)
+    return since
+
+
+def max_timestamp(values) -> str | None:
+    """Max of GitHub ISO timestamps (None values are ignored)."""
+    parsed = [_parse_ts(v) for v in values if v]
+    if not parsed:
+        return None
+    return _format_ts(max(parsed))
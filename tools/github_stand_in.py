@@ -0,0 +1,612 @@
+"""
+github_stand_in.py
+
+Local stand-in for the GitHub API, so the extractors can be exercised without a token or
+network access, and so pagination, throttling and retries can be load-tested offline.
+
+GraphQL: POST /graphql is answered from a recording, a JSON file of
+{"requests": [{"variables": {...}, "response": {...}}, ...]}. Responses are matched on
+(owner, repo, cursor).
+
+REST: GET /repos/{owner}/{repo} and /repos/{owner}/{repo}/issues are served from a REST
+issues dump (JSON array or NDJSON) or from generated issues (benchmarks/issue_generator.py):
+- per_page (default 30, max 100), page, state (open | closed | all, default open), since
+  (updated at or after), sort (created | updated | comments) and direction, with
+  first / prev / next / last Link headers like api.github.com
+- /issues/comments and /issues/events answer empty listings, so DAG 01 runs end to end
+- weak ETags, a matching If-None-Match gets a 304 that does not count against the budget
+- X-RateLimit-* headers from a request budget per window, 403 once it is spent
+- configurable latency and injected failures (403 secondary limit, 429, 5xx) per request
+- GET /_stand_in/stats -> requests per status, requests per second since start
+
+check-pages: serves a numbered listing under a small rate-limit budget and walks it with
+GitHubClient.iter_pages at a given concurrency; fails unless every page arrives, in order
+(the client has to drop to one page at a time and sleep through the resets to get there).
+
+Usage:
+    # record real responses (needs GITHUB_API_KEY)
+    python tools/github_stand_in.py record --owner great-expectations --repo great_expectations --out rec.json
+
+    # or build a recording offline from a REST issues dump in the landing area
+    python tools/github_stand_in.py from-rest landing-input/github_issues.json --out rec.json
+
+    # serve it, then point GitHubClient(base_url="http://127.0.0.1:8765") at it
+    python tools/github_stand_in.py serve --recording rec.json --port 8765
+
+    # concurrent pagination under a budget far below the page count: 150 pages, 60 requests per 3 s
+    python tools/github_stand_in.py check-pages --pages 150 --concurrency 8 --rate-limit 60 --rate-window 3
+
+    # REST, 100k generated issues, 20 ms latency, 2% 503s and 1% 429s, 5000 requests per minute;
+    # DAG 01 runs against it unchanged with GITHUB_API_BASE_URL=http://127.0.0.1:8765
+    python tools/github_stand_in.py serve --issues landing-input/github_issues.json --synthetic 100000 \
+        --latency-ms 20 --inject 503:0.02 --inject 429:0.01 --rate-limit 5000 --rate-window 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "dags"))
+sys.path.append(str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from github_client import GitHubClient
+from github_graphql import ISSUES_QUERY, LABELS_PER_ISSUE, PAGE_SIZE
+from github_landing import iter_raw_records
+
+DEFAULT_PORT = 8765
+DEFAULT_PER_PAGE = 30
+MAX_PER_PAGE = 100
+DEFAULT_RATE_LIMIT = 5000
+DEFAULT_RATE_WINDOW_SECONDS = 3600
+INJECTABLE_STATUSES = (403, 429, 500, 502, 503, 504)
+SECONDARY_LIMIT_MESSAGE = "You have exceeded a secondary rate limit. Please wait a few minutes before you try again."
+
+
+# ----------------------------
+# Recordings
+# ----------------------------
+def _recording_key(variables: dict) -> tuple:
+    return (variables.get("owner"), variables.get("repo"), variables.get("cursor"))
+
+
+def record_graphql(owner: str, repo: str, out: Path, since: str | None = None) -> int:
+    """Page through the real GraphQL API and save every request/response pair."""
+    client = GitHubClient(os.getenv("GITHUB_API_KEY"))
+    requests_ = []
+    cursor = None
+
+    while True:
+        variables = {"owner": owner, "repo": repo, "since": since, "cursor": cursor,
+                     "pageSize": PAGE_SIZE, "labelsPerIssue": LABELS_PER_ISSUE}
+        response = client.post_json(client.url("graphql"), {"query": ISSUES_QUERY, "variables": variables})
+        requests_.append({"variables": variables, "response": response})
+
+        page_info = response["data"]["repository"]["issues"]["pageInfo"]
+        if not page_info["hasNextPage"]:
+            break
+        cursor = page_info["endCursor"]
+
+    out.write_text(json.dumps({"requests": requests_}), encoding="utf-8")
+    return len(requests_)
+
+
+def _graphql_node(issue: dict) -> dict:
+    """REST issue -> the GraphQL node shape requested by ISSUES_QUERY."""
+    user = issue["user"]
+    login = user["login"][:-len("[bot]")] if user["type"] == "Bot" and user["login"].endswith("[bot]") else user["login"]
+    milestone = issue["milestone"]
+
+    return {
+        "databaseId": issue["id"],
+        "number": issue["number"],
+        "title": issue["title"],
+        "state": issue["state"].upper(),
+        "stateReason": issue["state_reason"].upper() if issue["state_reason"] else None,
+        "locked": issue["locked"],
+        "createdAt": issue["created_at"],
+        "updatedAt": issue["updated_at"],
+        "closedAt": issue["closed_at"],
+        "assignees": {"totalCount": len(issue["assignees"])},
+        "comments": {"totalCount": issue["comments"]},
+        "milestone": {"number": milestone["number"], "title": milestone["title"], "state": milestone["state"].upper()} if milestone else None,
+        "author": {
+            "__typename": user["type"],
+            "login": login,
+            "avatarUrl": user["avatar_url"],
+            "url": user["html_url"],
+            "id": user["node_id"],
+            "databaseId": user["id"],
+            "isSiteAdmin": user["site_admin"],
+        },
+        "labels": {
+            "totalCount": len(issue["labels"]),
+            "nodes": [
+                {"id": l["node_id"], "name": l["name"], "color": l["color"],
+                 "isDefault": l["default"], "description": l["description"]}
+                for l in issue["labels"][:LABELS_PER_ISSUE]
+            ],
+        },
+    }
+
+
+def _cursor(offset: int) -> str:
+    return base64.b64encode(f"cursor:{offset}".encode()).decode()
+
+
+def recording_from_rest(issues: list, owner: str, repo: str, page_size: int = PAGE_SIZE) -> dict:
+    """
+    Build a GraphQL recording from a REST issues dump (pull requests dropped, ordered by
+    updated_at like the real query).
+    """
+    issues = sorted((x for x in issues if "pull_request" not in x), key=lambda x: x["updated_at"])
+    requests_ = []
+    cursor = None
+
+    for offset in range(0, max(len(issues), 1), page_size):
+        nodes = [_graphql_node(x) for x in issues[offset:offset + page_size]]
+        has_next = offset + page_size < len(issues)
+        end_cursor = _cursor(offset + page_size) if has_next else None
+        requests_.append({
+            "variables": {"owner": owner, "repo": repo, "cursor": cursor},
+            "response": {"data": {
+                "repository": {"issues": {"pageInfo": {"hasNextPage": has_next, "endCursor": end_cursor}, "nodes": nodes}},
+                "rateLimit": {"cost": 1, "remaining": 4999, "resetAt": None},
+            }},
+        })
+        cursor = end_cursor
+
+    return {"requests": requests_}
+
+
+# ----------------------------
+# REST
+# ----------------------------
+@dataclass
+class RestBehaviour:
+    """How the REST side answers: latency, injected failures and the rate-limit budget."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    faults: dict = field(default_factory=dict)      # status -> probability per request
+    retry_after: int = 1                             # seconds sent with injected 403 / 429
+    rate_limit: int = DEFAULT_RATE_LIMIT
+    rate_window: float = DEFAULT_RATE_WINDOW_SECONDS
+    seed: int | None = None
+
+
+def _repo_payload(owner: str, repo: str, issues: list) -> dict:
+    """Minimal /repos/{owner}/{repo} body with every field fetch_repo_info reads."""
+    first = min((x["created_at"] for x in issues), default="2019-01-01T00:00:00Z")
+    last = max((x["updated_at"] for x in issues), default=first)
+    repo_id = int(hashlib.sha1(f"{owner}/{repo}".encode()).hexdigest()[:8], 16)
+    return {
+        "id": repo_id,
+        "node_id": f"R_standin{repo_id}",
+        "name": repo,
+        "full_name": f"{owner}/{repo}",
+        "owner": {"login": owner, "id": repo_id + 1, "type": "Organization"},
+        "private": False,
+        "fork": False,
+        "archived": False,
+        "disabled": False,
+        "created_at": first,
+        "updated_at": last,
+        "pushed_at": last,
+        "default_branch": "develop",
+        "language": "Python",
+        "stargazers_count": 0,
+        "watchers_count": 0,
+        "forks_count": 0,
+        "open_issues_count": sum(x["state"] == "open" for x in issues),
+    }
+
+
+class RestStandIn:
+    """Issue listings of one or more repos with GitHub's paging, filtering and throttling."""
+
+    def __init__(self, repos: dict, behaviour: RestBehaviour | None = None):
+        # {"owner/repo": [REST issues]}
+        self.repos = repos
+        self.behaviour = behaviour or RestBehaviour()
+        self.repo_payloads = {name: _repo_payload(*name.split("/"), issues) for name, issues in repos.items()}
+        self.statuses = Counter()
+        self.started = time.time()
+        self._random = random.Random(self.behaviour.seed)
+        self._lock = threading.Lock()
+        self._listings = {}
+        self._window_start = time.time()
+        self._used = 0
+
+    # ----------------------------
+    # Throttling
+    # ----------------------------
+    def spend(self) -> tuple[bool, dict]:
+        """(allowed, X-RateLimit-* headers): count one request against the budget of the window."""
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.behaviour.rate_window:
+                self._window_start, self._used = now, 0
+            allowed = self._used < self.behaviour.rate_limit
+            if allowed:
+                self._used += 1
+            return allowed, self._rate_headers()
+
+    def rate_headers(self) -> dict:
+        with self._lock:
+            return self._rate_headers()
+
+    def _rate_headers(self) -> dict:
+        return {
+            "X-RateLimit-Limit": str(self.behaviour.rate_limit),
+            "X-RateLimit-Remaining": str(self.behaviour.rate_limit - self._used),
+            "X-RateLimit-Used": str(self._used),
+            "X-RateLimit-Reset": str(int(self._window_start + self.behaviour.rate_window)),
+            "X-RateLimit-Resource": "core",
+        }
+
+    def count(self, status: int) -> None:
+        with self._lock:
+            self.statuses[status] += 1
+
+    def injected_fault(self) -> int | None:
+        with self._lock:
+            roll = self._random.random()
+        for status, probability in self.behaviour.faults.items():
+            if roll < probability:
+                return status
+            roll -= probability
+        return None
+
+    def delay(self) -> None:
+        b = self.behaviour
+        if b.latency_ms or b.jitter_ms:
+            with self._lock:
+                jitter = self._random.uniform(0, b.jitter_ms)
+            time.sleep((b.latency_ms + jitter) / 1000)
+
+    # ----------------------------
+    # Listings
+    # ----------------------------
+    def _listing(self, repo: str, state: str, since: str | None, sort: str, direction: str) -> list:
+        """Filtered, sorted issues of a repo, cached per query (a run reuses one query for every page)."""
+        key = (repo, state, since, sort, direction)
+        with self._lock:
+            listing = self._listings.get(key)
+        if listing is None:
+            listing = [
+                x for x in self.repos[repo]
+                if (state == "all" or x["state"] == state) and (since is None or x["updated_at"] >= since)
+            ]
+            sort_key = {"created": "created_at", "updated": "updated_at", "comments": "comments"}[sort]
+            listing.sort(key=lambda x: (x[sort_key], x["id"]), reverse=direction == "desc")
+            with self._lock:
+                self._listings[key] = listing
+        return listing
+
+    def issues_page(self, repo: str, query: dict) -> tuple[list, int, int]:
+        """(issues of the requested page, page, last page) or raises ValueError on a bad query."""
+        state = query.get("state", "open")
+        sort = query.get("sort", "created")
+        direction = query.get("direction", "desc")
+        if state not in ("open", "closed", "all") or sort not in ("created", "updated", "comments") \
+                or direction not in ("asc", "desc"):
+            raise ValueError(f"Invalid state / sort / direction: {state} / {sort} / {direction}")
+
+        per_page = min(max(int(query.get("per_page", DEFAULT_PER_PAGE)), 1), MAX_PER_PAGE)
+        page = max(int(query.get("page", 1)), 1)
+        listing = self._listing(repo, state, query.get("since"), sort, direction)
+        last_page = max((len(listing) + per_page - 1) // per_page, 1)
+        return listing[(page - 1) * per_page:page * per_page], page, last_page
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = dict(self.statuses)
+        requests_ = sum(statuses.values())
+        elapsed = time.time() - self.started
+        return {
+            "requests": requests_,
+            "statuses": {str(k): v for k, v in sorted(statuses.items())},
+            "elapsed_s": round(elapsed, 3),
+            "requests_per_s": round(requests_ / elapsed, 1) if elapsed else None,
+        }
+
+
+def _link_header(base: str, path: str, query: dict, page: int, last_page: int) -> str | None:
+    def url(p: int) -> str:
+        return f"<{base}{path}?{urlencode({**query, 'page': p})}>"
+
+    links = []
+    if page > 1:
+        links += [f'{url(page - 1)}; rel="prev"', f'{url(1)}; rel="first"']
+    if page < last_page:
+        links += [f'{url(page + 1)}; rel="next"', f'{url(last_page)}; rel="last"']
+    return ", ".join(links) or None
+
+
+def _etag(body: bytes) -> str:
+    return f'W/"{hashlib.sha1(body).hexdigest()}"'
+
+
+def load_rest_issues(path: Path, synthetic: int | None = None, seed: int = 0, repo_full_name: str | None = None) -> list:
+    """A REST issues dump as served, or `synthetic` generated issues with its distributions."""
+    sample = list(iter_raw_records(path))
+    if not synthetic:
+        return sample
+    from issue_generator import generate_issues
+
+    return list(generate_issues(sample, synthetic, seed, repo_full_name))
+
+
+# ----------------------------
+# Server
+# ----------------------------
+def make_handler(recording: dict | None = None, rest: RestStandIn | None = None):
+    responses = {_recording_key(r["variables"]): r["response"] for r in (recording or {"requests": []})["requests"]}
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"       # keep-alive, like the pooled session expects
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, headers: dict | None = None) -> None:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if status != 304:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            if rest is not None:
+                rest.count(status)
+
+        def _send_json(self, status: int, payload, headers: dict | None = None) -> None:
+            self._send(status, json.dumps(payload).encode("utf-8"), headers)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length) or b"{}"
+
+            if self.path.rstrip("/") != "/graphql":
+                self._send_json(404, {"message": "Not Found"})
+                return
+
+            variables = json.loads(body).get("variables") or {}
+            response = responses.get(_recording_key(variables))
+
+            if response is None:
+                self._send_json(200, {"errors": [{"message": f"No recorded response for {_recording_key(variables)}"}]})
+                return
+            self._send_json(200, response)
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            path = parts.path.rstrip("/")
+            query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+
+            if rest is None:
+                self._send_json(404, {"message": "Not Found"})
+                return
+            if path == "/_stand_in/stats":
+                self._send_json(200, rest.stats())
+                return
+
+            segments = path.strip("/").split("/")
+            if len(segments) < 3 or segments[0] != "repos" or f"{segments[1]}/{segments[2]}" not in rest.repos:
+                self._send_json(404, {"message": "Not Found", "documentation_url": "https://docs.github.com/rest"})
+                return
+            repo = f"{segments[1]}/{segments[2]}"
+            resource_ = segments[3:]
+
+            rest.delay()
+            fault = rest.injected_fault()
+            if fault in (403, 429):
+                message = SECONDARY_LIMIT_MESSAGE if fault == 403 else "Too Many Requests"
+                self._send_json(fault, {"message": message}, {"Retry-After": str(rest.behaviour.retry_after)})
+                return
+            if fault is not None:
+                self._send_json(fault, {"message": "Server Error"})
+                return
+
+            if resource_ == []:
+                payload, headers = rest.repo_payloads[repo], {}
+            elif resource_ == ["issues"]:
+                try:
+                    issues, page, last_page = rest.issues_page(repo, query)
+                except ValueError as e:
+                    self._send_json(422, {"message": str(e)})
+                    return
+                payload = issues
+                link = _link_header(f"http://{self.headers.get('Host')}", path, query, page, last_page)
+                headers = {"Link": link} if link else {}
+            elif resource_ in (["issues", "comments"], ["issues", "events"]):
+                payload, headers = [], {}
+            else:
+                self._send_json(404, {"message": "Not Found"})
+                return
+
+            body = json.dumps(payload).encode("utf-8")
+            etag = _etag(body)
+            if self.headers.get("If-None-Match") == etag:
+                # conditional requests answered with 304 are free on GitHub
+                self._send(304, b"", {"ETag": etag, **rest.rate_headers(), **headers})
+                return
+
+            allowed, rate_headers = rest.spend()
+            if not allowed:
+                self._send_json(403, {"message": "API rate limit exceeded"}, rate_headers)
+                return
+            self._send(200, body, {"ETag": etag, **rate_headers, **headers})
+
+    return StandInHandler
+
+
+def _numbered_issues(count: int, repo_full_name: str) -> list:
+    """Bare issues with increasing ids and timestamps, enough for the listing and its paging."""
+    start = time.mktime((2024, 1, 1, 0, 0, 0, 0, 0, 0))
+    issues = []
+    for i in range(1, count + 1):
+        ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start + i * 60))
+        issues.append({
+            "id": i, "number": i, "state": "open", "comments": 0, "created_at": ts, "updated_at": ts,
+            "repository_url": f"https://api.github.com/repos/{repo_full_name}",
+        })
+    return issues
+
+
+def check_paged_listing(
+    pages: int = 150,
+    per_page: int = 10,
+    concurrency: int = 8,
+    rate_limit: int = 60,
+    rate_window: float = 3.0,
+    budget_share: float = 1.0,
+) -> dict:
+    """
+    Walk a listing of `pages` pages through GitHubClient.iter_pages against a stand-in whose
+    budget is `rate_limit` requests per `rate_window` seconds. Raises AssertionError unless every
+    issue comes back exactly once and in order.
+    """
+    repo_full_name = "stand-in/paging"
+    rest = RestStandIn({repo_full_name: _numbered_issues(pages * per_page, repo_full_name)},
+                       RestBehaviour(rate_limit=rate_limit, rate_window=rate_window))
+    server = serve(port=0, rest=rest)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = GitHubClient(None, base_url=f"http://127.0.0.1:{server.server_address[1]}", budget_share=budget_share)
+    try:
+        started = time.time()
+        params = {"per_page": per_page, "state": "all", "sort": "created", "direction": "asc"}
+        ids = [x["id"] for page in client.iter_pages(client.url(f"repos/{repo_full_name}/issues"), params,
+                                                     concurrency=concurrency) for x in page]
+        elapsed = time.time() - started
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+    assert ids == list(range(1, pages * per_page + 1)), \
+        f"pages out of order or incomplete: {len(ids)} issues, first mismatch at {next((i for i, x in enumerate(ids, 1) if x != i), None)}"
+    return {
+        "pages": pages,
+        "issues": len(ids),
+        "elapsed_s": round(elapsed, 2),
+        "throttled_s": round(client.stats.throttled_seconds, 2),
+        "server": rest.stats(),
+    }
+
+
+def serve(
+    recording: dict | None = None,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    rest: RestStandIn | None = None,
+) -> ThreadingHTTPServer:
+    """Start the stand-in (blocking call is server.serve_forever())."""
+    return ThreadingHTTPServer((host, port), make_handler(recording, rest))
+
+
+def _fault(value: str) -> tuple[int, float]:
+    status, probability = value.split(":")
+    if int(status) not in INJECTABLE_STATUSES:
+        raise argparse.ArgumentTypeError(f"--inject status must be one of {INJECTABLE_STATUSES}")
+    return int(status), float(probability)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_record = sub.add_parser("record", help="record real GraphQL responses")
+    p_record.add_argument("--owner", required=True)
+    p_record.add_argument("--repo", required=True)
+    p_record.add_argument("--since")
+    p_record.add_argument("--out", type=Path, required=True)
+
+    p_rest = sub.add_parser("from-rest", help="build a GraphQL recording from a REST issues dump")
+    p_rest.add_argument("rest_json", type=Path)
+    p_rest.add_argument("--owner", default="great-expectations")
+    p_rest.add_argument("--repo", default="great_expectations")
+    p_rest.add_argument("--out", type=Path, required=True)
+
+    p_serve = sub.add_parser("serve", help="serve a GraphQL recording and / or REST issues")
+    p_serve.add_argument("--recording", type=Path, help="GraphQL recording")
+    p_serve.add_argument("--issues", type=Path, help="REST issues dump (JSON array or NDJSON) served on /repos/...")
+    p_serve.add_argument("--synthetic", type=int, help="serve this many issues generated from --issues instead")
+    p_serve.add_argument("--owner", default="great-expectations")
+    p_serve.add_argument("--repo", default="great_expectations")
+    p_serve.add_argument("--latency-ms", type=float, default=0.0)
+    p_serve.add_argument("--jitter-ms", type=float, default=0.0)
+    p_serve.add_argument("--inject", type=_fault, action="append", default=[], metavar="STATUS:PROBABILITY",
+                         help=f"fail this share of REST requests with STATUS, one of {INJECTABLE_STATUSES}")
+    p_serve.add_argument("--retry-after", type=int, default=1)
+    p_serve.add_argument("--rate-limit", type=int, default=DEFAULT_RATE_LIMIT)
+    p_serve.add_argument("--rate-window", type=float, default=DEFAULT_RATE_WINDOW_SECONDS)
+    p_serve.add_argument("--seed", type=int)
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+
+    p_check = sub.add_parser("check-pages", help="walk a paged listing under a low rate-limit budget, pages in order")
+    p_check.add_argument("--pages", type=int, default=150)
+    p_check.add_argument("--per-page", type=int, default=10)
+    p_check.add_argument("--concurrency", type=int, default=8)
+    p_check.add_argument("--rate-limit", type=int, default=60)
+    p_check.add_argument("--rate-window", type=float, default=3.0)
+    p_check.add_argument("--budget-share", type=float, default=1.0)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        pages = record_graphql(args.owner, args.repo, args.out, args.since)
+        print(f"Recorded {pages} pages to {args.out}")
+
+    elif args.command == "from-rest":
+        issues = json.loads(args.rest_json.read_text(encoding="utf-8"))
+        recording = recording_from_rest(issues, args.owner, args.repo)
+        args.out.write_text(json.dumps(recording), encoding="utf-8")
+        print(f"Wrote {len(recording['requests'])} pages to {args.out}")
+
+    elif args.command == "serve":
+        if not args.recording and not args.issues:
+            parser.error("serve needs --recording and / or --issues")
+        recording = json.loads(args.recording.read_text(encoding="utf-8")) if args.recording else None
+        rest = None
+        if args.issues:
+            repo_full_name = f"{args.owner}/{args.repo}"
+            issues = load_rest_issues(args.issues, args.synthetic, args.seed or 0, repo_full_name)
+            rest = RestStandIn({repo_full_name: issues}, RestBehaviour(
+                latency_ms=args.latency_ms,
+                jitter_ms=args.jitter_ms,
+                faults=dict(args.inject),
+                retry_after=args.retry_after,
+                rate_limit=args.rate_limit,
+                rate_window=args.rate_window,
+                seed=args.seed,
+            ))
+            print(f"Serving {len(issues)} REST issues of {repo_full_name}")
+        server = serve(recording, args.host, args.port, rest=rest)
+        print(f"GitHub stand-in listening on http://{args.host}:{args.port}")
+        server.serve_forever()
+
+    elif args.command == "check-pages":
+        result = check_paged_listing(args.pages, args.per_page, args.concurrency, args.rate_limit, args.rate_window,
+                                     args.budget_share)
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()